@@ -0,0 +1,365 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict, namedtuple
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, DATASETS, load_dataset, read_columns, read_manifest, write_columns
+from callback_metrics import in_phase
+from data_refresh import LiveDataset
+from schemas import apply_schema
+from similarity import SIMILARITY_FEATURES
+from snapshots import team_digest, team_slug
+
+# Root of the partitioned archive (override with SPORTS_ARCHIVE_DIR):
+#   <ARCHIVE_DIR>/<dataset>/manifest.json                      partitions and their statistics
+#   <ARCHIVE_DIR>/<dataset>/<team>/<season>/<date>-<digest>/   one partition, stored like the data cache
+ARCHIVE_DIR = os.environ.get('SPORTS_ARCHIVE_DIR', os.path.join(DATA_DIR, '.archive'))
+
+# Archive mode (SPORTS_ARCHIVE=1): team views read their team's partitions from the
+# archive instead of loading every CSV up front (build it first: python archive.py build)
+ARCHIVE_MODE = os.environ.get('SPORTS_ARCHIVE') == '1'
+
+# How each dataset is partitioned: by team, then by season and match date when it has a
+# time column; otherwise by the season label given when the rows are ingested
+Partitioning = namedtuple('Partitioning', 'team_col player_col time_col')
+
+PARTITIONING = {
+    'cricket_batting': Partitioning('team', 'player', None),
+    'cricket_bowling': Partitioning('team', 'player', None),
+    'nba': Partitioning('team', 'player', None),
+    'nba_games': Partitioning('team', 'player', 'date'),
+    'football': Partitioning('team name', 'player name', 'timestamp'),
+}
+
+# Label of rows ingested without a season
+ALL_SEASONS = 'all'
+
+# Lookups that compare players across every team, so in archive mode they read all of a dataset's
+# partitions (only these columns) when a snapshot is built, not one team's on first use
+_team_col, _player_col, _features = SIMILARITY_FEATURES['nba']
+FULL_READS = {
+    'nba': ('multi-sports similarity index', [_team_col, _player_col, *_features]),
+}
+
+
+def season_of(times):
+    """Season label ('2024-25') of each timestamp; a season starts in July (missing times: 'all')."""
+    times = pd.DatetimeIndex(times)
+    start = times.year - (times.month < 7)
+    return pd.Index([ALL_SEASONS if pd.isna(year) else f"{int(year)}-{(int(year) + 1) % 100:02d}" for year in start])
+
+
+def _to_ns(value):
+    return None if value is None else int(pd.Timestamp(value).as_unit('ns').value)
+
+
+def _stats(df):
+    # Min/max of every numeric and time column, for pruning partitions on a range
+    stats = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_dtype(series):
+            values = series.to_numpy(dtype='datetime64[ns]').view(np.int64)[series.notna().to_numpy()]
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+        else:
+            continue
+        if len(values):
+            stats[col] = [values.min().item(), values.max().item()]
+    return stats
+
+
+class Archive:
+    """Multi-season datasets stored as team/season/match-date partitions with min/max statistics.
+
+    Each partition is a columnar directory (data_loader.write_columns), so a
+    read maps just the requested columns. A dataset's manifest lists every
+    partition's team, season, match date, row count, content digest and
+    per-column min/max, so a query on teams, seasons or a time range skips
+    the partitions that cannot match without opening them.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or ARCHIVE_DIR
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def manifest(self, dataset):
+        """The dataset's manifest, reread when the file changes."""
+        path = os.path.join(self.root, dataset, 'manifest.json')
+        stamp = os.stat(path).st_mtime_ns
+        cached = self._manifests.get(dataset)
+        if cached is None or cached[0] != stamp:
+            with open(path) as f:
+                cached = (stamp, json.load(f))
+            self._manifests[dataset] = cached
+        return cached[1]
+
+    def version(self, dataset):
+        """Content digest of every partition of the dataset."""
+        return self.manifest(dataset)['version']
+
+    def teams(self, dataset):
+        return list(self.manifest(dataset)['teams'])
+
+    def partitions(self, dataset, teams=None, seasons=None, start=None, end=None):
+        """Manifest entries of the partitions that may hold rows of ``teams``/``seasons`` in [start, end)."""
+        manifest = self.manifest(dataset)
+        time_col = manifest['time_col']
+        start_ns, end_ns = _to_ns(start), _to_ns(end)
+        selected = []
+        for entry in manifest['partitions']:
+            if teams is not None and entry['team'] not in teams:
+                continue
+            if seasons is not None and entry['season'] not in seasons:
+                continue
+            if time_col is not None and (start_ns is not None or end_ns is not None):
+                low, high = entry['stats'].get(time_col, [None, None])
+                if low is None or (end_ns is not None and low >= end_ns) or (start_ns is not None and high < start_ns):
+                    continue
+            selected.append(entry)
+        return selected
+
+    def read(self, dataset, teams=None, seasons=None, start=None, end=None, columns=None):
+        """Rows of ``teams``/``seasons`` in [start, end), reading only the matching partitions and ``columns``."""
+        manifest = self.manifest(dataset)
+        time_col = manifest['time_col']
+        ranged = time_col is not None and (start is not None or end is not None)
+        wanted = None if columns is None else list(dict.fromkeys(list(columns) + ([time_col] if ranged else [])))
+        parts = []
+        for entry in self.partitions(dataset, teams, seasons, start, end):
+            part = read_columns(os.path.join(self.root, dataset, entry['path']), wanted)
+            if ranged:
+                times = part[time_col].to_numpy(dtype='datetime64[ns]').view(np.int64)
+                keep = np.ones(len(part), dtype=bool)
+                if start is not None:
+                    keep &= times >= _to_ns(start)
+                if end is not None:
+                    keep &= times < _to_ns(end)
+                part = part[keep]
+            parts.append(part)
+        if not parts:
+            return pd.DataFrame(columns=wanted or manifest['columns'])
+        # Partitions carry their own category labels, so categoricals are rebuilt over the result
+        df = apply_schema(pd.concat(parts, ignore_index=True), dataset)
+        return df if columns is None else df[list(columns)]
+
+    def ingest(self, dataset, df, season=None, complete=False):
+        """Store rows in their partitions, replacing the partitions they fall in; returns partitions written.
+
+        Rows of a dataset without a time column go to ``season`` (default
+        'all'). Partitions whose rows did not change are left as they are.
+        With ``complete``, ``df`` holds all of the dataset's rows (of that
+        season, for a dataset without a time column), so partitions it has
+        no rows for are dropped.
+        """
+        spec = PARTITIONING[dataset]
+        df = df.reset_index(drop=True)
+        team_keys = df[spec.team_col].astype(str)
+        if spec.time_col is not None:
+            times = pd.to_datetime(df[spec.time_col])
+            seasons = season_of(times)
+            dates = pd.Index(times.dt.strftime('%Y-%m-%d').fillna(ALL_SEASONS))
+        else:
+            seasons = pd.Index([season or ALL_SEASONS] * len(df))
+            dates = pd.Index([ALL_SEASONS] * len(df))
+
+        with self._lock:
+            dataset_dir = os.path.join(self.root, dataset)
+            try:
+                manifest = self.manifest(dataset)
+            except FileNotFoundError:
+                manifest = {'partitions': [], 'teams': []}
+            partitions = {(entry['team'], entry['season'], entry['date']): entry for entry in manifest['partitions']}
+            teams = list(manifest['teams'])
+            stale, written, seen = [], 0, set()
+
+            groups = pd.Series(np.arange(len(df))).groupby([team_keys.to_numpy(), seasons, dates], sort=False)
+            for (team, part_season, date), rows in groups:
+                part = df.iloc[rows.to_numpy()].reset_index(drop=True)
+                digest = team_digest(part)
+                key = (team, part_season, date)
+                seen.add(key)
+                if key in partitions and partitions[key]['digest'] == digest:
+                    continue
+                path = os.path.join(team_slug(team), part_season, f"{date}-{digest[:12]}")
+                write_columns(part, os.path.join(dataset_dir, path), dataset=dataset, team=team,
+                              season=part_season, date=date, digest=digest)
+                if key in partitions:
+                    stale.append(partitions[key]['path'])
+                partitions[key] = {'team': team, 'season': part_season, 'date': date, 'path': path,
+                                   'rows': len(part), 'digest': digest, 'stats': _stats(part)}
+                if team not in teams:
+                    teams.append(team)
+                written += 1
+
+            dropped = 0
+            if complete:
+                for key in [key for key in partitions if key not in seen]:
+                    if spec.time_col is None and key[1] != (season or ALL_SEASONS):
+                        continue
+                    stale.append(partitions.pop(key)['path'])
+                    dropped += 1
+                teams = [team for team in teams if any(key[0] == team for key in partitions)]
+
+            if written or dropped or not manifest['partitions']:
+                entries = sorted(partitions.values(), key=lambda e: (teams.index(e['team']), e['season'], e['date']))
+                version = hashlib.sha1(','.join(entry['digest'] for entry in entries).encode()).hexdigest()
+                self._write_manifest(dataset_dir, {
+                    'dataset': dataset, 'version': version, 'team_col': spec.team_col,
+                    'player_col': spec.player_col, 'time_col': spec.time_col,
+                    'columns': list(df.columns), 'teams': teams, 'partitions': entries,
+                })
+            # Replaced and dropped partitions go once the new manifest no longer points at them
+            for path in stale:
+                shutil.rmtree(os.path.join(dataset_dir, path), ignore_errors=True)
+            return written
+
+    def _write_manifest(self, dataset_dir, manifest):
+        os.makedirs(dataset_dir, exist_ok=True)
+        path = os.path.join(dataset_dir, 'manifest.json')
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+
+class ArchiveIndex:
+    """TableIndex-style lookups over an archived dataset, reading a team's partitions on first use.
+
+    The most recently used team frames are kept (``max_teams``), so switching
+    back and forth between teams does not reread them.
+    """
+
+    def __init__(self, archive, dataset, max_teams=8):
+        manifest = archive.manifest(dataset)
+        self.archive = archive
+        self.dataset = dataset
+        self.team_col = manifest['team_col']
+        self.player_col = manifest['player_col']
+        self.teams = list(manifest['teams'])
+        self.max_teams = max_teams
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    @in_phase('filter')
+    def team(self, team, start=None, end=None):
+        """Rows of one team, optionally only those in [start, end) (empty frame for an unknown team)."""
+        if start is not None or end is not None:
+            return self.archive.read(self.dataset, teams=[team], start=start, end=end)
+        with self._lock:
+            if team in self._frames:
+                self._frames.move_to_end(team)
+                return self._frames[team]
+        df = self.archive.read(self.dataset, teams=[team])
+        with self._lock:
+            self._frames[team] = df
+            while len(self._frames) > self.max_teams:
+                self._frames.popitem(last=False)
+        return df
+
+    @in_phase('filter')
+    def team_players(self, team):
+        """Unique player names of one team, in table order."""
+        return self.team(team)[self.player_col].unique()
+
+
+class TeamModels:
+    """Objects built from one team's archived rows when the team is first asked for.
+
+    ``build(df)`` receives the team's rows (only ``columns``, if given); the
+    objects of the most recently used teams are kept (``max_teams``).
+    """
+
+    def __init__(self, archive, dataset, build, columns=None, max_teams=8):
+        self.archive = archive
+        self.dataset = dataset
+        self.build = build
+        self.columns = columns
+        self.max_teams = max_teams
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, team):
+        """The objects built from one team's rows."""
+        with self._lock:
+            if team in self._models:
+                self._models.move_to_end(team)
+                return self._models[team]
+        model = self.build(self.archive.read(self.dataset, teams=[team], columns=self.columns))
+        with self._lock:
+            self._models[team] = model
+            while len(self._models) > self.max_teams:
+                self._models.popitem(last=False)
+        return model
+
+
+class ArchiveDataset(LiveDataset):
+    """LiveDataset over one archived dataset: snapshots hold an ArchiveIndex instead of loaded frames.
+
+    The watcher swaps in a new snapshot when the archive's manifest changes.
+    ``build(index, archive)`` returns any other objects the snapshot needs;
+    ``extra`` names other archived datasets it reads, whose changes swap it too.
+    """
+
+    def __init__(self, name, build=None, archive=None, watch=True, extra=()):
+        super().__init__([name, *extra], build, watch=watch)
+        self.archive = archive or Archive()
+
+    def _versions(self):
+        return {name: self.archive.version(name) for name in self.names}
+
+    def _load(self, versions):
+        index = ArchiveIndex(self.archive, self.names[0])
+        built = self.build(index, self.archive) if self.build is not None else {}
+        return SimpleNamespace(versions=versions, version='+'.join(versions.values()), frames=[], index=index, **built)
+
+
+def build(names=None, data_dir=None, season=None, root=None):
+    """Ingest the current CSV files of each dataset; returns partitions written per dataset.
+
+    Partitions of rows no longer in the CSV files are dropped.
+    """
+    archive = Archive(root)
+    return {name: archive.ingest(name, load_dataset(name, data_dir), season, complete=True) for name in names or DATASETS}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build or query the partitioned sports archive.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="ingest the CSV files of a data directory")
+    build_parser.add_argument('datasets', nargs='*', help="datasets to ingest (default: all)")
+    build_parser.add_argument('--data-dir', help="folder holding the CSV files (default: SPORTS_DATA_DIR)")
+    build_parser.add_argument('--season', help="season label of datasets without timestamps, e.g. 2024-25")
+    query_parser = commands.add_parser('query', help="count the rows and partitions a query reads")
+    query_parser.add_argument('dataset')
+    query_parser.add_argument('--team', action='append', help="team to read (repeatable)")
+    query_parser.add_argument('--season', action='append', help="season to read (repeatable)")
+    query_parser.add_argument('--start', help="first timestamp, e.g. 2025-03-01")
+    query_parser.add_argument('--end', help="timestamp after the last one, e.g. 2025-04-01")
+    query_parser.add_argument('--columns', nargs='+', help="columns to read")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        for name in args.datasets:
+            if name not in DATASETS:
+                parser.error(f"unknown dataset {name!r} (choose from {', '.join(DATASETS)})")
+        for name, written in build(args.datasets, args.data_dir, args.season).items():
+            print(f"  {name:<16} {written} partition(s) written")
+            if name in FULL_READS:
+                lookup, columns = FULL_READS[name]
+                print(f"  {'':<16} the {lookup} reads every partition in archive mode ({', '.join(columns)})")
+    else:
+        archive = Archive()
+        selected = archive.partitions(args.dataset, args.team, args.season, args.start, args.end)
+        df = archive.read(args.dataset, args.team, args.season, args.start, args.end, args.columns)
+        total = len(archive.manifest(args.dataset)['partitions'])
+        print(f"  {len(df)} rows from {len(selected)} of {total} partitions")
@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Benchmarks every dashboard at several data sizes, each size in a fresh process:
+#   python benchmark.py --rows 10 1000 100000 --out results.json
+#   python benchmark.py --rows 10 1000 100000 --baseline results.json
+# Synthetic CSVs are written by synthetic_data.py into a temporary folder. Results are only
+# saved with --out, which is rewritten as each size finishes.
+
+DEFAULT_ROWS = [10, 1000, 100_000]
+
+# Settings of the calling shell that must not leak into the benchmarked process
+CHILD_ENV_DROPPED = ('FOOTBALL_LIVE', 'NBA_LIVE', 'LEADERBOARD_LIVE', 'SPORTS_PRELOAD', 'SPORTS_ARCHIVE',
+                     'SPORTS_ARCHIVE_DIR', 'SPORTS_SNAPSHOT_DIR')
+
+# A metric regresses when it grows by more than this factor over the baseline...
+REGRESSION_RATIO = 1.2
+# ...and by more than this much in absolute terms (ignores timer noise on tiny numbers)
+MIN_DELTA = {'_s': 0.005, '_bytes': 1024, '_kb': 1024}
+
+
+def _first_two(names):
+    names = list(names)
+    return names[0], names[1] if len(names) > 1 else names[0]
+
+
+def _cricket_pair(index):
+    team = index.teams[0]
+    return (team, *_first_two(index.team_players(team)))
+
+
+# Callbacks measured: name -> (dashboard page, function, arguments built from the loaded module)
+CALLBACKS = {
+    'nba.update_graphs': ('nba', 'update_graphs', lambda m: (m.teams[0],)),
+    'football.update_graphs': ('football', 'update_graphs', lambda m: (m.teams[0],)),
+    'football.update_workload': ('football', 'update_workload', lambda m: (m.teams[0], None)),
+    'cricket.update_team_overview': ('cricket', 'update_team_overview', lambda m: (m.cricket_data.current().batting_index.teams[0],)),
+    'cricket.update_team_table': (
+        'cricket', 'update_team_table',
+        lambda m: (m.cricket_data.current().batting_index.teams[0], 0, m.TEAM_TABLE_PAGE_SIZE,
+                   [{'column_id': 'runs', 'direction': 'desc'}], '{average} > 30')),
+    'cricket.compare_batting_players': (
+        'cricket', 'compare_batting_players', lambda m: _cricket_pair(m.cricket_data.current().batting_index)[1:]),
+    'cricket.compare_bowling_players': (
+        'cricket', 'compare_bowling_players', lambda m: _cricket_pair(m.cricket_data.current().bowling_index)[1:]),
+    'multi.cricket_type_dashboard': (
+        'multi', 'cricket_type_dashboard', lambda m: (m.cricket_data('batting').index.teams[0], 'batting')),
+    'multi.cricket_player_comparison': (
+        'multi', 'cricket_player_comparison',
+        lambda m: (*_cricket_pair(m.cricket_data('batting').index)[1:], m.cricket_data('batting').index.teams[0], 'batting')),
+    'multi.update_nba_dashboard': ('multi', 'update_nba_dashboard', lambda m: (m.sport_data('nba').index.teams[0],)),
+    'multi.update_football_dashboard': (
+        'multi', 'update_football_dashboard', lambda m: (m.sport_data('football').index.teams[0],)),
+    'multi.nba_similar_players': (
+        'multi', 'nba_similar_players', lambda m: (m.sport_data('nba').similarity.players()[0],)),
+    'leaderboard.update_leaderboard': (
+        'leaderboard', 'update_leaderboard', lambda m: ('cricket_batting', 'runs', None, 20)),
+    'leaderboard.update_player_rank': (
+        'leaderboard', 'update_player_rank',
+        lambda m: ('nba', 'points per match', m.leaderboard('nba').players()[0])),
+}
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _peak_kb(func, *args):
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _clear_figure_cache(module):
+    if hasattr(module, 'figure_cache'):
+        module.figure_cache.clear()
+
+
+def bench_load(repeat):
+    """Parse, cache-build and cached-load times of every dataset."""
+    import data_loader
+    from schemas import memory_bytes
+
+    results = {}
+    for name in data_loader.DATASETS:
+        parse = []
+        for _ in range(repeat):
+            data_loader._loaded.clear()
+            df, seconds = _timed(data_loader.load_dataset, name, None, None, False)
+            parse.append(seconds)
+        data_loader._loaded.clear()
+        loaded, build = _timed(data_loader.load_dataset, name)
+        cached = []
+        for _ in range(repeat):
+            data_loader._loaded.clear()
+            _, seconds = _timed(data_loader.load_dataset, name)
+            cached.append(seconds)
+        data_loader._loaded.clear()
+        results[name] = {
+            'rows': len(df),
+            'parse_s': statistics.median(parse),
+            'cache_build_s': build,
+            'cache_load_s': statistics.median(cached),
+            'frame_bytes': memory_bytes(loaded),
+            'parse_peak_kb': _peak_kb(data_loader.load_dataset, name, None, None, False),
+        }
+        data_loader._loaded.clear()
+    return results
+
+
+def bench_callbacks(repeat):
+    """Import time of every dashboard, then cold/warm timings of each callback."""
+    from plotly.io.json import to_json_plotly
+
+    import sports_server
+
+    imports, modules = {}, {}
+    for _, (page, _, _) in CALLBACKS.items():
+        if page not in modules:
+            modules[page], imports[page] = _timed(sports_server.load_module, page)
+
+    results = {}
+    for name, (page, func_name, make_args) in CALLBACKS.items():
+        module = modules[page]
+        func = getattr(module, func_name, None)
+        if func is None:
+            continue  # not registered in this SPORTS_FIGURE_MODE (split mode has per-graph callbacks)
+        args = make_args(module)
+
+        output, first = _timed(func, *args)
+        uncached = []
+        for _ in range(repeat):
+            _clear_figure_cache(module)
+            uncached.append(_timed(func, *args)[1])
+        cached = [_timed(func, *args)[1] for _ in range(repeat)]
+        _clear_figure_cache(module)
+        results[name] = {
+            'first_s': first,
+            'uncached_s': statistics.median(uncached),
+            'cached_s': statistics.median(cached),
+            'payload_bytes': len(to_json_plotly(output)),
+            'peak_kb': _peak_kb(func, *args),
+        }
+    return {'import_s': imports, 'callbacks': results}
+
+
+def run_worker(out_path, repeat):
+    """Benchmark the data in SPORTS_DATA_DIR (runs in its own process)."""
+    report = {'load': bench_load(repeat)}
+    report.update(bench_callbacks(repeat))
+    report['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(out_path, 'w') as f:
+        json.dump(report, f)
+
+
+def run_size(rows, repeat, seed):
+    """Generate ``rows`` rows per dataset and benchmark them in a child process."""
+    import synthetic_data
+
+    with tempfile.TemporaryDirectory(prefix=f'sports-bench-{rows}-') as data_dir:
+        _, generate = _timed(synthetic_data.write_all, rows, data_dir, seed)
+        out_path = os.path.join(data_dir, 'result.json')
+        env = dict(os.environ, SPORTS_DATA_DIR=data_dir, SPORTS_CACHE_DIR=os.path.join(data_dir, '.cache'))
+        # Snapshots and the archive default to folders inside the data dir; live and archive modes stay off
+        for var in CHILD_ENV_DROPPED:
+            env.pop(var, None)
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', out_path, '--repeat', str(repeat)],
+                       env=env, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        with open(out_path) as f:
+            report = json.load(f)
+    report['generate_s'] = generate
+    return report
+
+
+def flatten(report, prefix=''):
+    """``{'a': {'b': 1}}`` -> ``{'a/b': 1}`` for the numeric leaves of a report."""
+    flat = {}
+    for key, value in report.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + '/'))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def compare(results, baseline, ratio=REGRESSION_RATIO):
+    """Metrics that regressed against the baseline: list of (metric, old, new)."""
+    old, new = flatten(baseline['results']), flatten(results['results'])
+    regressions = []
+    for metric, value in sorted(new.items()):
+        suffix = next((s for s in MIN_DELTA if metric.endswith(s)), None)
+        if suffix is None or metric not in old or metric.endswith('generate_s'):
+            continue
+        base = old[metric]
+        if value > base * ratio and value - base > MIN_DELTA[suffix]:
+            regressions.append((metric, base, value))
+    return regressions
+
+
+def print_summary(results):
+    for rows, report in results['results'].items():
+        print(f"\n{rows} rows per dataset (max RSS {report['max_rss_kb'] // 1024} MB)")
+        for name, load in report['load'].items():
+            print(f"  load {name:<34} parse {load['parse_s'] * 1000:9.1f} ms"
+                  f"   cached {load['cache_load_s'] * 1000:9.1f} ms   {load['frame_bytes'] / 1024:9.1f} KB")
+        for name, cb in report['callbacks'].items():
+            print(f"  {name:<39} {cb['uncached_s'] * 1000:9.1f} ms   cached {cb['cached_s'] * 1000:9.1f} ms"
+                  f"   {cb['payload_bytes'] / 1024:9.1f} KB   peak {cb['peak_kb'] / 1024:7.1f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark data loading and dashboard callbacks.")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help="rows per dataset to test")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per measurement (median is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="results file to compare against; exits 1 on regressions")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.repeat)
+        sys.exit(0)
+
+    results = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'results': {},
+    }
+    failed = False
+    for rows in args.rows:
+        # Large sizes take minutes each, so progress is reported and results are saved as each size finishes
+        print(f"Benchmarking {rows} rows per dataset...", file=sys.stderr, flush=True)
+        start = time.perf_counter()
+        try:
+            results['results'][str(rows)] = run_size(rows, args.repeat, args.seed)
+        except subprocess.CalledProcessError as e:
+            print(f"Benchmark of {rows} rows failed (exit code {e.returncode})", file=sys.stderr)
+            failed = True
+            break
+        print(f"  done in {time.perf_counter() - start:.1f} s", file=sys.stderr, flush=True)
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(results, f, indent=2)
+    print_summary(results)
+    if args.out:
+        print(f"\nResults written to {args.out}")
+    if failed:
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline)
+        for metric, old, new in regressions:
+            print(f"REGRESSION {metric}: {old:.4g} -> {new:.4g} ({new / old:.2f}x)")
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}")
+        sys.exit(1 if regressions else 0)
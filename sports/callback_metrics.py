@@ -0,0 +1,272 @@
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from dash.exceptions import PreventUpdate
+
+import pages
+
+# Callbacks slower than this many milliseconds are logged (SPORTS_SLOW_CALLBACK_MS, 0 = off)
+SLOW_CALLBACK_MS = float(os.environ.get('SPORTS_SLOW_CALLBACK_MS', 0))
+
+# Upper bounds (seconds) of the callback latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Where a callback's time goes; 'figure' is whatever the callback body spends
+# outside filtering and figure serialization
+PHASES = ('filter', 'figure', 'serialize')
+
+log = logging.getLogger(__name__)
+
+# Call in progress on this thread (set while an instrumented callback runs)
+_state = threading.local()
+
+
+class _Call:
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.stack = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+@contextmanager
+def phase(name):
+    """Attribute the time spent in the block to ``name`` for the running callback.
+
+    Phases nest: an inner phase's time is subtracted from the enclosing one,
+    so every second is counted once. Outside an instrumented callback this
+    does nothing.
+    """
+    call = getattr(_state, 'call', None)
+    if call is None:
+        yield
+        return
+    frame = [0.0]  # time spent in nested phases
+    call.stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        call.stack.pop()
+        call.seconds[name] += elapsed - frame[0]
+        if call.stack:
+            call.stack[-1][0] += elapsed
+
+
+def in_phase(name):
+    """Decorator form of :func:`phase`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def measured(func, *args):
+    """Call ``func`` with phase accounting of its own, for work run on a pool thread.
+
+    Returns ``(result, call)``; time ``func`` spends outside any phase counts
+    as 'figure'. Pass the calls to :func:`add_parallel` in the callback's thread.
+    """
+    call = _state.call = _Call()
+    try:
+        with phase('figure'):
+            result = func(*args)
+    finally:
+        _state.call = None
+    return result, call
+
+
+def add_parallel(calls, seconds):
+    """Attribute ``seconds`` the running callback waited on pool work to the phases of ``calls``.
+
+    The work overlapped, so the wait is split between phases in proportion to
+    the time the workers spent in each. Outside an instrumented callback this
+    does nothing.
+    """
+    call = getattr(_state, 'call', None)
+    if call is None:
+        return
+    total = sum(sum(worker.seconds.values()) for worker in calls)
+    for name in PHASES:
+        spent = sum(worker.seconds[name] for worker in calls)
+        call.seconds[name] += seconds * (spent / total if total else float(name == 'figure'))
+    call.cache_hits += sum(worker.cache_hits for worker in calls)
+    call.cache_misses += sum(worker.cache_misses for worker in calls)
+    if call.stack:
+        call.stack[-1][0] += seconds
+
+
+def count_cache(hit):
+    """Record a figure-cache hit or miss against the running callback."""
+    call = getattr(_state, 'call', None)
+    if call is not None:
+        if hit:
+            call.cache_hits += 1
+        else:
+            call.cache_misses += 1
+
+
+class CallbackMetrics:
+    """Per-callback counters and latency histograms, rendered for Prometheus."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, app_name, callback, seconds, call, payload_bytes, outcome):
+        with self._lock:
+            stats = self._stats.get((app_name, callback))
+            if stats is None:
+                stats = self._stats[(app_name, callback)] = {
+                    'count': 0, 'seconds': 0.0, 'buckets': [0] * len(self.buckets),
+                    'phases': dict.fromkeys(PHASES, 0.0), 'payload_bytes': 0,
+                    'cache_hits': 0, 'cache_misses': 0, 'errors': 0, 'prevented': 0,
+                }
+            stats['count'] += 1
+            stats['seconds'] += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    stats['buckets'][i] += 1
+            for name, value in call.seconds.items():
+                stats['phases'][name] += value
+            stats['payload_bytes'] += payload_bytes
+            stats['cache_hits'] += call.cache_hits
+            stats['cache_misses'] += call.cache_misses
+            if outcome == 'error':
+                stats['errors'] += 1
+            elif outcome == 'prevented':
+                stats['prevented'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {**stats, 'buckets': list(stats['buckets']), 'phases': dict(stats['phases'])}
+                    for key, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        snapshot = sorted(self.snapshot().items())
+        lines = [
+            '# HELP sports_callback_seconds Wall time of Dash callbacks, including response serialization.',
+            '# TYPE sports_callback_seconds histogram',
+        ]
+        for (app_name, callback), stats in snapshot:
+            labels = f'app="{app_name}",callback="{callback}"'
+            for bound, count in zip(self.buckets, stats['buckets']):
+                lines.append(f'sports_callback_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'sports_callback_seconds_bucket{{{labels},le="+Inf"}} {stats["count"]}')
+            lines.append(f'sports_callback_seconds_sum{{{labels}}} {stats["seconds"]:.6f}')
+            lines.append(f'sports_callback_seconds_count{{{labels}}} {stats["count"]}')
+
+        lines += [
+            '# HELP sports_callback_phase_seconds_total Callback time spent filtering data, building figures and serializing.',
+            '# TYPE sports_callback_phase_seconds_total counter',
+        ]
+        for (app_name, callback), stats in snapshot:
+            for name, seconds in stats['phases'].items():
+                lines.append(f'sports_callback_phase_seconds_total{{app="{app_name}",callback="{callback}",'
+                             f'phase="{name}"}} {seconds:.6f}')
+
+        counters = [
+            ('payload_bytes', 'sports_callback_payload_bytes_total', 'Bytes of JSON returned by callbacks.'),
+            ('cache_hits', 'sports_callback_cache_hits_total', 'Figure-cache hits during callbacks.'),
+            ('cache_misses', 'sports_callback_cache_misses_total', 'Figure-cache misses during callbacks.'),
+            ('errors', 'sports_callback_errors_total', 'Callbacks that raised an exception.'),
+            ('prevented', 'sports_callback_prevented_total', 'Callbacks that raised PreventUpdate.'),
+        ]
+        for field, metric, description in counters:
+            lines += [f'# HELP {metric} {description}', f'# TYPE {metric} counter']
+            for (app_name, callback), stats in snapshot:
+                lines.append(f'{metric}{{app="{app_name}",callback="{callback}"}} {stats[field]}')
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by every dashboard in the process
+metrics = CallbackMetrics()
+
+
+def _log_slow(app_name, callback, seconds, call, payload_bytes):
+    phases = ', '.join(f'{name} {value * 1000:.1f} ms' for name, value in call.seconds.items())
+    log.warning("Slow callback %s.%s: %.1f ms (%s), %d bytes, %d cache hits",
+                app_name, callback, seconds * 1000, phases, payload_bytes, call.cache_hits)
+
+
+def _instrument(app_name, name, callback):
+    # ``callback`` is Dash's registered wrapper: the callback body (timed on its own as
+    # 'figure') plus Dash serializing the response
+    @functools.wraps(callback)
+    def wrapper(*args, **kwargs):
+        call = _state.call = _Call()
+        outcome, payload_bytes = 'ok', 0
+        start = time.perf_counter()
+        try:
+            response = callback(*args, **kwargs)
+            payload_bytes = len(response) if isinstance(response, (str, bytes)) else 0
+            return response
+        except PreventUpdate:
+            outcome = 'prevented'
+            raise
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            _state.call = None
+            # Time outside the body (and its nested phases) is Dash serializing the response
+            call.seconds['serialize'] += max(0.0, seconds - sum(call.seconds.values()))
+            metrics.record(app_name, name, seconds, call, payload_bytes, outcome)
+            if SLOW_CALLBACK_MS and seconds * 1000 >= SLOW_CALLBACK_MS:
+                _log_slow(app_name, name, seconds, call, payload_bytes)
+
+    return wrapper
+
+
+def instrument_app(app, app_name):
+    """Record the calls of every callback registered on ``app`` from now on.
+
+    Call right after creating the app, before any ``@app.callback``: each
+    callback body is wrapped before Dash registers it, and the callback Dash
+    registers for it is wrapped in turn. A standalone app also gets a
+    ``/metrics`` route; mounted apps are reported by sports_server.py.
+    """
+    if app.callback_map:
+        raise RuntimeError(f"instrument_app({app_name!r}) must run before callbacks are registered")
+    register = app.callback
+
+    def callback(*args, **kwargs):
+        before = set(app.callback_map)
+        decorate = register(*args, **kwargs)
+
+        def wrap(func):
+            registered = decorate(in_phase('figure')(func))
+            added = [key for key in app.callback_map if key not in before]
+            if not added or not all(callable(app.callback_map[key].get('callback')) for key in added):
+                raise RuntimeError(f"Unrecognised Dash callback registration for {func.__name__}; "
+                                   f"callback_metrics cannot time it")
+            for key in added:
+                app.callback_map[key]['callback'] = _instrument(app_name, func.__name__, app.callback_map[key]['callback'])
+            return registered
+        return wrap
+
+    app.callback = callback
+    if not pages.MOUNTED and 'metrics' not in app.server.view_functions:
+        app.server.add_url_rule('/metrics', 'metrics', metrics_response)
+
+
+def metrics_response():
+    """Flask view returning :data:`metrics` as Prometheus text."""
+    from flask import Response
+
+    return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
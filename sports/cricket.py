@@ -1,30 +1,63 @@
-import pandas as pd
-from dash import Dash, dcc, html
+from dash import Dash, dash_table, dcc, html
 from dash.dependencies import Input, Output
 import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import socket
+from data_loader import cricket_tables
+from data_refresh import LiveDataset
+from figure_cache import FigureCache, figure_key
+from table_index import shared_index
+from paged_table import PagedTable
+from similarity import build_similarity_index
+from pages import url_prefix
+from callback_metrics import instrument_app
 
 # Get local IP address
 hostname = socket.gethostname()
 local_ip = socket.gethostbyname(hostname)
 
-# Load CSV files
-file_paths = [
-    "C://india_batting.csv", "C://australia_batting.csv", "C://england_batting.csv",
-    "C://india_bowling.csv", "C://england_bowling.csv", "C://australia_bowling.csv"
-]
-
-df_list = [pd.read_csv(file, header=0) for file in file_paths]
-df = pd.concat(df_list, ignore_index=True)
-
-# Standardize column names
-df.columns = df.columns.str.strip().str.lower()
-
-# Identify player roles
-df['role'] = df.apply(lambda row: 'Batter' if 'runs' in row and not pd.isna(row['runs']) else 'Bowler', axis=1)
+# Batting stats listed in the team overview table, and the rows sent per page
+TEAM_TABLE_COLUMNS = ['player', 'matches', 'runs', 'average', 'strike rate', 'fours', 'sixes']
+TEAM_TABLE_PAGE_SIZE = 15
+
+def build_cricket(batting_df, bowling_df):
+    # Batting and bowling stay separate tables; player roles come from the source file
+    batting_df, bowling_df, players = cricket_tables(batting_df, bowling_df)
+    # Precompute team -> rows and player -> rows lookups for the callbacks
+    batting_index = shared_index(batting_df, 'team', 'player')
+    return {
+        'players': players,
+        'batting_index': batting_index,
+        'bowling_index': shared_index(bowling_df, 'team', 'player'),
+        # Per-team overview tables, paged, sorted and filtered on the server
+        'team_tables': {team: PagedTable(batting_index.team(team)[TEAM_TABLE_COLUMNS]) for team in batting_index.teams},
+        # Standardised stat vectors per batter and bowler, for "find comparable players" across all teams
+        'similarity_indexes': {
+            'batting': build_similarity_index(batting_df, 'cricket_batting'),
+            'bowling': build_similarity_index(bowling_df, 'cricket_bowling'),
+        },
+    }
+
+# Batting and bowling tables and their lookups, reloaded in the background when a CSV
+# changes; each callback reads one snapshot, so both tables always match
+cricket_data = LiveDataset(['cricket_batting', 'cricket_bowling'], build_cricket)
+
+# Cache rendered player comparisons; keys carry the data version so CSV changes invalidate them
+figure_cache = FigureCache()
+
+# Stats compared per role: (column, chart title, y-axis range)
+COMPARISON_STATS = {
+    'batting': [('average', 'Batting Average', [30, 100]), ('strike rate', 'Strike Rate', [100, 195]),
+                ('fours', 'Fours Scored', [100, 1300]), ('sixes', 'Sixes Scored', [1, 200])],
+    'bowling': [('wickets', 'Total Wickets', [1, 800]), ('economy', 'Bowling Economy', [2, 10]),
+                ('bowling average', 'Bowling Average', [10, 50])],
+}
 
 # Initialize Dash app
-app = Dash(__name__)
+app = Dash(__name__, url_base_pathname=url_prefix('cricket'))
+# Record latency, payload size and cache hits of every callback registered below (served on /metrics)
+instrument_app(app, 'cricket')
 
 app.layout = html.Div(style={'backgroundColor': '#121212', 'padding': '20px'}, children=[
     html.H1("Cricket Analytics Dashboard", style={'textAlign': 'center', 'color': '#FFD700'}),
@@ -32,7 +65,7 @@ app.layout = html.Div(style={'backgroundColor': '#121212', 'padding': '20px'}, c
     # Team Selection
     dcc.Dropdown(
         id='team-dropdown',
-        options=[{'label': team, 'value': team} for team in df['team'].unique()],
+        options=[{'label': team, 'value': team} for team in cricket_data.current().players['team'].unique()],
         placeholder='Select a Team',
         clearable=True,
         style={'width': '50%', 'margin': 'auto'}
@@ -40,6 +73,19 @@ app.layout = html.Div(style={'backgroundColor': '#121212', 'padding': '20px'}, c
 
     html.Div(id='team-overview'),
 
+    # Team Overview Table (only the visible page is sent; sorting and filtering run on the server)
+    dash_table.DataTable(
+        id='team-table',
+        columns=[{'name': col.title(), 'id': col} for col in TEAM_TABLE_COLUMNS],
+        page_action='custom', page_current=0, page_size=TEAM_TABLE_PAGE_SIZE,
+        sort_action='custom', sort_mode='single', sort_by=[],
+        filter_action='custom', filter_query='',
+        style_table={'display': 'none'},
+        style_header={'backgroundColor': '#121212', 'color': 'gold', 'border': '1px solid white'},
+        style_cell={'backgroundColor': '#121212', 'color': 'white', 'border': '1px solid white', 'textAlign': 'center'},
+        style_filter={'backgroundColor': '#1e1e1e', 'color': 'white'}
+    ),
+
     # Player Comparison (Batting)
     html.Div([
         html.H3("Batting Comparison", style={'textAlign': 'center', 'color': '#FFD700'}),
@@ -64,12 +110,30 @@ app.layout = html.Div(style={'backgroundColor': '#121212', 'padding': '20px'}, c
         ], style={'textAlign': 'center'}),
 
         html.Div(id='bowling-comparison-output')
+    ]),
+
+    # Comparable Players (nearest stat profiles across every team)
+    html.Div([
+        html.H3("Find Comparable Players", style={'textAlign': 'center', 'color': '#FFD700'}),
+
+        dcc.RadioItems(
+            id='similar-role',
+            options=[{'label': 'Batters', 'value': 'batting'}, {'label': 'Bowlers', 'value': 'bowling'}],
+            value='batting',
+            labelStyle={'display': 'inline-block', 'margin-right': '10px', 'color': 'white'},
+            style={'textAlign': 'center'}
+        ),
+        dcc.Dropdown(id='similar-player-dropdown', placeholder="Select a Player", style={'width': '50%', 'margin': 'auto'}),
+
+        html.Div(id='similar-players-output')
     ])
 ])
 
 # Callback for Team Overview (ONLY TABLE, NO BAR CHART)
 @app.callback(
     [Output('team-overview', 'children'),
+     Output('team-table', 'style_table'),
+     Output('team-table', 'page_current'),
      Output('batting-player1-dropdown', 'options'),
      Output('batting-player2-dropdown', 'options'),
      Output('bowling-player1-dropdown', 'options'),
@@ -78,25 +142,31 @@ app.layout = html.Div(style={'backgroundColor': '#121212', 'padding': '20px'}, c
 )
 def update_team_overview(selected_team):
     if not selected_team:
-        return html.P("Select a team to view stats.", style={'color': 'white', 'textAlign': 'center'}), [], [], [], []
-
-    team_df = df[df['team'] == selected_team]
+        return html.P("Select a team to view stats.", style={'color': 'white', 'textAlign': 'center'}), {'display': 'none'}, 0, [], [], [], []
 
-    # Filter based on role
-    batting_df = team_df[team_df['role'] == 'Batter']
-    bowling_df = team_df[team_df['role'] == 'Bowler']
+    # Separate dropdown options for Batters & Bowlers
+    data = cricket_data.current()
+    batters = [{'label': player, 'value': player} for player in data.batting_index.team_players(selected_team)]
+    bowlers = [{'label': player, 'value': player} for player in data.bowling_index.team_players(selected_team)]
 
-    # Team Overview Table (Only for Batters)
-    table_header = [html.Th(col.title(), style={'color': 'gold'}) for col in ['Player', 'Matches', 'Runs', 'Average', 'Strike Rate', 'Fours', 'Sixes']]
-    table_rows = [html.Tr([html.Td(batting_df.iloc[i][col]) for col in ['player', 'matches', 'runs', 'average', 'strike rate', 'fours', 'sixes']]) for i in range(len(batting_df))]
-    
-    team_table = html.Table([html.Tr(table_header)] + table_rows, style={'width': '100%', 'border': '1px solid white', 'color': 'white', 'textAlign': 'center'})
+    # The table itself is filled in page by page by update_team_table, starting from the first page
+    return None, {'width': '100%'}, 0, batters, batters, bowlers, bowlers
 
-    # Separate dropdown options for Batters & Bowlers
-    batters = [{'label': player, 'value': player} for player in batting_df['player'].unique()]
-    bowlers = [{'label': player, 'value': player} for player in bowling_df['player'].unique()]
-    
-    return team_table, batters, batters, bowlers, bowlers
+# Callback for one page of the Team Overview Table
+@app.callback(
+    [Output('team-table', 'data'),
+     Output('team-table', 'page_count')],
+    [Input('team-dropdown', 'value'),
+     Input('team-table', 'page_current'),
+     Input('team-table', 'page_size'),
+     Input('team-table', 'sort_by'),
+     Input('team-table', 'filter_query')]
+)
+def update_team_table(selected_team, page_current, page_size, sort_by, filter_query):
+    table = cricket_data.current().team_tables.get(selected_team)
+    if table is None:
+        return [], 1
+    return table.page(page_current, page_size, sort_by, filter_query)
 
 # Callback for Batting Player Comparison
 @app.callback(
@@ -107,25 +177,14 @@ def compare_batting_players(player1, player2):
     if not player1 or not player2:
         return html.P("Select two batting players to compare.", style={'color': 'white', 'textAlign': 'center'})
 
-    player1_df = df[df['player'] == player1]
-    player2_df = df[df['player'] == player2]
-
-    if player1_df.empty or player2_df.empty:
+    data = cricket_data.current()
+    players = data.players
+    if player1 not in players.index or player2 not in players.index:
         return html.P("No data available for one or both players.", style={'color': 'white', 'textAlign': 'center'})
 
-    # Extract Stats
-    p1_stats = player1_df.iloc[0]
-    p2_stats = player2_df.iloc[0]
-
     # Batting Comparison (ONLY FOR BATTERS)
-    if p1_stats['role'] == 'Batter' and p2_stats['role'] == 'Batter':
-        batting_charts = [
-            create_comparison_chart(player1, player2, 'average', 'Batting Average', [30, 100]),
-            create_comparison_chart(player1, player2, 'strike rate', 'Strike Rate', [100, 195]),
-            create_comparison_chart(player1, player2, 'fours', 'Fours Scored', [100, 1300]),
-            create_comparison_chart(player1, player2, 'sixes', 'Sixes Scored', [1, 200])
-        ]
-        return html.Div(batting_charts)
+    if players.at[player1, 'batter'] and players.at[player2, 'batter']:
+        return comparison_graph(data, 'batting', player1, player2)
     
     return html.P("Players must both be batters for comparison.", style={'color': 'white', 'textAlign': 'center'})
 
@@ -138,35 +197,65 @@ def compare_bowling_players(player1, player2):
     if not player1 or not player2:
         return html.P("Select two bowling players to compare.", style={'color': 'white', 'textAlign': 'center'})
 
-    player1_df = df[df['player'] == player1]
-    player2_df = df[df['player'] == player2]
-
-    if player1_df.empty or player2_df.empty:
+    data = cricket_data.current()
+    players = data.players
+    if player1 not in players.index or player2 not in players.index:
         return html.P("No data available for one or both players.", style={'color': 'white', 'textAlign': 'center'})
 
-    # Extract Stats
-    p1_stats = player1_df.iloc[0]
-    p2_stats = player2_df.iloc[0]
-
     # Bowling Comparison (ONLY FOR BOWLERS)
-    if p1_stats['role'] == 'Bowler' and p2_stats['role'] == 'Bowler':
-        bowling_charts = [
-            create_comparison_chart(player1, player2, 'wickets', 'Total Wickets', [1, 800]),
-            create_comparison_chart(player1, player2, 'economy', 'Bowling Economy', [2, 10]),
-            create_comparison_chart(player1, player2, 'bowling average', 'Bowling Average', [10, 50])
-        ]
-        return html.Div(bowling_charts)
+    if players.at[player1, 'bowler'] and players.at[player2, 'bowler']:
+        return comparison_graph(data, 'bowling', player1, player2)
     
     return html.P("Players must both be bowlers for comparison.", style={'color': 'white', 'textAlign': 'center'})
 
-# Function to create bar charts
-def create_comparison_chart(player1, player2, stat, title, y_range=None):
-    comp_df = pd.DataFrame({'Player': [player1, player2], title: [df[df['player'] == player1][stat].values[0], df[df['player'] == player2][stat].values[0]]})
-    fig = px.bar(comp_df, x='Player', y=title, title=title, color='Player')
-    fig.update_layout(plot_bgcolor='#101010', paper_bgcolor='#101010', font=dict(color='white'))
-    if y_range:
-        fig.update_yaxes(range=y_range)
-    return dcc.Graph(figure=fig)
+@app.callback(
+    Output('similar-player-dropdown', 'options'),
+    [Input('similar-role', 'value')]
+)
+def update_similar_options(role):
+    return [{'label': player, 'value': player} for player in cricket_data.current().similarity_indexes[role].players()]
+
+# Callback for Comparable Players
+@app.callback(
+    Output('similar-players-output', 'children'),
+    [Input('similar-role', 'value'), Input('similar-player-dropdown', 'value')]
+)
+def find_similar_players(role, player):
+    if not player:
+        return html.P("Select a player to find the most similar players across all teams.", style={'color': 'white', 'textAlign': 'center'})
+
+    index = cricket_data.current().similarity_indexes[role]
+    similar_df = index.nearest(player, k=5)
+    if similar_df is None:
+        return html.P(f"{player} has no {role} stats.", style={'color': 'white', 'textAlign': 'center'})
+
+    columns = ['team', 'player', 'similarity (%)'] + index.features
+    table_header = [html.Th(col.title(), style={'color': 'gold'}) for col in columns]
+    table_rows = [html.Tr([html.Td(round(value, 2) if isinstance(value, float) else value) for value in row])
+                  for row in similar_df[columns].itertuples(index=False)]
+    return html.Table([html.Tr(table_header)] + table_rows, style={'width': '100%', 'border': '1px solid white', 'color': 'white', 'textAlign': 'center'})
+
+# One cached figure per (role, player pair)
+def comparison_graph(data, role, player1, player2):
+    key = figure_key('cricket', data.version, None, f'{role}-comparison', [player1, player2])
+    index = data.batting_index if role == 'batting' else data.bowling_index
+    return dcc.Graph(figure=figure_cache.get(key, lambda: comparison_figure(index, role, player1, player2)))
+
+# Both players' rows are fetched once; each stat is a bar subplot of a single figure
+def comparison_figure(index, role, player1, player2):
+    stats = COMPARISON_STATS[role]
+    rows = [index.player_row(player1), index.player_row(player2)]
+    colors = px.colors.qualitative.Plotly
+    fig = make_subplots(rows=len(stats), cols=1, subplot_titles=[title for _, title, _ in stats], vertical_spacing=0.08)
+    for i, (stat, title, y_range) in enumerate(stats, start=1):
+        for player, row, color in zip([player1, player2], rows, colors):
+            fig.add_trace(go.Bar(x=[player], y=[row[stat]], name=player, marker_color=color,
+                                 legendgroup=player, showlegend=i == 1), row=i, col=1)
+        if y_range:
+            fig.update_yaxes(range=y_range, row=i, col=1)
+    fig.update_layout(height=350 * len(stats), legend_title_text='Player',
+                      plot_bgcolor='#101010', paper_bgcolor='#101010', font=dict(color='white'))
+    return fig
 
 if __name__ == '__main__':
     print(f"\nServer running at: http://{local_ip}:8010/\n")
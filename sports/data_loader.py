@@ -0,0 +1,264 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from schemas import apply_schema
+
+# Folder holding the source CSV files (override with SPORTS_DATA_DIR)
+DATA_DIR = os.environ.get(
+    'SPORTS_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'csv files')
+)
+
+# Folder holding the normalised columnar cache (override with SPORTS_CACHE_DIR, which then
+# also holds the cache of datasets loaded from another data_dir)
+CACHE_DIR_OVERRIDE = os.environ.get('SPORTS_CACHE_DIR')
+CACHE_DIR = CACHE_DIR_OVERRIDE or os.path.join(DATA_DIR, '.cache')
+
+# Bump when the on-disk cache layout or the normalisation changes
+CACHE_VERSION = 4
+
+# Source CSV files making up each dataset
+DATASETS = {
+    'cricket_batting': ['india_batting.csv', 'australia_batting.csv', 'england_batting.csv'],
+    'cricket_bowling': ['india_bowling.csv', 'england_bowling.csv', 'australia_bowling.csv'],
+    'nba': ['lakers_nba.csv', 'warriors_nba.csv', 'bucks_nba.csv', 'celtics_nba.csv'],
+    # Per-game box scores (one row per player and game) behind the NBA season totals
+    'nba_games': ['lakers_nba_games.csv', 'warriors_nba_games.csv', 'bucks_nba_games.csv', 'celtics_nba_games.csv'],
+    'football': [
+        'fc_barcelona_analytics_updated.csv',
+        'real_madrid_analytics_updated.csv',
+        'manchester_united_analytics_updated.csv',
+        'liverpool_analytics_updated.csv',
+        'bayern_munich_analytics_updated.csv',
+    ],
+}
+
+log = logging.getLogger(__name__)
+
+# Frames already loaded in this process: (name, data dir) -> (cache key, DataFrame)
+_loaded = {}
+# One load at a time per dataset, so concurrent callers share a rebuild instead of repeating it
+_load_locks = {}
+_load_locks_lock = threading.Lock()
+
+
+def source_paths(name, data_dir=None):
+    """Absolute paths of the CSV files behind a dataset."""
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset: {name}")
+    data_dir = data_dir or DATA_DIR
+    return [os.path.join(data_dir, file) for file in DATASETS[name]]
+
+
+def file_stamp(path):
+    """Size and mtime of a source file, which change whenever it is rewritten."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def data_version(name, data_dir=None):
+    """Cache key of a dataset, derived from its source files' size and mtime."""
+    digest = hashlib.sha1(f"v{CACHE_VERSION}:{name}".encode())
+    for path in source_paths(name, data_dir):
+        digest.update(f"{os.path.basename(path)}:{file_stamp(path)}".encode())
+    return digest.hexdigest()
+
+
+def normalize_columns(df):
+    """Strip and lowercase column names."""
+    df.columns = df.columns.str.strip().str.lower()
+    return df
+
+
+def read_csv_files(paths):
+    """Parse and concatenate CSV files into one normalised DataFrame."""
+    df = pd.concat([pd.read_csv(path, header=0) for path in paths], ignore_index=True)
+    return normalize_columns(df)
+
+
+def write_columns(df, path, **meta):
+    """Write a frame as one .npy file per column plus manifest.json (with ``meta``), atomically.
+
+    Numeric columns are stored as raw .npy arrays (in their compact dtype),
+    datetimes as int64 nanoseconds, categorical columns as their codes +
+    labels and text columns as int32 codes + labels.
+    """
+    tmp_path = f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        entry = {'name': col, 'file': f"col_{i}.npy"}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry['kind'] = 'category'
+            entry['labels'] = [str(label) for label in series.cat.categories]
+            array = series.cat.codes.to_numpy()
+        elif pd.api.types.is_datetime64_dtype(series):
+            entry['kind'] = 'time'
+            array = series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            entry['kind'] = 'numeric'
+            array = series.to_numpy()
+        else:
+            codes, labels = pd.factorize(series)
+            entry['kind'] = 'text'
+            entry['labels'] = [str(label) for label in labels]
+            array = codes.astype(np.int32)
+        np.save(os.path.join(tmp_path, entry['file']), array)
+        columns.append(entry)
+
+    with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+        json.dump({**meta, 'rows': len(df), 'columns': columns}, f)
+
+    # Swap the finished directory into place so readers never see a partial write
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(path):
+    """manifest.json of a directory written by write_columns (None if missing or unreadable)."""
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_columns(path, columns=None, manifest=None):
+    """Memory-map a directory written by write_columns, reading only ``columns`` if given."""
+    manifest = manifest or read_manifest(path)
+    data = {}
+    for entry in manifest['columns']:
+        if columns is not None and entry['name'] not in columns:
+            continue
+        array = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'text':
+            labels = np.array(entry['labels'] + [np.nan], dtype=object)
+            array = labels[array]  # code -1 (missing) picks the trailing NaN
+        elif entry['kind'] == 'category':
+            array = pd.Categorical.from_codes(array, entry['labels'])
+        elif entry['kind'] == 'time':
+            array = array.view('datetime64[ns]')
+        data[entry['name']] = array
+
+    # copy=False keeps numeric columns backed by the memory-mapped files
+    return pd.DataFrame(data, index=pd.RangeIndex(manifest['rows']), copy=False)
+
+
+def _write_cache(df, cache_path, key, sources):
+    # ``sources`` records each source file's stamp and row count, so a later
+    # rebuild can keep the rows of the files that did not change
+    write_columns(df, cache_path, key=key, version=CACHE_VERSION, sources=sources)
+
+
+def _read_cache(cache_path, key, manifest=None):
+    manifest = manifest or read_manifest(cache_path)
+    if manifest is None or manifest.get('key') != key:
+        return None
+    return read_columns(cache_path, manifest=manifest)
+
+
+def _cached_sources(cache_path):
+    # Rows of the previous cache by source file: (file name, stamp) -> frame slice
+    manifest = read_manifest(cache_path)
+    if manifest is None or manifest.get('version') != CACHE_VERSION or not manifest.get('sources'):
+        return {}
+    df = _read_cache(cache_path, manifest['key'], manifest)
+    parts, start = {}, 0
+    for source in manifest['sources']:
+        parts[source['file'], source['stamp']] = df.iloc[start:start + source['rows']]
+        start += source['rows']
+    return parts
+
+
+def read_dataset(name, data_dir=None, cached=None):
+    """Parse a dataset's CSV files into one compact frame, with per-file (name, stamp, rows).
+
+    Files found unchanged in ``cached`` ((file name, stamp) -> rows, as kept in
+    the cache manifest) are taken from there instead of being parsed again.
+    """
+    parts, sources = [], []
+    for path in source_paths(name, data_dir):
+        file, stamp = os.path.basename(path), file_stamp(path)
+        part = (cached or {}).get((file, stamp))
+        if part is None:
+            part = apply_schema(read_csv_files([path]), name)
+        parts.append(part)
+        sources.append({'file': file, 'stamp': stamp, 'rows': len(part)})
+    # Labels differ between files, so categorical columns are rebuilt over the whole dataset
+    return apply_schema(pd.concat(parts, ignore_index=True), name), sources
+
+
+def load_dataset(name, data_dir=None, cache_dir=None, use_cache=True):
+    """Load a dataset as a normalised, compact DataFrame, reusing the on-disk cache when fresh.
+
+    Columns get the dtypes registered in schemas.SCHEMAS: categorical labels,
+    parsed timestamps and downcast numbers. When only some source files
+    changed, just those are parsed again.
+    """
+    key = data_version(name, data_dir)
+    memo_key = (name, data_dir or DATA_DIR)
+    if memo_key in _loaded and _loaded[memo_key][0] == key:
+        return _loaded[memo_key][1]
+
+    with _load_locks_lock:
+        lock = _load_locks.setdefault(memo_key, threading.Lock())
+    with lock:
+        if memo_key in _loaded and _loaded[memo_key][0] == key:
+            return _loaded[memo_key][1]
+
+        if cache_dir is None:
+            cache_dir = CACHE_DIR_OVERRIDE or (os.path.join(data_dir, '.cache') if data_dir else CACHE_DIR)
+        cache_path = os.path.join(cache_dir, name)
+        df = _read_cache(cache_path, key) if use_cache else None
+        if df is None:
+            df, sources = read_dataset(name, data_dir, _cached_sources(cache_path) if use_cache else None)
+            if use_cache:
+                try:
+                    _write_cache(df, cache_path, key, sources)
+                except OSError as e:
+                    log.warning("Could not write cache for %s: %s", name, e)
+                else:
+                    df = _read_cache(cache_path, key)
+
+        _loaded[memo_key] = (key, df)
+        return df
+
+
+def load_cricket(data_dir=None):
+    """Load batting and bowling as separate tables sharing one player index.
+
+    Role comes from the source file, so no row-wise classification is needed.
+    Returns (batting_df, bowling_df, players): see cricket_tables.
+    """
+    return cricket_tables(load_dataset('cricket_batting', data_dir), load_dataset('cricket_bowling', data_dir))
+
+
+def cricket_tables(batting_df, bowling_df):
+    """Link loaded batting and bowling tables through one player index.
+
+    Returns (batting_df, bowling_df, players): ``players`` is indexed by player
+    name and holds a 'player_id', the team and 'batter'/'bowler' flags; both
+    tables carry the matching 'player_id' column.
+    """
+    roster = pd.concat([batting_df[['player', 'team']], bowling_df[['player', 'team']]]).drop_duplicates('player')
+    names = pd.Index(roster['player'], name='player')
+    players = pd.DataFrame({
+        'player_id': np.arange(len(names), dtype=np.int32),
+        'team': roster['team'].to_numpy(),
+        'batter': names.isin(batting_df['player']),
+        'bowler': names.isin(bowling_df['player']),
+    }, index=names)
+
+    batting_df = batting_df.assign(player_id=names.get_indexer(batting_df['player']).astype(np.int32))
+    bowling_df = bowling_df.assign(player_id=names.get_indexer(bowling_df['player']).astype(np.int32))
+    return batting_df, bowling_df, players
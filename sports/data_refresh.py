@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+import traceback
+from types import SimpleNamespace
+
+from data_loader import load_dataset, data_version
+
+# Seconds between checks of the source CSV files for changes (SPORTS_REFRESH_SECONDS, 0 = never).
+# A change is loaded once the files have looked the same for two checks in a row, so a
+# file still being copied in is not read half-written.
+REFRESH_SECONDS = float(os.environ.get('SPORTS_REFRESH_SECONDS', 10))
+
+# Datasets checked by the watcher thread, and the process it runs in
+_watched = []
+_watcher_pid = None
+_deferred_pid = None
+_watcher_lock = threading.Lock()
+
+
+class LiveDataset:
+    """Datasets plus everything derived from them, replaced as one unit when their CSV files change.
+
+    ``build(*frames)`` returns the derived objects (indexes, aggregates, models)
+    as a dict. current() returns an immutable snapshot of the frames, those
+    objects and the data versions; the watcher thread loads changed files and
+    builds the next snapshot off the request path, then swaps it in with a
+    single assignment. A callback that takes one snapshot and reads only from
+    it therefore sees one consistent version, even if a refresh lands meanwhile.
+    """
+
+    def __init__(self, names, build=None, data_dir=None, watch=True):
+        self.names = list(names)
+        self.build = build
+        self.data_dir = data_dir
+        self.watch = watch
+        self._snapshot = None
+        self._pending = None
+        self._failed = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """Latest snapshot: ``versions`` (dataset -> data version), ``version``, ``frames`` and the built objects.
+
+        The first call loads the datasets; later calls never wait for a refresh.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load(self._versions())
+                    if self.watch:
+                        _watched.append(self)
+                snapshot = self._snapshot
+        if self.watch:
+            _start_watcher()
+        return snapshot
+
+    def refresh(self, settle=False):
+        """Swap in a new snapshot if a source file changed; True when it did.
+
+        With ``settle``, a change is only loaded once a previous call saw the same files.
+        """
+        if self._snapshot is None:
+            return False
+        try:
+            versions = self._versions()
+        except OSError:
+            return False  # a file is being replaced; look again next time
+        if versions == self._snapshot.versions:
+            self._pending = None
+            return False
+        if versions == self._failed:
+            return False  # already failed to load; wait for the files to change again
+        if settle and versions != self._pending:
+            self._pending = versions
+            return False
+        with self._lock:
+            if versions == self._snapshot.versions:
+                return False
+            try:
+                self._snapshot = self._load(versions)
+            except Exception:
+                self._failed = versions
+                raise
+            self._pending = None
+        return True
+
+    def _versions(self):
+        return {name: data_version(name, self.data_dir) for name in self.names}
+
+    def _load(self, versions):
+        frames = [load_dataset(name, self.data_dir) for name in self.names]
+        built = self.build(*frames) if self.build is not None else {}
+        return SimpleNamespace(versions=versions, version='+'.join(versions.values()), frames=frames, **built)
+
+
+def defer_watcher():
+    """Keep this process from starting the watcher thread (a preloading master: threads do not survive fork)."""
+    global _deferred_pid
+    _deferred_pid = os.getpid()
+
+
+def refresh_all(settle=False):
+    """Refresh every watched dataset; returns the number swapped."""
+    swapped = 0
+    for live in list(_watched):
+        try:
+            swapped += live.refresh(settle)
+        except Exception:
+            # Keep serving the previous snapshot (e.g. a malformed CSV) until the files change again
+            print(f"Could not refresh {', '.join(live.names)}:")
+            traceback.print_exc()
+    return swapped
+
+
+def _start_watcher():
+    # Started on first use, and again in a forked worker
+    global _watcher_pid
+    pid = os.getpid()
+    if REFRESH_SECONDS <= 0 or _watcher_pid == pid or _deferred_pid == pid:
+        return
+    with _watcher_lock:
+        if _watcher_pid != pid:
+            threading.Thread(target=_watch, name='data-refresh', daemon=True).start()
+            _watcher_pid = pid
+
+
+def _watch():
+    while True:
+        time.sleep(REFRESH_SECONDS)
+        refresh_all(settle=True)
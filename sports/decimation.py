@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from callback_metrics import in_phase
+
+
+def _as_numeric_x(values):
+    # Timestamps (strings or datetime64) become int64 nanoseconds so they can be bucketed
+    if pd.api.types.is_numeric_dtype(values):
+        return np.asarray(values, dtype=np.float64)
+    return pd.to_datetime(values).to_numpy(dtype='datetime64[ns]').view(np.int64).astype(np.float64)
+
+
+def minmax_indices(x, y, n_out):
+    """At most ``n_out`` positions: the first and last, and the min and max ``y`` of equal-width x buckets.
+
+    ``x`` must be sorted. Peaks survive at any zoom level, which makes this the
+    safe choice for multi-series charts sharing one x axis.
+    """
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 4:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+    n_buckets = (n_out - 2) // 2
+    span = x[-1] - x[0]
+    if span <= 0:
+        bucket = (np.arange(n) * n_buckets) // n
+    else:
+        bucket = np.minimum(((x - x[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+
+    # Sort by (bucket, y): the first and last entry of each bucket are its min and max
+    order = np.lexsort((np.nan_to_num(y, nan=np.inf), bucket))
+    sorted_buckets = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    return np.unique(np.concatenate([[0, n - 1], order[starts], order[ends]]))
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets selection of ``n_out`` positions (``x`` sorted)."""
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0))) if hi > lo else lo
+        keep[i + 1] = a
+    return np.unique(keep)
+
+
+@in_phase('filter')
+def decimate(df, x_col, y_cols, max_points, x_range=None, method='minmax'):
+    """Rows of ``df`` (sorted by ``x_col``) reduced to at most ``max_points``.
+
+    ``x_range`` limits the result to a zoom window first, so zooming in re-fetches
+    full detail. With several ``y_cols`` the kept rows are the union over series,
+    each series selecting from an equal share of ``max_points``.
+    """
+    df = df.sort_values(x_col, kind='stable')
+    x = _as_numeric_x(df[x_col])
+    if x_range is not None:
+        lo, hi = _as_numeric_x(pd.Series(list(x_range)))
+        mask = (x >= lo) & (x <= hi)
+        df, x = df[mask], x[mask]
+    if len(df) <= max_points:
+        return df
+
+    select = lttb_indices if method == 'lttb' else minmax_indices
+    share = max_points // max(len(y_cols), 1)
+    keep = [select(x, df[col].to_numpy(dtype=np.float64), share) for col in y_cols]
+    return df.iloc[np.unique(np.concatenate(keep))]
+
+
+@in_phase('filter')
+def decimate_groups(df, group_col, x_col, y_cols, max_points_per_group, method='minmax'):
+    """Apply :func:`decimate` separately to every group (e.g. per player)."""
+    parts = [decimate(group, x_col, y_cols, max_points_per_group, method=method)
+             for _, group in df.groupby(group_col, sort=False)]
+    return pd.concat(parts) if parts else df
+
+
+def relayout_x_range(relayout_data, axis='xaxis'):
+    """Zoom window from a graph's ``relayoutData``.
+
+    Returns ``(lo, hi)`` for a zoom, ``False`` when the axis was reset to
+    autorange, and ``None`` when the event did not touch this axis.
+    """
+    if not relayout_data:
+        return None
+    if relayout_data.get(f'{axis}.autorange'):
+        return False
+    if f'{axis}.range[0]' in relayout_data:
+        return relayout_data[f'{axis}.range[0]'], relayout_data[f'{axis}.range[1]']
+    if f'{axis}.range' in relayout_data:
+        return tuple(relayout_data[f'{axis}.range'])
+    return None
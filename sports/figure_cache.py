@@ -0,0 +1,108 @@
+import json
+import threading
+from collections import OrderedDict
+
+from callback_metrics import count_cache, in_phase
+
+
+def figure_key(sport, version, team, view, players=None):
+    """Cache key for one rendered view; ``version`` is the dataset's data_version()."""
+    return (sport, version, team, view, tuple(players) if players else ())
+
+
+class FigureCache:
+    """Bounded LRU cache of serialized Plotly figures.
+
+    Entries are stored as plain JSON-ready dicts so a hit skips both
+    plotly.express and figure validation. The cache is bounded by entry count
+    and by total serialized bytes; storing a key with a new data version for a
+    sport drops that sport's entries built from older data.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, build):
+        """Return the cached figure(s) for key, calling ``build()`` on a miss.
+
+        ``build`` may return one figure or a list/tuple of figures; the cached
+        value keeps the same shape.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count_cache(True)
+                return self._entries[key][0]
+            self.misses += 1
+        count_cache(False)
+
+        value, size = _serialize(build())
+
+        with self._lock:
+            self._drop_stale(key)
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self.bytes += size
+            self._evict()
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def _drop_stale(self, key):
+        sport, version = key[0], key[1]
+        stale = [k for k in self._entries if k[0] == sport and k[1] != version]
+        for k in stale:
+            self.bytes -= self._entries.pop(k)[1]
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            self.bytes -= self._entries.popitem(last=False)[1][1]
+            self.evictions += 1
+
+
+class FigureJSON(dict):
+    """A figure already serialized to a JSON-ready dict, with its encoded size."""
+
+    nbytes = 0
+
+
+@in_phase('serialize')
+def serialize_figure(figure):
+    """Plotly figure -> FigureJSON (figures already serialized pass through)."""
+    if isinstance(figure, FigureJSON):
+        return figure
+    text = figure.to_json()
+    value = FigureJSON(json.loads(text))
+    value.nbytes = len(text)
+    return value
+
+
+def _serialize(figures):
+    if isinstance(figures, (list, tuple)):
+        value = type(figures)(serialize_figure(figure) for figure in figures)
+        return value, sum(figure.nbytes for figure in value)
+    value = serialize_figure(figures)
+    return value, value.nbytes
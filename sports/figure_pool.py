@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.io as pio
+from dash.dependencies import Output
+
+from callback_metrics import add_parallel, measured
+from figure_cache import serialize_figure
+
+# How multi-figure callbacks build their figures (SPORTS_FIGURE_MODE):
+#   'thread' - one callback, figures built and serialized concurrently in a shared pool
+#   'serial' - one callback, figures built one after another
+#   'split'  - one callback per graph, so the browser draws each figure when it is ready
+FIGURE_MODE = os.environ.get('SPORTS_FIGURE_MODE', 'thread')
+
+# Threads in the shared pool, across all requests of the process (SPORTS_FIGURE_WORKERS)
+FIGURE_WORKERS = int(os.environ.get('SPORTS_FIGURE_WORKERS', min(4, os.cpu_count() or 1)))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    # Created on first use, and again in a forked worker (threads do not survive fork)
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _warm_template()
+            _executor = ThreadPoolExecutor(FIGURE_WORKERS, thread_name_prefix='figure-build')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _warm_template():
+    # Plotly creates a template's nested objects on first access, and two threads doing that
+    # at once fail with "Invalid value"; touch what plotly express reads before building in parallel
+    template = pio.templates[pio.templates.default]
+    template.layout.colorscale.sequential, template.layout.colorscale.diverging, template.layout.colorway
+    for trace_type in template.data:
+        for trace in template.data[trace_type]:
+            for prop in ('marker', 'line'):
+                if prop in trace and 'pattern' in trace[prop]:
+                    trace[prop].pattern.shape
+
+
+def _build(func, args):
+    return serialize_figure(func(*args))
+
+
+def build_figures(builders):
+    """Build and serialize independent figures, given as ``(func, *args)`` tuples.
+
+    Returns the serialized figures in order. In 'thread' mode they are built
+    concurrently in the shared pool; otherwise one after another.
+    """
+    if FIGURE_MODE != 'thread' or FIGURE_WORKERS < 2 or len(builders) < 2:
+        return [_build(func, args) for func, *args in builders]
+    # Each build keeps its own phase timings, merged into the calling callback's once all are done
+    start = time.perf_counter()
+    futures = [_pool().submit(measured, _build, func, args) for func, *args in builders]
+    results = [future.result() for future in futures]
+    add_parallel([call for _, call in results], time.perf_counter() - start)
+    return [figure for figure, _ in results]
+
+
+def split_callbacks(app, graph_ids, inputs, figure_for):
+    """Register one callback per graph, each returning ``figure_for(graph_id, *input values)``."""
+    for graph_id in graph_ids:
+        app.callback(Output(graph_id, 'figure'), inputs)(_graph_callback(graph_id, figure_for))
+
+
+def _graph_callback(graph_id, figure_for):
+    def update_graph(*values):
+        return figure_for(graph_id, *values)
+    update_graph.__name__ = 'update_' + graph_id.replace('-', '_')
+    return update_graph
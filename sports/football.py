@@ -1,38 +1,119 @@
-import pandas as pd
 from dash import Dash, dcc, html
-from dash.dependencies import Input, Output
+from dash import no_update
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
 import plotly.express as px
+import pandas as pd
+import os
 import socket
+import threading
+from types import SimpleNamespace
+from data_loader import source_paths
+from archive import ARCHIVE_MODE, ArchiveDataset, TeamModels
+from data_refresh import LiveDataset
+from figure_cache import FigureCache, figure_key
+from figure_pool import FIGURE_MODE, build_figures, split_callbacks
+from snapshots import snapshots
+from table_index import shared_index
+from pages import url_prefix
+from callback_metrics import instrument_app
+from heatmap import OccupancyCube, PitchGrid, pitch_heatmap_figure
+from workload import WorkloadModel
+from decimation import decimate, decimate_groups, relayout_x_range
+from tracking_stream import TrackingStore, CsvTailer, QueueSource, StreamIngestor, extend_payload
 
 # Get the local IP address
 hostname = socket.gethostname()
 local_ip = socket.gethostbyname(hostname)
 
-# Load multiple CSV files and merge them into one DataFrame
-file_paths = [
-    "C:/fc_barcelona_analytics_updated.csv",
-    "C:/real_madrid_analytics_updated.csv",
-    "C:/manchester_united_analytics_updated.csv",
-    "C:/liverpool_analytics_updated.csv",
-    "C:/bayern_munich_analytics_updated.csv"
-]
+# Zone occupancy per player in HEATMAP_BLOCK_SECONDS blocks, for windowed pitch heatmaps
+HEATMAP_BLOCK_SECONDS = int(os.environ.get('FOOTBALL_HEATMAP_BLOCK_SECONDS', 60))
+
+# Live mode (FOOTBALL_LIVE=1): rows appended to the club CSVs, or pushed onto live_queue,
+# are ingested into a ring buffer and streamed to the tracking chart via extendData
+LIVE_MODE = os.environ.get('FOOTBALL_LIVE') == '1'
+LIVE_INTERVAL_MS = int(os.environ.get('FOOTBALL_LIVE_INTERVAL_MS', 1000))
+
+def build_models(df):
+    return {
+        'heatmap_cube': OccupancyCube.from_frame(df, grid=PitchGrid(), block_seconds=HEATMAP_BLOCK_SECONDS),
+        # Rolling load, fatigue, injury risk and substitution time per player, derived from the raw samples
+        'workload': WorkloadModel.from_frame(df),
+    }
+
+def build_football(df):
+    # Debug: Print column names to check if 'team name' exists
+    print("Columns in DataFrame:", df.columns)
+
+    # Check if 'team name' exists
+    if 'team name' not in df.columns:
+        raise ValueError("Column 'Team Name' not found in CSV files! Check column names.")
+
+    # Precompute team -> rows and player -> rows lookups for the callbacks
+    index = shared_index(df, 'team name', 'player name')
+    return {'index': index, **build_models(index.df)}
+
+# Columns the heatmap and workload models read
+MODEL_COLUMNS = ['team name', 'player name', 'timestamp', 'x coordinate', 'y coordinate', 'speed (m/s)',
+                 'acceleration (m/s²)', 'heart rate (bpm)', 'sprint count', 'distance covered (m)']
+
+def build_football_archive(index, archive):
+    # Team views read their partitions on demand; a team's models are built from only their columns
+    # of its partitions when the team is first shown
+    columns = [col for col in MODEL_COLUMNS if col in archive.manifest('football')['columns']]
+    return {'team_models': TeamModels(archive, 'football', lambda df: SimpleNamespace(**build_models(df)), columns)}
+
+# All club files as one DataFrame (column names come back stripped & lowercased) and the models
+# built from it; reloaded in the background when a CSV changes, each callback reading one snapshot.
+# Live mode streams appended rows into the same models instead, so its snapshot is never replaced.
+# In archive mode (SPORTS_ARCHIVE=1, not with live mode) a team's rows come from its archive partitions.
+if ARCHIVE_MODE and not LIVE_MODE:
+    football_data = ArchiveDataset('football', build_football_archive)
+else:
+    football_data = LiveDataset(['football'], build_football, watch=not LIVE_MODE)
+teams = football_data.current().index.teams
+
+# Cache rendered team views; keys carry the data version so CSV changes invalidate them
+figure_cache = FigureCache()
+
+# Columns plotted over time in the 'Tracking Data' chart (one trace each, in this order)
+TRACKING_COLUMNS = ['speed (m/s)', 'acceleration (m/s²)', 'distance covered (m)']
 
-df_list = [pd.read_csv(file, header=0) for file in file_paths]  # Ensure header row is read correctly
-df = pd.concat(df_list, ignore_index=True)
+# Point budgets sent to the browser: the tracking chart per zoom window, the faceted scatter per player
+MAX_TRACKING_POINTS = int(os.environ.get('FOOTBALL_MAX_POINTS', 2000))
+MAX_POINTS_PER_PLAYER = int(os.environ.get('FOOTBALL_MAX_POINTS_PER_PLAYER', 500))
 
-# Standardize column names (strip spaces & lowercase)
-df.columns = df.columns.str.strip()
-df.columns = df.columns.str.lower()
+live_store = None
+live_queue = None
+if LIVE_MODE:
+    live_store = TrackingStore.from_frame(football_data.current().index.df, capacity=int(os.environ.get('FOOTBALL_LIVE_CAPACITY', 1_000_000)))
+    live_source = QueueSource()
+    live_queue = live_source.queue
+    StreamIngestor(live_store, [CsvTailer(path) for path in source_paths('football')] + [live_source]).start()
 
-# Debug: Print column names to check if 'team name' exists
-print("Columns in DataFrame:", df.columns)
+live_seq = live_store.seq if live_store is not None else 0
+live_lock = threading.Lock()
 
-# Check if 'team name' exists
-if 'team name' not in df.columns:
-    raise ValueError("Column 'Team Name' not found in CSV files! Check column names.")
+def sync_live_models():
+    # The current snapshot; in live mode, its heatmap and workload models are first fed
+    # the samples ingested since the last request
+    global live_seq
+    data = football_data.current()
+    if live_store is not None:
+        with live_lock:
+            new_df, live_seq = live_store.frame(since=live_seq)
+            data.heatmap_cube.add(new_df)
+            data.workload.add(new_df)
+    return data
+
+def team_models(data, team):
+    # The snapshot's heatmap and workload models, or in archive mode the team's own
+    return data.team_models.get(team) if isinstance(football_data, ArchiveDataset) else data
 
 # Create Dash app
-app = Dash(__name__)
+app = Dash(__name__, url_base_pathname=url_prefix('football'))
+# Record latency, payload size and cache hits of every callback registered below (served on /metrics)
+instrument_app(app, 'football')
 
 app.layout = html.Div(children=[
     html.H1("Sports Analytics Dashboard", style={
@@ -41,8 +122,8 @@ app.layout = html.Div(children=[
     
     dcc.Dropdown(
         id='team-dropdown',
-        options=[{'label': team, 'value': team} for team in df['team name'].unique()],
-        value=df['team name'].unique()[0],
+        options=[{'label': team, 'value': team} for team in teams],
+        value=teams[0],
         clearable=False,
         style={
             'width': '50%', 'margin': 'auto', 'backgroundColor': '#101010', 'borderRadius': '10px',
@@ -58,59 +139,230 @@ app.layout = html.Div(children=[
         dcc.Graph(id='ai-insights')
     ], style={'padding': '20px'}),
 
+    # Pitch Heatmap (team or single player, over a window of match minutes)
+    html.Div([
+        dcc.Dropdown(id='heatmap-player', placeholder='All players', clearable=True,
+                     style={'width': '50%', 'margin': 'auto', 'backgroundColor': '#101010'}),
+        # Spans the selected team's match blocks once update_heatmap_controls runs
+        dcc.RangeSlider(id='heatmap-window', min=0, max=1, step=1, value=[0, 1]),
+        dcc.Graph(id='pitch-heatmap')
+    ], style={'padding': '20px'}),
+
+    # Fatigue and injury risk derived from the tracking samples (refreshed live with FOOTBALL_LIVE=1)
+    html.Div([dcc.Graph(id='workload')], style={'padding': '20px'}),
+
+    # Live tracking refresh (disabled unless FOOTBALL_LIVE=1)
+    dcc.Interval(id='live-interval', interval=LIVE_INTERVAL_MS, disabled=not LIVE_MODE),
+    dcc.Store(id='live-cursor'),
+
 ], style={
     'backgroundImage': 'url("https://web-assets.hyscaler.com/wp-content/uploads-webpc/uploads/2023/11/ai-in-sports-4.png.webp")',
     'backgroundSize': 'cover', 'padding': '20px', 'color': 'white'
 })
 
 @app.callback(
-    [Output('team-performance', 'figure'),
-     Output('player-performance', 'figure'),
-     Output('tracking-data', 'figure'),
-     Output('physical-attributes', 'figure'),
-     Output('ai-insights', 'figure')],
+    [Output('tracking-data', 'extendData'),
+     Output('live-cursor', 'data', allow_duplicate=True)],
+    [Input('live-interval', 'n_intervals')],
+    [State('team-dropdown', 'value'), State('live-cursor', 'data')],
+    prevent_initial_call=True
+)
+def extend_tracking(n_intervals, selected_team, cursor):
+    if live_store is None or not cursor:
+        raise PreventUpdate
+    if cursor['team'] != selected_team:
+        # The chart is being redrawn for another team; resume from the newest sample
+        return no_update, {'team': selected_team, 'seq': live_store.seq}
+
+    new_df, seq = live_store.frame(since=cursor['seq'], team=selected_team)
+    if new_df.empty:
+        raise PreventUpdate
+    # The chart keeps the newest MAX_TRACKING_POINTS per trace, so a larger burst is decimated first
+    new_df = decimate(new_df, 'timestamp', TRACKING_COLUMNS, MAX_TRACKING_POINTS)
+    payload = extend_payload(new_df, TRACKING_COLUMNS)
+    return (payload, list(range(len(TRACKING_COLUMNS))), MAX_TRACKING_POINTS), {'team': selected_team, 'seq': seq}
+
+@app.callback(
+    Output('tracking-data', 'figure', allow_duplicate=True),
+    [Input('tracking-data', 'relayoutData')],
+    [State('team-dropdown', 'value')],
+    prevent_initial_call=True
+)
+def zoom_tracking(relayout_data, selected_team):
+    # Re-fetch the tracking chart at full resolution for the zoomed window
+    x_range = relayout_x_range(relayout_data)
+    if x_range is None:
+        raise PreventUpdate
+    if live_store is not None:
+        team_df = live_store.frame(team=selected_team)[0]
+    elif x_range and isinstance(football_data, ArchiveDataset):
+        # Only the partitions overlapping the window are read; the window includes its end, reads stop before it
+        start, end = pd.Timestamp(x_range[0]), pd.Timestamp(x_range[1]) + pd.Timedelta(1, 'ns')
+        team_df = football_data.current().index.team(selected_team, start, end)
+    else:
+        team_df = football_data.current().index.team(selected_team)
+    return tracking_figure(selected_team, team_df, x_range or None)
+
+@app.callback(
+    [Output('heatmap-player', 'options'),
+     Output('heatmap-player', 'value'),
+     Output('heatmap-window', 'max'),
+     Output('heatmap-window', 'value')],
     [Input('team-dropdown', 'value')]
 )
-def update_graphs(selected_team):
-    team_df = df[df['team name'] == selected_team]
-    
-    # Team Performance Graph
-    team_fig = px.bar(team_df, x='player name', y='speed (m/s)', 
-                      title=f'Speed Analysis of {selected_team}',
-                      color_discrete_sequence=['#FFD700'])
-    
-    # Player Performance Graph
-    player_fig = px.scatter(team_df, x='acceleration (m/s²)', y='distance covered (m)', 
-                            size='sprint count', color='position',
-                            title=f'Player Performance for {selected_team}',
-                            facet_col='player name',
-                            facet_col_wrap=4,
-                            labels={'player name': ''},
-                            color_discrete_sequence=['#8B0000'])
-    
-    # Tracking Data Graph
-    tracking_fig = px.line(team_df, x='timestamp', 
-                           y=['speed (m/s)', 'acceleration (m/s²)', 'distance covered (m)'],
+def update_heatmap_controls(selected_team):
+    data = sync_live_models()
+    heatmap_cube = team_models(data, selected_team).heatmap_cube
+    players = data.index.team_players(selected_team) if live_store is None else \
+        [p for p, team in heatmap_cube.player_team.items() if team == selected_team]
+    n_blocks = max(heatmap_cube.n_blocks, 1)
+    return [{'label': p, 'value': p} for p in players], None, n_blocks, [0, n_blocks]
+
+@app.callback(
+    Output('pitch-heatmap', 'figure'),
+    [Input('team-dropdown', 'value'),
+     Input('heatmap-player', 'value'),
+     Input('heatmap-window', 'value'),
+     Input('live-interval', 'n_intervals')]
+)
+def update_heatmap(selected_team, player, window, n_intervals):
+    heatmap_cube = team_models(sync_live_models(), selected_team).heatmap_cube
+    start, end = window or (0, heatmap_cube.n_blocks)
+    if player:
+        share = heatmap_cube.share(start, end, players=[player])
+        title = f'Pitch Heatmap - {player}'
+    else:
+        share = heatmap_cube.share(start, end, team=selected_team)
+        title = f'Pitch Heatmap - {selected_team}'
+    if heatmap_cube.n_blocks > 1:
+        minutes = HEATMAP_BLOCK_SECONDS / 60
+        title += f' ({start * minutes:g}-{end * minutes:g} min)'
+    return pitch_heatmap_figure(share, heatmap_cube.grid, title)
+
+@app.callback(
+    Output('workload', 'figure'),
+    [Input('team-dropdown', 'value'),
+     Input('live-interval', 'n_intervals')]
+)
+def update_workload(selected_team, n_intervals):
+    workload = team_models(sync_live_models(), selected_team).workload
+    return workload_figure(selected_team, workload.frame(team=selected_team))
+
+def workload_figure(selected_team, load_df):
+    fig = px.bar(load_df, x='player name', y=['fatigue level (%)', 'injury risk (%)'], barmode='group',
+                 title=f'Live Fatigue & Injury Risk for {selected_team}',
+                 hover_data=['acute:chronic ratio', 'optimal substitution time (min)'],
+                 color_discrete_sequence=['#FFA500', '#DC143C'])
+    fig.update_yaxes(range=[0, 100])
+    return fig
+
+def tracking_figure(selected_team, team_df, x_range=None):
+    tracking_df = decimate(team_df, 'timestamp', TRACKING_COLUMNS, MAX_TRACKING_POINTS, x_range=x_range)
+    tracking_fig = px.line(tracking_df, x='timestamp', 
+                           y=TRACKING_COLUMNS,
                            title=f'Tracking Data for {selected_team}',
                            color_discrete_sequence=['#1E90FF', '#DC143C', '#32CD32'])
+    # Keep the user's zoom across re-fetches of the same team
+    tracking_fig.update_layout(uirevision=selected_team)
+    if x_range:
+        tracking_fig.update_xaxes(range=list(x_range))
+    return tracking_fig
+
+# Figures of the team view, by graph id; each is built from the team's rows alone
+def team_performance_figure(team_df, selected_team):
+    return px.bar(team_df, x='player name', y='speed (m/s)', 
+                  title=f'Speed Analysis of {selected_team}',
+                  color_discrete_sequence=['#FFD700'])
+
+def player_performance_figure(team_df, selected_team):
+    # Each facet is capped at MAX_POINTS_PER_PLAYER samples
+    player_df = decimate_groups(team_df, 'player name', 'timestamp',
+                                ['acceleration (m/s²)', 'distance covered (m)'], MAX_POINTS_PER_PLAYER)
+    return px.scatter(player_df, x='acceleration (m/s²)', y='distance covered (m)', 
+                      size='sprint count', color='position',
+                      title=f'Player Performance for {selected_team}',
+                      facet_col='player name',
+                      facet_col_wrap=4,
+                      labels={'player name': ''},
+                      color_discrete_sequence=['#8B0000'])
 
-    # Physical Attributes Graph
-    physical_fig = px.bar(team_df, x='player name', y=['heart rate (bpm)', 'sprint count'],
-                          title=f'Physical Attributes of {selected_team}', barmode='group',
-                          color_discrete_sequence=['#9400D3', '#FF4500'])
+def tracking_data_figure(team_df, selected_team):
+    return tracking_figure(selected_team, team_df)
 
-    # AI Insights Graph
+def physical_attributes_figure(team_df, selected_team):
+    return px.bar(team_df, x='player name', y=['heart rate (bpm)', 'sprint count'],
+                  title=f'Physical Attributes of {selected_team}', barmode='group',
+                  color_discrete_sequence=['#9400D3', '#FF4500'])
+
+def ai_insights_figure(team_df, selected_team):
     hover_columns = ['player name', 'position']
     if 'role' in team_df.columns:
         hover_columns.append('role')
 
-    ai_fig = px.scatter(team_df, x='sprint count', y='speed (m/s)',
-                        color='position', size='acceleration (m/s²)',
-                        title=f'AI-Driven Insights for {selected_team}',
-                        hover_data=hover_columns,
-                        color_discrete_sequence=['#FF1493'])
-    
-    return team_fig, player_fig, tracking_fig, physical_fig, ai_fig
+    return px.scatter(team_df, x='sprint count', y='speed (m/s)',
+                      color='position', size='acceleration (m/s²)',
+                      title=f'AI-Driven Insights for {selected_team}',
+                      hover_data=hover_columns,
+                      color_discrete_sequence=['#FF1493'])
+
+TEAM_FIGURES = {
+    'team-performance': team_performance_figure,
+    'player-performance': player_performance_figure,
+    'tracking-data': tracking_data_figure,
+    'physical-attributes': physical_attributes_figure,
+    'ai-insights': ai_insights_figure,
+}
+
+def build_team_figures(selected_team, team_df=None):
+    if team_df is None:
+        team_df = football_data.current().index.team(selected_team)
+    return build_figures([(build, team_df, selected_team) for build in TEAM_FIGURES.values()])
+
+def team_frame(selected_team):
+    """Rows drawn for a team, the live cursor matching them (None outside live mode) and their version."""
+    if live_store is None:
+        data = football_data.current()
+        return data.index.team(selected_team), None, data.version
+    # Live views are keyed by the buffer position they were drawn from, so they
+    # never match an exported snapshot (snapshots.py) and are always built live
+    team_df, seq = live_store.frame(team=selected_team)
+    return team_df, {'team': selected_team, 'seq': seq}, f"live-{seq}"
+
+if FIGURE_MODE == 'split':
+    # One callback per graph: each figure is sent as soon as it is built. The
+    # tracking chart's callback also hands its cursor to extend_tracking.
+    def team_graph(graph_id, selected_team):
+        team_df, cursor, version = team_frame(selected_team)
+        key = figure_key('football', version, selected_team, graph_id)
+        return figure_cache.get(key, lambda: snapshots.figure('football', selected_team, version, graph_id)
+                                or TEAM_FIGURES[graph_id](team_df, selected_team))
+
+    split_callbacks(app, [graph_id for graph_id in TEAM_FIGURES if graph_id != 'tracking-data'],
+                    [Input('team-dropdown', 'value')], team_graph)
+
+    @app.callback(
+        [Output('tracking-data', 'figure'),
+         Output('live-cursor', 'data')],
+        [Input('team-dropdown', 'value')]
+    )
+    def update_tracking_data(selected_team):
+        team_df, cursor, version = team_frame(selected_team)
+        key = figure_key('football', version, selected_team, 'tracking-data')
+        figure = figure_cache.get(key, lambda: snapshots.figure('football', selected_team, version, 'tracking-data')
+                                  or tracking_figure(selected_team, team_df))
+        return figure, cursor
+else:
+    @app.callback(
+        [Output(graph_id, 'figure') for graph_id in TEAM_FIGURES] + [Output('live-cursor', 'data')],
+        [Input('team-dropdown', 'value')]
+    )
+    def update_graphs(selected_team):
+        # In live mode, draw the buffered samples and hand their cursor to extend_tracking
+        team_df, cursor, version = team_frame(selected_team)
+        key = figure_key('football', version, selected_team, 'team-graphs')
+        figures = figure_cache.get(key, lambda: snapshots.figures('football', selected_team, version)
+                                   or build_team_figures(selected_team, team_df))
+        return (*figures, cursor)
 
 if __name__ == '__main__':
     print(f"\nServer running at: http://{local_ip}:8050/\n")
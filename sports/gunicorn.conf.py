@@ -0,0 +1,20 @@
+import os
+
+# Production settings for sports_server.py:
+#   gunicorn -c gunicorn.conf.py sports_server:application
+# The app is preloaded in the master, so every dataset is parsed once and the
+# workers share it copy-on-write; /memory reports each worker's RSS and PSS.
+bind = os.environ.get('SPORTS_BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('SPORTS_WORKERS', 4))
+worker_class = 'gthread'
+threads = int(os.environ.get('SPORTS_THREADS', 4))
+preload_app = True
+
+# Read by sports_server.py when the master imports it
+os.environ.setdefault('SPORTS_PRELOAD', '1')
+
+
+def post_worker_init(worker):
+    from sports_server import process_memory
+
+    worker.log.info("Worker %s memory (kB): %s", worker.pid, process_memory())
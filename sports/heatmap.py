@@ -0,0 +1,175 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from callback_metrics import in_phase
+from table_index import PlayerCodes
+
+
+class PitchGrid:
+    """Regular grid of cells over the pitch coordinate space."""
+
+    def __init__(self, bins_x=21, bins_y=14, x_range=(0.0, 100.0), y_range=(0.0, 100.0)):
+        self.bins_x = bins_x
+        self.bins_y = bins_y
+        self.x_range = x_range
+        self.y_range = y_range
+
+    @property
+    def cells(self):
+        return self.bins_x * self.bins_y
+
+    @property
+    def x_centers(self):
+        edges = np.linspace(*self.x_range, self.bins_x + 1)
+        return (edges[:-1] + edges[1:]) / 2
+
+    @property
+    def y_centers(self):
+        edges = np.linspace(*self.y_range, self.bins_y + 1)
+        return (edges[:-1] + edges[1:]) / 2
+
+    def cell_index(self, x, y):
+        """Flat cell number per sample (x-major); -1 for missing coordinates."""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        ix = np.floor((x - self.x_range[0]) / (self.x_range[1] - self.x_range[0]) * self.bins_x)
+        iy = np.floor((y - self.y_range[0]) / (self.y_range[1] - self.y_range[0]) * self.bins_y)
+        valid = ~(np.isnan(ix) | np.isnan(iy))
+        # Samples on or beyond the touchline count towards the edge cell
+        ix = np.clip(np.nan_to_num(ix), 0, self.bins_x - 1).astype(np.int64)
+        iy = np.clip(np.nan_to_num(iy), 0, self.bins_y - 1).astype(np.int64)
+        return np.where(valid, ix * self.bins_y + iy, -1)
+
+
+def occupancy(x, y, grid):
+    """2D sample counts, shape (bins_x, bins_y), like np.histogram2d on the grid."""
+    cells = grid.cell_index(x, y)
+    counts = np.bincount(cells[cells >= 0], minlength=grid.cells)
+    return counts.reshape(grid.bins_x, grid.bins_y)
+
+
+class OccupancyCube(PlayerCodes):
+    """Per-player zone occupancy in fixed time blocks, with cached prefix sums.
+
+    Samples are binned once into ``counts[block, player, cell]``. Prefix sums
+    over blocks are kept alongside, so any rolling window of blocks, for one
+    player, a team or everyone, is a difference of two prefix slices rather
+    than a pass over the raw samples. Appending samples only invalidates the
+    prefix sums from the earliest block it touched.
+    """
+
+    def __init__(self, grid=None, block_seconds=60, player_col='player name', team_col='team name',
+                 time_col='timestamp', x_col='x coordinate', y_col='y coordinate'):
+        self.grid = grid or PitchGrid()
+        self.block_ns = int(block_seconds * 1e9)
+        self.player_col = player_col
+        self.team_col = team_col
+        self.time_col = time_col
+        self.x_col = x_col
+        self.y_col = y_col
+        self.start_ns = None
+        self.players = []
+        self.player_codes = {}
+        self.player_team = {}
+        self._counts = np.zeros((0, 0, self.grid.cells), dtype=np.int32)
+        self._prefix = np.zeros((1, 0, self.grid.cells), dtype=np.int64)
+        self._clean_blocks = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        cube = cls(**kwargs)
+        cube.add(df)
+        return cube
+
+    @property
+    def n_blocks(self):
+        return self._counts.shape[0]
+
+    def block_start(self, block):
+        """Timestamp at which a block starts."""
+        return pd.Timestamp(self.start_ns + block * self.block_ns)
+
+    def add(self, df):
+        """Bin new samples into the cube."""
+        if len(df) == 0:
+            return
+        times = pd.to_datetime(df[self.time_col]).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        cells = self.grid.cell_index(df[self.x_col], df[self.y_col])
+
+        with self._lock:
+            if self.start_ns is None:
+                self.start_ns = int(times.min()) // self.block_ns * self.block_ns
+            # Samples older than the first block are folded into it
+            blocks = np.maximum((times - self.start_ns) // self.block_ns, 0)
+            players = self._player_codes(df[self.player_col], df[self.team_col])
+            self._grow(int(blocks.max()) + 1, len(self.players))
+
+            valid = cells >= 0
+            n_players, n_cells = self._counts.shape[1], self._counts.shape[2]
+            flat = (blocks[valid] * n_players + players[valid]) * n_cells + cells[valid]
+            touched, hits = np.unique(flat, return_counts=True)
+            self._counts.reshape(-1)[touched] += hits.astype(np.int32)
+            if valid.any():
+                self._clean_blocks = min(self._clean_blocks, int(blocks[valid].min()))
+
+    @in_phase('filter')
+    def window(self, start_block=0, end_block=None, players=None, team=None):
+        """Sample counts (bins_x, bins_y) in blocks ``[start_block, end_block)``.
+
+        Restrict to ``players`` (names) or to a ``team``; default is everyone.
+        """
+        with self._lock:
+            end_block = self.n_blocks if end_block is None else min(end_block, self.n_blocks)
+            start_block = max(0, min(start_block, end_block))
+            prefix = self._refresh_prefix()
+            totals = prefix[end_block] - prefix[start_block]
+            if team is not None:
+                players = [p for p, t in self.player_team.items() if t == team]
+            if players is not None:
+                codes = [self.player_codes[p] for p in players if p in self.player_codes]
+                totals = totals[codes]
+            grid = totals.sum(axis=0)
+        return grid.reshape(self.grid.bins_x, self.grid.bins_y)
+
+    def share(self, *args, **kwargs):
+        """Like :meth:`window` but as a percentage of the selected samples."""
+        counts = self.window(*args, **kwargs)
+        total = counts.sum()
+        return counts * (100.0 / total) if total else counts.astype(np.float64)
+
+    def _grow(self, n_blocks, n_players):
+        old_blocks, old_players, n_cells = self._counts.shape
+        if n_blocks <= old_blocks and n_players <= old_players:
+            return
+        counts = np.zeros((max(n_blocks, old_blocks), max(n_players, old_players), n_cells), dtype=np.int32)
+        counts[:old_blocks, :old_players] = self._counts
+        self._counts = counts
+        if n_players > old_players:
+            self._clean_blocks = 0
+
+    def _refresh_prefix(self):
+        n_blocks, n_players, n_cells = self._counts.shape
+        if self._prefix.shape != (n_blocks + 1, n_players, n_cells):
+            prefix = np.zeros((n_blocks + 1, n_players, n_cells), dtype=np.int64)
+            keep = min(self._clean_blocks, self._prefix.shape[0] - 1)
+            prefix[:keep + 1, :self._prefix.shape[1]] = self._prefix[:keep + 1]
+            self._prefix = prefix
+            self._clean_blocks = keep
+        if self._clean_blocks < n_blocks:
+            start = self._clean_blocks
+            self._prefix[start + 1:] = self._prefix[start] + np.cumsum(self._counts[start:], axis=0)
+            self._clean_blocks = n_blocks
+        return self._prefix
+
+
+def pitch_heatmap_figure(share, grid, title):
+    """Heatmap figure of a (bins_x, bins_y) occupancy share grid."""
+    fig = px.imshow(share.T, x=grid.x_centers, y=grid.y_centers, origin='lower',
+                    color_continuous_scale='Hot', aspect='auto', title=title,
+                    labels={'x': 'X Coordinate', 'y': 'Y Coordinate', 'color': 'Time Share (%)'})
+    fig.update_layout(plot_bgcolor='#101010', paper_bgcolor='#101010', font=dict(color='white'))
+    return fig
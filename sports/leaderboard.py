@@ -0,0 +1,141 @@
+from dash import Dash, dcc, html
+from dash.dependencies import Input, Output
+import os
+import socket
+import threading
+from data_loader import source_paths
+from data_refresh import LiveDataset
+from ranking import LEADERBOARDS, build_leaderboard
+from tracking_stream import CsvTailer
+from pages import url_prefix
+from callback_metrics import instrument_app
+
+# Get local IP address
+hostname = socket.gethostname()
+local_ip = socket.gethostbyname(hostname)
+
+# Datasets ranked on this page: dataset -> label
+SECTIONS = {
+    'cricket_batting': 'Cricket Batting',
+    'cricket_bowling': 'Cricket Bowling',
+    'nba': 'NBA',
+    'football': 'Football',
+}
+
+# Live mode (LEADERBOARD_LIVE=1): rows appended to the CSV files are folded into the
+# leaderboards as they arrive; otherwise a changed CSV rebuilds its leaderboard in the background
+LIVE_MODE = os.environ.get('LEADERBOARD_LIVE') == '1'
+
+def board_builder(dataset):
+    def build(df):
+        tailers = [CsvTailer(path) for path in source_paths(dataset)] if LIVE_MODE else []
+        return {'board': build_leaderboard(df, dataset), 'tailers': tailers}
+    return build
+
+# Leaderboard (and CSV tailers in live mode) per dataset, built on first use
+boards = {dataset: LiveDataset([dataset], board_builder(dataset), watch=not LIVE_MODE) for dataset in SECTIONS}
+tailers_lock = threading.Lock()
+
+def leaderboard(dataset):
+    data = boards[dataset].current()
+    if data.tailers:
+        with tailers_lock:
+            for tailer in data.tailers:
+                new_df = tailer.poll()
+                if new_df is not None:
+                    data.board.add(new_df)
+    return data.board
+
+def data_table(df):
+    header = [html.Th(str(col).title(), style={'color': 'gold'}) for col in df.columns]
+    rows = [html.Tr([html.Td(f'{value:,.2f}'.rstrip('0').rstrip('.') if isinstance(value, float) else value)
+                     for value in row]) for row in df.itertuples(index=False)]
+    return html.Table([html.Tr(header)] + rows,
+                      style={'width': '100%', 'border': '1px solid white', 'color': 'white', 'textAlign': 'center'})
+
+# Create Dash app
+app = Dash(__name__, url_base_pathname=url_prefix('leaderboard'))
+# Record latency, payload size and cache hits of every callback registered below (served on /metrics)
+instrument_app(app, 'leaderboard')
+
+app.layout = html.Div(style={'backgroundColor': '#121212', 'padding': '20px', 'color': 'white'}, children=[
+    html.H1("Cross-Team Leaderboards", style={'textAlign': 'center', 'color': '#FFD700'}),
+
+    dcc.RadioItems(
+        id='leaderboard-dataset',
+        options=[{'label': label, 'value': dataset} for dataset, label in SECTIONS.items()],
+        value='cricket_batting',
+        labelStyle={'display': 'inline-block', 'margin-right': '10px'},
+        style={'textAlign': 'center'}
+    ),
+
+    html.Div([
+        dcc.Dropdown(id='leaderboard-stat', clearable=False,
+                     style={'width': '30%', 'display': 'inline-block', 'color': 'black'}),
+        dcc.Dropdown(id='leaderboard-team', placeholder='All teams',
+                     style={'width': '30%', 'display': 'inline-block', 'marginLeft': '5%', 'color': 'black'}),
+        dcc.Input(id='leaderboard-size', type='number', min=1, max=500, value=20,
+                  style={'width': '10%', 'marginLeft': '5%'}),
+    ], style={'textAlign': 'center', 'padding': '10px'}),
+
+    html.Div(id='leaderboard-table'),
+
+    html.H3("Player Rank", style={'textAlign': 'center', 'color': '#FFD700'}),
+    dcc.Dropdown(id='leaderboard-player', placeholder='Select a player',
+                 style={'width': '50%', 'margin': 'auto', 'color': 'black'}),
+    html.P(id='leaderboard-rank', style={'textAlign': 'center'}),
+
+    html.H3("Team Totals", style={'textAlign': 'center', 'color': '#FFD700'}),
+    html.Div(id='leaderboard-teams'),
+])
+
+@app.callback(
+    [Output('leaderboard-stat', 'options'),
+     Output('leaderboard-stat', 'value'),
+     Output('leaderboard-team', 'options'),
+     Output('leaderboard-team', 'value'),
+     Output('leaderboard-player', 'options'),
+     Output('leaderboard-player', 'value')],
+    [Input('leaderboard-dataset', 'value')]
+)
+def update_controls(dataset):
+    board = leaderboard(dataset)
+    stats = list(LEADERBOARDS[dataset][2])
+    players = sorted(set(board.players()), key=str)
+    return ([{'label': stat.title(), 'value': stat} for stat in stats], stats[0],
+            [{'label': team, 'value': team} for team in board.teams], None,
+            [{'label': player, 'value': player} for player in players], None)
+
+@app.callback(
+    [Output('leaderboard-table', 'children'),
+     Output('leaderboard-teams', 'children')],
+    [Input('leaderboard-dataset', 'value'),
+     Input('leaderboard-stat', 'value'),
+     Input('leaderboard-team', 'value'),
+     Input('leaderboard-size', 'value')]
+)
+def update_leaderboard(dataset, stat, team, size):
+    board = leaderboard(dataset)
+    if stat not in board.stats:
+        stat = next(iter(board.stats))
+    return data_table(board.top(stat, int(size or 20), team=team)), data_table(board.team_table(stat))
+
+@app.callback(
+    Output('leaderboard-rank', 'children'),
+    [Input('leaderboard-dataset', 'value'),
+     Input('leaderboard-stat', 'value'),
+     Input('leaderboard-player', 'value')]
+)
+def update_player_rank(dataset, stat, player):
+    board = leaderboard(dataset)
+    if not player or stat not in board.stats:
+        return ""
+    result = board.rank(stat, player)
+    if result is None:
+        return f"No {stat} recorded for {player}."
+    rank, percentile, value = result
+    return f"{player}: #{rank} by {stat} ({value:,.2f}), better than or equal to {percentile:.1f}% of players."
+
+if __name__ == '__main__':
+    print(f"\nServer running at: http://{local_ip}:8070/\n")
+    app.run_server(host='0.0.0.0', port=8070, debug=True)
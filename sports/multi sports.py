@@ -1,26 +1,68 @@
 import dash 
 from dash import dcc, html 
-from dash.dependencies import Input, Output
-import pandas as pd
+from dash.dependencies import Input, Output, State
+from archive import ARCHIVE_MODE, FULL_READS, ArchiveDataset, TeamModels
+from data_refresh import LiveDataset
+from figure_cache import FigureCache, figure_key
+from figure_pool import FIGURE_MODE, build_figures, split_callbacks
+from snapshots import snapshots
+from table_index import shared_index
+from pages import url_prefix
+from callback_metrics import instrument_app
+from heatmap import OccupancyCube, pitch_heatmap_figure
+from similarity import build_similarity_index
 import plotly.express as px
 from dash.exceptions import PreventUpdate 
 
-# Load CSV Data
-nba_files = ["C://lakers_nba.csv", "C://warriors_nba.csv", "C://bucks_nba.csv", "C://celtics_nba.csv"]
-cricket_files = ["C://india_batting.csv", "C://australia_batting.csv", "C://england_batting.csv", 
-                 "C://india_bowling.csv", "C://england_bowling.csv", "C://australia_bowling.csv"]
-football_files = ["C://fc_barcelona_analytics_updated.csv", "C://real_madrid_analytics_updated.csv", 
-                  "C://manchester_united_analytics_updated.csv", "C://liverpool_analytics_updated.csv", 
-                  "C://bayern_munich_analytics_updated.csv"]
+def player_lookups(dataset):
+    def build(df):
+        return {
+            'index': shared_index(df, 'team', 'player'),
+            # Standardised stat vectors per player, for "find comparable players" across all teams
+            'similarity': build_similarity_index(df, dataset),
+        }
+    return build
 
-# Load DataFrames
-cricket_batting_df = pd.concat([pd.read_csv(f) for f in cricket_files[:3]], ignore_index=True)
-cricket_bowling_df = pd.concat([pd.read_csv(f) for f in cricket_files[3:]], ignore_index=True)
-nba_df = pd.concat([pd.read_csv(f) for f in nba_files], ignore_index=True)
-football_df = pd.concat([pd.read_csv(f) for f in football_files], ignore_index=True)
+def football_lookups(df):
+    index = shared_index(df, 'team name', 'player name')
+    # Per-player pitch zone occupancy for the football heatmap
+    return {'index': index, 'heatmap': OccupancyCube.from_frame(index.df)}
+
+def archive_lookups(dataset):
+    # Team views and the football heatmap read a team's archive partitions on first use; the similarity
+    # index compares players across every team, so it reads all partitions, but only its columns
+    def build(index, archive):
+        if dataset == 'football':
+            columns = ['team name', 'player name', 'timestamp', 'x coordinate', 'y coordinate']
+            return {'heatmaps': TeamModels(archive, dataset, OccupancyCube.from_frame, columns=columns)}
+        columns = FULL_READS[dataset][1]
+        return {'similarity': build_similarity_index(archive.read(dataset, columns=columns), dataset)}
+    return build
+
+# Each sport's data and lookups are loaded on first use, so opening one sport
+# never pays for the others; afterwards every callback reads one snapshot of them,
+# reloaded in the background when the sport's CSV files change.
+# In archive mode (SPORTS_ARCHIVE=1) NBA and football teams are read from their archive partitions.
+SPORT_DATA = {
+    'cricket_batting': LiveDataset(['cricket_batting'], player_lookups('cricket_batting')),
+    'cricket_bowling': LiveDataset(['cricket_bowling'], player_lookups('cricket_bowling')),
+    'nba': LiveDataset(['nba'], player_lookups('nba')),
+    'football': LiveDataset(['football'], football_lookups),
+}
+if ARCHIVE_MODE:
+    SPORT_DATA['nba'] = ArchiveDataset('nba', archive_lookups('nba'))
+    SPORT_DATA['football'] = ArchiveDataset('football', archive_lookups('football'))
+
+def sport_data(dataset):
+    return SPORT_DATA[dataset].current()
+
+# Cache rendered views; keys carry the data version so CSV changes invalidate them
+figure_cache = FigureCache()
 
 # Initialize Dash App
-app = dash.Dash(__name__, suppress_callback_exceptions=True)
+app = dash.Dash(__name__, suppress_callback_exceptions=True, url_base_pathname=url_prefix('multi'))
+# Record latency, payload size and cache hits of every callback registered below (served on /metrics)
+instrument_app(app, 'multi')
 server = app.server
 
 # Main Dashboard Layout
@@ -50,8 +92,8 @@ def update_dashboard(sport):
             html.H2("Cricket Analytics"),
             dcc.Dropdown(
                 id='cricket-team',
-                options=[{'label': team, 'value': team} for team in cricket_batting_df['Team'].unique()],
-                value=cricket_batting_df['Team'].unique()[0]
+                options=[{'label': team, 'value': team} for team in sport_data('cricket_batting').index.teams],
+                value=sport_data('cricket_batting').index.teams[0]
             ),
             dcc.RadioItems(
                 id='cricket-type',
@@ -63,26 +105,35 @@ def update_dashboard(sport):
                 labelStyle={'display': 'inline-block', 'margin-right': '10px'}
             ),
             html.H3("Player Comparison"),
-            html.Div(id='player-selection'),
-            html.Div(id='cricket-content')  
+            cricket_player_selection(),
+            html.Div(id='cricket-content'),
+            html.Div(id='cricket-comparison'),
+            html.Div(id='cricket-similar')
         ])
     elif sport == 'nba':
         return html.Div([
             html.H2("NBA Team Analytics"),
             dcc.Dropdown(
                 id='nba-team',
-                options=[{'label': team, 'value': team} for team in nba_df['Team'].unique()],
-                value=nba_df['Team'].unique()[0]
+                options=[{'label': team, 'value': team} for team in sport_data('nba').index.teams],
+                value=sport_data('nba').index.teams[0]
             ),
-            html.Div(id='nba-content')
+            html.Div(id='nba-content'),
+            html.H3("Find Comparable Players"),
+            dcc.Dropdown(
+                id='nba-similar-player',
+                options=[{'label': player, 'value': player} for player in sport_data('nba').similarity.players()],
+                placeholder='Select a player'
+            ),
+            html.Div(id='nba-similar')
         ])
     elif sport == 'football':
         return html.Div([
             html.H2("Football Analytics"),
             dcc.Dropdown(
                 id='football-team',
-                options=[{'label': team, 'value': team} for team in football_df['Team Name'].unique()],
-                value=football_df['Team Name'].unique()[0]
+                options=[{'label': team, 'value': team} for team in sport_data('football').index.teams],
+                value=sport_data('football').index.teams[0]
             ),
             html.Div(id='football-content')
         ])
@@ -93,8 +144,8 @@ def cricket_dashboard():
         html.H2("Cricket Analytics"),
         dcc.Dropdown(
             id='cricket-team',
-            options=[{'label': team, 'value': team} for team in cricket_batting_df['Team'].unique()],
-            value=cricket_batting_df['Team'].unique()[0]
+            options=[{'label': team, 'value': team} for team in sport_data('cricket_batting').index.teams],
+            value=sport_data('cricket_batting').index.teams[0]
         ),
         dcc.RadioItems(
             id='cricket-type',
@@ -106,85 +157,125 @@ def cricket_dashboard():
             labelStyle={'display': 'inline-block', 'margin-right': '10px'}
         ),
         html.H3("Player Comparison"),
-        html.Div(id='player-selection'),
-        html.Div(id='cricket-content')  
+        cricket_player_selection(),
+        html.Div(id='cricket-content'),
+        html.Div(id='cricket-comparison'),
+        html.Div(id='cricket-similar')
     ])
 
+# Player dropdowns live in the layout; team/type changes only refresh their options and values
+def cricket_player_selection():
+    return html.Div(id='player-selection', children=[
+        html.Label("Select Player (Section 1)"),
+        dcc.Dropdown(id='player-1'),
+        html.Label("Select Player (Section 2)"),
+        dcc.Dropdown(id='player-2')
+    ])
+
+# Stats shown per cricket type: (column, team chart title)
+CRICKET_STATS = {
+    'batting': [('runs', "Total Runs"), ('fours', "Fours"), ('sixes', "Sixes"),
+                ('strike rate', "Strike Rate"), ('average', "Batting Average")],
+    'bowling': [('wickets', "Wickets"), ('economy', "Economy"), ('bowling average', "Bowling Average")],
+}
+
+def cricket_data(cricket_type):
+    return sport_data(f'cricket_{cricket_type}')
+
 @app.callback(
-    Output('player-selection', 'children'),
+    [Output('player-1', 'options'),
+     Output('player-1', 'value'),
+     Output('player-2', 'options'),
+     Output('player-2', 'value')],
     [Input('cricket-team', 'value'),
      Input('cricket-type', 'value')]
 )
 def update_player_selection(selected_team, cricket_type):
-    if cricket_type == 'batting':
-        team_players = cricket_batting_df[cricket_batting_df['Team'] == selected_team]['Player'].unique()
-    else:
-        team_players = cricket_bowling_df[cricket_bowling_df['Team'] == selected_team]['Player'].unique()
+    team_players = cricket_data(cricket_type).index.team_players(selected_team)
+    options = [{'label': p, 'value': p} for p in team_players]
+    player1 = team_players[0] if len(team_players) > 0 else None
+    player2 = team_players[1] if len(team_players) > 1 else None
+    return options, player1, options, player2
 
-    if len(team_players) == 0:
-        return html.P("No players available for this team.")
+# Team-level charts depend only on team and type, so player changes never re-render them
+@app.callback(
+    Output('cricket-content', 'children'),
+    [Input('cricket-team', 'value'),
+     Input('cricket-type', 'value')]
+)
+def cricket_type_dashboard(selected_team, cricket_type):
+    if not selected_team:
+        raise PreventUpdate
 
-    return html.Div([
-        html.Label("Select Player (Section 1)"),
-        dcc.Dropdown(
-            id='player-1',
-            options=[{'label': p, 'value': p} for p in team_players],
-            value=team_players[0] if len(team_players) > 0 else None
-        ),
-        html.Label("Select Player (Section 2)"),
-        dcc.Dropdown(
-            id='player-2',
-            options=[{'label': p, 'value': p} for p in team_players],
-            value=team_players[1] if len(team_players) > 1 else None
-        )
-    ])
+    data = cricket_data(cricket_type)
+    key = figure_key(f'cricket_{cricket_type}', data.version, selected_team, cricket_type)
+    # Exported snapshots (snapshots.py) are served when they match the data; otherwise built live
+    figures = figure_cache.get(key, lambda: snapshots.figures(f'cricket-{cricket_type}', selected_team, data.version)
+                               or cricket_team_figures(selected_team, cricket_type, data))
+    return html.Div(
+        [html.H3(f"{selected_team} - {cricket_type.title()} Stats")]
+        + [dcc.Graph(figure=fig) for fig in figures]
+    )
 
+# Player comparison: one faceted figure built from a single two-player subset
 @app.callback(
-    Output('cricket-content', 'children'),
-    [Input('cricket-team', 'value'), 
-     Input('cricket-type', 'value'),
-     Input('player-1', 'value'),  # Dynamically generated
-     Input('player-2', 'value')]  # Dynamically generated
+    Output('cricket-comparison', 'children'),
+    [Input('player-1', 'value'),
+     Input('player-2', 'value')],
+    [State('cricket-team', 'value'),
+     State('cricket-type', 'value')]
 )
-def cricket_type_dashboard(selected_team, cricket_type, player1=None, player2=None):
+def cricket_player_comparison(player1, player2, selected_team, cricket_type):
     if not selected_team:
         raise PreventUpdate
 
-    ctx = dash.callback_context
-    input_ids = [inp['prop_id'].split('.')[0] for inp in ctx.triggered]
+    data = cricket_data(cricket_type)
+    if not (player1 or player2):
+        if len(data.index.team_players(selected_team)) == 0:
+            return html.P("No players available for this team.")
+        return html.P("Select two players to compare.")
+    key = figure_key(f'cricket_{cricket_type}', data.version, selected_team, f'{cricket_type}-comparison', [player1, player2])
+    figure = figure_cache.get(key, lambda: cricket_comparison_figure(selected_team, cricket_type, player1, player2, data))
+    return html.Div([html.H4("Player Comparison"), dcc.Graph(figure=figure)])
 
-    if 'player-1' not in input_ids:
-        player1 = None
-    if 'player-2' not in input_ids:
-        player2 = None
-    if cricket_type == 'batting':
-        batting_df = cricket_batting_df[cricket_batting_df['Team'] == selected_team]
-        return html.Div([
-            html.H3(f"{selected_team} - Batting Stats"),
-            dcc.Graph(figure=px.bar(batting_df, x='Player', y='Runs', title="Total Runs")),
-            dcc.Graph(figure=px.bar(batting_df, x='Player', y='Fours', title="Fours")),
-            dcc.Graph(figure=px.bar(batting_df, x='Player', y='Sixes', title="Sixes")),
-            dcc.Graph(figure=px.bar(batting_df, x='Player', y='Strike Rate', title="Strike Rate")),
-            dcc.Graph(figure=px.bar(batting_df, x='Player', y='Average', title="Batting Average")),
-            html.H4("Player Comparison"),
-            dcc.Graph(figure=px.bar(batting_df[batting_df['Player'].isin([player1, player2])], x='Player', y='Runs', title="Runs Comparison")),
-            dcc.Graph(figure=px.bar(batting_df[batting_df['Player'].isin([player1, player2])], x='Player', y='Fours', title="Fours Comparison")), 
-            dcc.Graph(figure=px.bar(batting_df[batting_df['Player'].isin([player1, player2])], x='Player', y='Sixes', title="Sixes Comparison")),
-            dcc.Graph(figure=px.bar(batting_df[batting_df['Player'].isin([player1, player2])], x='Player', y='Strike Rate', title="Strike Rate Comparison")), 
-            dcc.Graph(figure=px.bar(batting_df[batting_df['Player'].isin([player1, player2])], x='Player', y='Average', title="Batting Average Comparison"))
-        ])
-    else:
-        bowling_df = cricket_bowling_df[cricket_bowling_df['Team'] == selected_team]
-        return html.Div([
-            html.H3(f"{selected_team} - Bowling Stats"),
-            dcc.Graph(figure=px.bar(bowling_df, x='Player', y='Wickets', title="Wickets")),
-            dcc.Graph(figure=px.bar(bowling_df, x='Player', y='Economy', title="Economy")),
-            dcc.Graph(figure=px.bar(bowling_df, x='Player', y='Bowling Average', title="Bowling Average")),
-            html.H4("Player Comparison"),
-            dcc.Graph(figure=px.bar(bowling_df[bowling_df['Player'].isin([player1, player2])], x='Player', y='Wickets', title="Wickets Comparison")),
-            dcc.Graph(figure=px.bar(bowling_df[bowling_df['Player'].isin([player1, player2])], x='Player', y='Economy', title="Economy Comparison")),
-            dcc.Graph(figure=px.bar(bowling_df[bowling_df['Player'].isin([player1, player2])], x='Player', y='Bowling Average', title="Bowling Average Comparison"))
-        ])
+def cricket_team_figures(selected_team, cricket_type, data=None):
+    team_df = (data or cricket_data(cricket_type)).index.team(selected_team)
+    return [px.bar(team_df, x='player', y=stat, title=title) for stat, title in CRICKET_STATS[cricket_type]]
+
+def cricket_comparison_figure(selected_team, cricket_type, player1, player2, data=None):
+    pair_df = (data or cricket_data(cricket_type)).index.players([player1, player2])
+    pair_df = pair_df[pair_df['team'] == selected_team]
+    stats = [stat for stat, _ in CRICKET_STATS[cricket_type]]
+    long_df = pair_df.melt(id_vars='player', value_vars=stats, var_name='stat')
+    fig = px.bar(long_df, x='player', y='value', color='player', facet_col='stat',
+                 facet_col_wrap=len(stats), title=f"{cricket_type.title()} Comparison")
+    # Each stat keeps its own scale
+    fig.update_yaxes(matches=None, showticklabels=True, title_text='')
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split('=')[-1].title()))
+    return fig
+
+# Players closest to player 1's stat profile, across every team
+@app.callback(
+    Output('cricket-similar', 'children'),
+    [Input('player-1', 'value'),
+     Input('cricket-type', 'value')],
+    [State('cricket-team', 'value')]
+)
+def cricket_similar_players(player1, cricket_type, selected_team):
+    if not player1:
+        return None
+    return similar_players(f'cricket_{cricket_type}', player1, selected_team)
+
+def similar_players(dataset, player, team=None):
+    index = sport_data(dataset).similarity
+    similar_df = index.nearest(player, k=5, team=team)
+    if similar_df is None:
+        return html.P(f"No stats for {player}.")
+    columns = [index.team_col, index.player_col, 'similarity (%)'] + index.features
+    header = html.Tr([html.Th(col.title()) for col in columns])
+    rows = [html.Tr([html.Td(round(value, 2) if isinstance(value, float) else value) for value in row])
+            for row in similar_df[columns].itertuples(index=False)]
+    return html.Div([html.H4(f"Players Similar to {player}"), html.Table([header] + rows)])
 
 # **NBA Callback**
 @app.callback(
@@ -192,48 +283,99 @@ def cricket_type_dashboard(selected_team, cricket_type, player1=None, player2=No
     Input('nba-team', 'value')
 )
 def update_nba_dashboard(selected_team):
-    team_df = nba_df[nba_df['Team'] == selected_team]
+    team_df = sport_data('nba').index.team(selected_team)
     return html.Div([
         html.H3(f"{selected_team} - NBA Stats"),
-        dcc.Graph(figure=px.bar(team_df, x='Player', y='Points', title="Points")),
-        dcc.Graph(figure=px.bar(team_df, x='Player', y='Assists', title="Assists")),
-        dcc.Graph(figure=px.bar(team_df, x='Player', y='Rebounds', title="Rebounds")),
-        dcc.Graph(figure=px.bar(team_df, x='Player', y='Steals', title="Steals")),
-        dcc.Graph(figure=px.bar(team_df, x='Player', y='Blocks', title="Blocks"))
+        dcc.Graph(figure=px.bar(team_df, x='player', y='points', title="Points")),
+        dcc.Graph(figure=px.bar(team_df, x='player', y='assists', title="Assists")),
+        dcc.Graph(figure=px.bar(team_df, x='player', y='rebounds', title="Rebounds")),
+        dcc.Graph(figure=px.bar(team_df, x='player', y='steals', title="Steals")),
+        dcc.Graph(figure=px.bar(team_df, x='player', y='blocks', title="Blocks"))
     ])
 
+@app.callback(
+    Output('nba-similar', 'children'),
+    Input('nba-similar-player', 'value')
+)
+def nba_similar_players(player):
+    if not player:
+        return None
+    return similar_players('nba', player)
+
 # 📌 Football Dashboard
 def football_dashboard():
     return html.Div([
         html.H2("Football Analytics"),
         dcc.Dropdown(
             id='football-team',
-            options=[{'label': team, 'value': team} for team in football_df['Team Name'].unique()],
-            value=football_df['Team Name'].unique()[0]
+            options=[{'label': team, 'value': team} for team in sport_data('football').index.teams],
+            value=sport_data('football').index.teams[0]
         ),
         html.Div(id='football-content')
     ])
 
+# Football bar charts by graph id: (column, title, bar colour column)
+FOOTBALL_STATS = {
+    'football-speed': ('speed (m/s)', "Speed", None),
+    'football-pass-accuracy': ('pass accuracy (%)', "Pass Accuracy", None),
+    'football-injury-risk': ('injury risk (%)', "Injury Risk", 'player name'),
+    'football-fatigue': ('fatigue level (%)', "Fatigue Level", 'player name'),
+    'football-heatmap-coverage': ('heatmap coverage (%)', "Heatmap Coverage", None),
+    'football-possession': ('ball possession time (s)', "Ball Possession Time", None),
+    'football-sprints': ('sprint count', "Sprint Count", None),
+    'football-distance': ('distance covered (m)', "Distance Covered", None),
+    'football-substitution': ('optimal substitution time (min)', "Optimal Substitution Time", None),
+}
+FOOTBALL_GRAPHS = [*FOOTBALL_STATS, 'football-pitch-heatmap']
+
+def football_stat_figure(team_df, stat, title, color):
+    return px.bar(team_df, x='player name', y=stat, title=title, color=color)
+
+def football_pitch_figure(heatmap, selected_team):
+    return pitch_heatmap_figure(heatmap.share(team=selected_team), heatmap.grid, "Pitch Heatmap")
+
+def football_builder(graph_id, selected_team, data):
+    # (function, *args) building one football graph
+    if graph_id == 'football-pitch-heatmap':
+        heatmap = data.heatmaps.get(selected_team) if ARCHIVE_MODE else data.heatmap
+        return (football_pitch_figure, heatmap, selected_team)
+    return (football_stat_figure, data.index.team(selected_team), *FOOTBALL_STATS[graph_id])
+
+def football_team_figures(selected_team, data=None):
+    data = data or sport_data('football')
+    return build_figures([football_builder(graph_id, selected_team, data) for graph_id in FOOTBALL_GRAPHS])
+
+def football_key(selected_team, view, data):
+    return figure_key('football', data.version, selected_team, view)
+
 @app.callback(
     Output('football-content', 'children'),
     Input('football-team', 'value')
 )
 def update_football_dashboard(selected_team):
-    team_df = football_df[football_df['Team Name'] == selected_team]
+    if FIGURE_MODE == 'split':
+        # Empty graphs, each filled in by its own callback as soon as its figure is ready
+        graphs = [dcc.Graph(id=graph_id) for graph_id in FOOTBALL_GRAPHS]
+    else:
+        data = sport_data('football')
+        figures = figure_cache.get(football_key(selected_team, 'team-graphs', data),
+                                   lambda: snapshots.figures('multi-football', selected_team, data.version)
+                                   or football_team_figures(selected_team, data))
+        graphs = [dcc.Graph(id=graph_id, figure=fig) for graph_id, fig in zip(FOOTBALL_GRAPHS, figures)]
+    return html.Div([html.H3(f"{selected_team} - Football Stats")] + graphs)
 
-    return html.Div([
-        html.H3(f"{selected_team} - Football Stats"),
-        dcc.Graph(figure=px.bar(team_df, x='Player Name', y='Speed (m/s)', title="Speed")),
-        dcc.Graph(figure=px.bar(team_df, x='Player Name', y='Pass Accuracy (%)', title="Pass Accuracy")),
-        dcc.Graph(figure=px.bar(team_df, x='Player Name', y='Injury Risk (%)', title="Injury Risk", color='Player Name')),
-        dcc.Graph(figure=px.bar(team_df, x='Player Name', y='Fatigue Level (%)', title="Fatigue Level", color='Player Name')),
-        dcc.Graph(figure=px.bar(team_df, x='Player Name', y='Heatmap Coverage (%)', title="Heatmap Coverage")),
-        dcc.Graph(figure=px.bar(team_df, x='Player Name', y='Ball Possession Time (s)', title="Ball Possession Time")),
-        dcc.Graph(figure=px.bar(team_df, x='Player Name', y='Sprint Count', title="Sprint Count")),
-        dcc.Graph(figure=px.bar(team_df, x='Player Name', y='Distance Covered (m)', title="Distance Covered")),
-        dcc.Graph(figure=px.bar(team_df, x='Player Name', y='Optimal Substitution Time (min)', title="Optimal Substitution Time"))
-    ])
+if FIGURE_MODE == 'split':
+    def football_graph(graph_id, selected_team):
+        data = sport_data('football')
+        def build():
+            snapshot = snapshots.figure('multi-football', selected_team, data.version, graph_id)
+            if snapshot is not None:
+                return snapshot
+            func, *args = football_builder(graph_id, selected_team, data)
+            return func(*args)
+        return figure_cache.get(football_key(selected_team, graph_id, data), build)
 
+    split_callbacks(app, FOOTBALL_GRAPHS, [Input('football-team', 'value')], football_graph)
 
 # Run Server
 if __name__ == '__main__':
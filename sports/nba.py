@@ -1,43 +1,103 @@
-import pandas as pd
 from dash import Dash, dcc, html
 from dash.dependencies import Input, Output
 import plotly.express as px
+import os
 import socket
+import threading
+from archive import ARCHIVE_MODE, ArchiveDataset, TeamModels
+from data_loader import source_paths
+from data_refresh import LiveDataset
+from figure_cache import FigureCache, figure_key
+from figure_pool import FIGURE_MODE, build_figures, split_callbacks
+from snapshots import snapshots
+from table_index import shared_index
+from rollup import build_game_rollup
+from tracking_stream import CsvTailer
+from pages import url_prefix
+from callback_metrics import instrument_app
 
 # Get local IP address
 hostname = socket.gethostname()
 local_ip = socket.gethostbyname(hostname)
 
-# Load multiple CSV files and merge them into one DataFrame
-file_paths = [
-    "C://lakers_nba.csv",
-    "C://warriors_nba.csv",
-    "C://bucks_nba.csv",
-    "C://celtics_nba.csv",
-]
+# Live mode (NBA_LIVE=1): box scores appended to the per-game CSVs are folded into the
+# rollup as they arrive, so the trend charts move with each game
+LIVE_MODE = os.environ.get('NBA_LIVE') == '1'
+LIVE_INTERVAL_MS = int(os.environ.get('NBA_LIVE_INTERVAL_MS', 5000))
 
-df_list = [pd.read_csv(file, header=0) for file in file_paths]
-df = pd.concat(df_list, ignore_index=True)
+# Games averaged by the trend charts (NBA_TREND_GAMES; 3, 5 and 10 are precomputed)
+TREND_GAMES = int(os.environ.get('NBA_TREND_GAMES', 5))
 
-# Standardize column names (strip spaces & lowercase)
-df.columns = df.columns.str.strip().str.lower()
+def build_nba(df, games_df):
+    # Ensure required columns exist
+    required_columns = {'team', 'player', 'matches', 'points', 'assists', 'rebounds', 'steals', 'blocks'}
+    missing_columns = required_columns - set(df.columns)
+    if missing_columns:
+        raise ValueError(f"Missing columns in CSV files: {missing_columns}")
+    missing_columns = {'team', 'player', 'game', 'points', 'assists', 'rebounds'} - set(games_df.columns)
+    if missing_columns:
+        raise ValueError(f"Missing columns in per-game CSV files: {missing_columns}")
 
-# Ensure required columns exist
-required_columns = {'team', 'player', 'matches', 'points', 'assists', 'rebounds', 'steals', 'blocks'}
-missing_columns = required_columns - set(df.columns)
-if missing_columns:
-    raise ValueError(f"Missing columns in CSV files: {missing_columns}")
+    return {
+        # Precompute team -> rows and player -> rows lookups for the callbacks
+        'index': shared_index(df, 'team', 'player'),
+        # Running totals, averages and rolling means per player and game, for the trend charts
+        'rollup': build_game_rollup(games_df),
+        'tailers': [CsvTailer(path) for path in source_paths('nba_games')] if LIVE_MODE else [],
+    }
+
+def build_nba_archive(index, archive):
+    # Each team's rollup is built from its per-game partitions when the team is first shown
+    return {'rollups': TeamModels(archive, 'nba_games', build_game_rollup), 'tailers': []}
+
+# All NBA team files (season totals and per-game box scores) as DataFrames (column names come back
+# stripped & lowercased) and their lookups; reloaded in the background when a CSV changes, each
+# callback reading one snapshot. Live mode appends games to the same rollup instead, so its
+# snapshot is never replaced. In archive mode (SPORTS_ARCHIVE=1, not with live mode) a team's
+# rows are read from its archive partitions on first use.
+if ARCHIVE_MODE and not LIVE_MODE:
+    nba_data = ArchiveDataset('nba', build_nba_archive, extra=['nba_games'])
+else:
+    nba_data = LiveDataset(['nba', 'nba_games'], build_nba, watch=not LIVE_MODE)
+teams = nba_data.current().index.teams
+
+# Cache rendered team views; keys carry the data version so CSV changes invalidate them
+figure_cache = FigureCache()
+tailers_lock = threading.Lock()
+
+def sync_games():
+    # The current snapshot; in live mode, box scores appended since the last call are first added to its rollup
+    data = nba_data.current()
+    if data.tailers:
+        with tailers_lock:
+            for tailer in data.tailers:
+                new_df = tailer.poll()
+                if new_df is not None:
+                    data.rollup.add(new_df)
+    return data
+
+def team_rollup(data, team):
+    # The snapshot's rollup, or in archive mode the team's own
+    return data.rollups.get(team) if isinstance(nba_data, ArchiveDataset) else data.rollup
+
+def data_key(data):
+    # Data version of cached figures, moving on with every game appended in live mode
+    if isinstance(nba_data, ArchiveDataset):
+        return data.version
+    return f"{data.version}:{data.rollup.revision}"
 
 # Create Dash app
-app = Dash(__name__)
+app = Dash(__name__, url_base_pathname=url_prefix('nba'))
+# Record latency, payload size and cache hits of every callback registered below (served on /metrics)
+instrument_app(app, 'nba')
 
 app.layout = html.Div(children=[
     html.H1("NBA Analytics Dashboard", style={'textAlign': 'center', 'color': '#FFD700', 'fontFamily': 'Arial Black'}),
     
     dcc.Dropdown(
         id='team-dropdown',
-        options=[{'label': team, 'value': team} for team in df['team'].unique()],
-        value=df['team'].unique()[0],
+        options=[{'label': team, 'value': team} for team in teams],
+        value=teams[0],
         clearable=False,
         style={'width': '50%', 'margin': 'auto'}
     ),
@@ -46,46 +106,97 @@ app.layout = html.Div(children=[
         dcc.Graph(id='team-performance'),
         dcc.Graph(id='player-performance'),
         dcc.Graph(id='tracking-data'),
+        dcc.Graph(id='player-trends'),
         dcc.Graph(id='physical-attributes'),
         dcc.Graph(id='ai-insights')
-    ], style={'padding': '20px'})
+    ], style={'padding': '20px'}),
+
+    dcc.Interval(id='live-interval', interval=LIVE_INTERVAL_MS, disabled=not LIVE_MODE)
 ])
 
-@app.callback(
-    [Output('team-performance', 'figure'),
-     Output('player-performance', 'figure'),
-     Output('tracking-data', 'figure'),
-     Output('physical-attributes', 'figure'),
-     Output('ai-insights', 'figure')],
-    [Input('team-dropdown', 'value')]
-)
-def update_graphs(selected_team):
-    team_df = df[df['team'] == selected_team]
-    
-    # Team Performance Graph
-    team_fig = px.bar(team_df, x='player', y='points', 
-                      title=f'Points Per Game - {selected_team}',
-                      color_discrete_sequence=['#FFD700'])
-    
-    # Player Performance Graph
-    player_fig = px.scatter(team_df, x='assists', y='rebounds',
-                            size='matches', color='player',
-                            title=f'Player Performance for {selected_team}')
-    
-    # Tracking Data Graph
-    tracking_fig = px.line(team_df, x='matches', y=['points', 'assists', 'rebounds'],
-                           title=f'Tracking Data for {selected_team}')
-    
-    # Physical Attributes Graph
-    physical_fig = px.bar(team_df, x='player', y=['steals', 'blocks'],
-                          title=f'Defensive Attributes of {selected_team}', barmode='group')
-
-    # AI Insights Graph
-    ai_fig = px.scatter(team_df, x='steals', y='blocks',
-                        color='player', size='points',
-                        title=f'AI-Driven Insights for {selected_team}')
-    
-    return team_fig, player_fig, tracking_fig, physical_fig, ai_fig
+# Figures of the team view, by graph id; each is built from the team's rows alone
+def team_performance_figure(team_df, selected_team):
+    return px.bar(team_df, x='player', y='points', 
+                  title=f'Points Per Game - {selected_team}',
+                  color_discrete_sequence=['#FFD700'])
+
+def player_performance_figure(team_df, selected_team):
+    return px.scatter(team_df, x='assists', y='rebounds',
+                      size='matches', color='player',
+                      title=f'Player Performance for {selected_team}')
+
+def tracking_data_figure(trend_df, selected_team):
+    return px.line(trend_df, x='game', y=['points', 'assists', 'rebounds'], hover_data=['date'], markers=True,
+                   title=f'Tracking Data for {selected_team} ({TREND_GAMES}-Game Rolling Average)')
+
+def player_trends_figure(trend_df, selected_team):
+    return px.line(trend_df, x='game', y='points', color='player', hover_data=['date', 'games played'],
+                   title=f'Points Per Game ({TREND_GAMES}-Game Rolling Average) - {selected_team}')
+
+def physical_attributes_figure(team_df, selected_team):
+    return px.bar(team_df, x='player', y=['steals', 'blocks'],
+                  title=f'Defensive Attributes of {selected_team}', barmode='group')
+
+def ai_insights_figure(team_df, selected_team):
+    return px.scatter(team_df, x='steals', y='blocks',
+                      color='player', size='points',
+                      title=f'AI-Driven Insights for {selected_team}')
+
+TEAM_FIGURES = {
+    'team-performance': team_performance_figure,
+    'player-performance': player_performance_figure,
+    'tracking-data': tracking_data_figure,
+    'player-trends': player_trends_figure,
+    'physical-attributes': physical_attributes_figure,
+    'ai-insights': ai_insights_figure,
+}
+
+def team_builder(graph_id, selected_team, data):
+    # The trend charts read precomputed slices of the rollup; the others the team's season totals
+    if graph_id == 'tracking-data':
+        trend_df = team_rollup(data, selected_team).team_totals(selected_team, 'rolling', TREND_GAMES, ['points', 'assists', 'rebounds'])
+        return (tracking_data_figure, trend_df, selected_team)
+    if graph_id == 'player-trends':
+        trend_df = team_rollup(data, selected_team).team_frame(selected_team, 'rolling', TREND_GAMES, ['points'])
+        return (player_trends_figure, trend_df, selected_team)
+    return (TEAM_FIGURES[graph_id], data.index.team(selected_team), selected_team)
+
+def build_team_figures(selected_team, data=None):
+    data = data or nba_data.current()
+    return build_figures([team_builder(graph_id, selected_team, data) for graph_id in TEAM_FIGURES])
+
+# Exported snapshots (snapshots.py) are served when they match the data; otherwise figures are built live
+def stored_figures(selected_team, data, graph_id=None):
+    # Exported figures never include games appended in live mode
+    if LIVE_MODE:
+        return None
+    if graph_id is None:
+        return snapshots.figures('nba', selected_team, data.version)
+    return snapshots.figure('nba', selected_team, data.version, graph_id)
+
+def team_graph(graph_id, selected_team, n_intervals=None):
+    data = sync_games()
+    key = figure_key('nba', data_key(data), selected_team, graph_id)
+    def build():
+        build_figure, *args = team_builder(graph_id, selected_team, data)
+        return build_figure(*args)
+    return figure_cache.get(key, lambda: stored_figures(selected_team, data, graph_id) or build())
+
+if FIGURE_MODE == 'split':
+    # One callback per graph: each figure is sent as soon as it is built
+    split_callbacks(app, list(TEAM_FIGURES), [Input('team-dropdown', 'value'), Input('live-interval', 'n_intervals')],
+                    team_graph)
+else:
+    @app.callback(
+        [Output(graph_id, 'figure') for graph_id in TEAM_FIGURES],
+        [Input('team-dropdown', 'value'),
+         Input('live-interval', 'n_intervals')]
+    )
+    def update_graphs(selected_team, n_intervals=None):
+        data = sync_games()
+        key = figure_key('nba', data_key(data), selected_team, 'team-graphs')
+        return figure_cache.get(key, lambda: stored_figures(selected_team, data)
+                                or build_team_figures(selected_team, data))
 
 if __name__ == '__main__':
     print(f"\nServer running at: http://{local_ip}:8050/\n")
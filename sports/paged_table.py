@@ -0,0 +1,121 @@
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+from callback_metrics import in_phase
+
+# Filter operators of dash_table's filter_query, by their spelled-out and symbolic forms
+_COMPARISONS = {
+    'eq': operator.eq, '=': operator.eq, 'ne': operator.ne, '!=': operator.ne,
+    'lt': operator.lt, '<': operator.lt, 'le': operator.le, '<=': operator.le,
+    'gt': operator.gt, '>': operator.gt, 'ge': operator.ge, '>=': operator.ge,
+}
+_CLAUSE = re.compile(r'^\{(?P<col>[^}]+)\}\s+(?P<op>contains|datestartswith|eq|ne|lt|le|gt|ge|=|!=|<=|>=|<|>)\s+(?P<value>.+)$')
+
+
+def parse_filter(query):
+    """(column, operator, value) clauses of a dash_table ``filter_query`` joined by ``&&``."""
+    clauses = []
+    for part in (query or '').split(' && '):
+        match = _CLAUSE.match(part.strip())
+        if match is None:
+            continue
+        value = match['value'].strip()
+        if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'`':
+            value = value[1:-1]
+        clauses.append((match['col'], match['op'], value))
+    return clauses
+
+
+class PagedTable:
+    """Server-side paging, sorting and filtering of one frame for a dash_table.DataTable.
+
+    Every column's ascending and descending row orders are computed once
+    (missing values last in both), so a sorted page is a slice of a
+    precomputed order, and a filter a boolean mask applied to it. Only the
+    rows of the requested page are ever converted for the browser.
+    """
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self._orders = {}
+        for col in self.df.columns:
+            values = self.df[col]
+            missing = values.isna().to_numpy()
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                keys = values.to_numpy(dtype=np.float64)
+            else:
+                keys = values.astype(str).to_numpy()
+            present = np.flatnonzero(~missing)
+            ascending = present[np.argsort(keys[present], kind='stable')]
+            missing = np.flatnonzero(missing)
+            self._orders[col] = (np.concatenate([ascending, missing]), np.concatenate([ascending[::-1], missing]))
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def columns(self):
+        return list(self.df.columns)
+
+    @in_phase('filter')
+    def page(self, page, page_size, sort_by=None, filter_query=''):
+        """Rows of one page as records, and the page count after filtering.
+
+        ``sort_by`` is the DataTable's list of {'column_id', 'direction'}; the
+        first entry decides the order (later entries are ignored). ``page`` is
+        clamped to the last page.
+        """
+        sort = (sort_by or [None])[0]
+        if sort and sort.get('column_id') in self._orders:
+            order = self._orders[sort['column_id']][sort.get('direction') == 'desc']
+        else:
+            order = np.arange(len(self.df))
+        mask = self._mask(filter_query)
+        if mask is not None:
+            order = order[mask[order]]
+
+        page_size = max(int(page_size or 1), 1)
+        page_count = max(-(-len(order) // page_size), 1)
+        page = min(max(int(page or 0), 0), page_count - 1)
+        rows = self.df.iloc[order[page * page_size:(page + 1) * page_size]]
+        return self._records(rows), page_count
+
+    def _mask(self, filter_query):
+        mask = None
+        for col, op, value in parse_filter(filter_query):
+            if col not in self.df.columns:
+                continue
+            values = self.df[col]
+            if pd.api.types.is_numeric_dtype(values) and op not in ('contains', 'datestartswith'):
+                try:
+                    matched = _COMPARISONS[op](values.to_numpy(dtype=np.float64), float(value))
+                except ValueError:
+                    matched = np.zeros(len(values), dtype=bool)  # a number column compared with text
+            elif isinstance(values.dtype, pd.CategoricalDtype):
+                # Match each label once, then look the rows up by code
+                labels = _text_match(pd.Series(values.cat.categories.astype(str)), op, value)
+                matched = np.append(labels, False)[values.cat.codes.to_numpy()]
+            else:
+                matched = _text_match(values.astype(str), op, value)
+            matched = np.asarray(matched, dtype=bool) & values.notna().to_numpy()
+            mask = matched if mask is None else mask & matched
+        return mask
+
+    def _records(self, rows):
+        # Plain Python values, so categorical labels and numpy scalars serialise cleanly
+        columns = {}
+        for col in rows.columns:
+            values = rows[col]
+            columns[col] = values.astype(object).where(values.notna(), None).tolist()
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def _text_match(text, op, value):
+    if op == 'contains':
+        return text.str.contains(value, case=False, regex=False).to_numpy()
+    if op == 'datestartswith':
+        return text.str.startswith(value).to_numpy()
+    return _COMPARISONS[op](text.to_numpy(), value)
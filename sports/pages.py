@@ -0,0 +1,16 @@
+# Dashboards served by sports_server.py: URL page name -> (script file, title)
+PAGES = {
+    'cricket': ('cricket.py', 'Cricket'),
+    'nba': ('nba.py', 'NBA'),
+    'football': ('football.py', 'Football'),
+    'multi': ('multi sports.py', 'Multi-Sports'),
+    'leaderboard': ('leaderboard.py', 'Leaderboards'),
+}
+
+# Set by sports_server.py, so the dashboards mount under /<page>/ instead of /
+MOUNTED = False
+
+
+def url_prefix(page):
+    """URL prefix a dashboard's Dash app should use: '/<page>/' when mounted, else '/'."""
+    return f'/{page}/' if MOUNTED else '/'
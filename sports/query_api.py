@@ -0,0 +1,379 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from flask import Blueprint, Response, jsonify, request
+
+from archive import ARCHIVE_MODE, ArchiveDataset
+from data_refresh import LiveDataset
+from table_index import TableIndex, shared_index
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow IPC responses are optional; JSON is always available
+    pa = None
+
+# Read-only stats API for machine clients, mounted by sports_server.py under /api/:
+#   GET  /api/                           datasets with their version, teams and columns
+#   GET  /api/<dataset>/rows?team=...    team/player rows, optionally only some columns, a page at a time
+#   GET  /api/<dataset>/aggregate?...    per-team (or per-player) count/sum/mean/min/max
+#   POST /api/batch                      many row/aggregate queries in one call
+# It reads its own snapshots of the datasets (the frames and indexes are shared with the
+# dashboards), so answering a query never imports a dashboard or builds a figure.
+
+# Datasets served, with their team and player columns
+QUERY_DATASETS = {
+    'cricket_batting': ('team', 'player'),
+    'cricket_bowling': ('team', 'player'),
+    'nba': ('team', 'player'),
+    'nba_games': ('team', 'player'),
+    'football': ('team name', 'player name'),
+}
+
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+
+# Responses smaller than this are sent uncompressed (gzip would barely shrink them)
+COMPRESS_MIN_BYTES = int(os.environ.get('SPORTS_API_COMPRESS_MIN_BYTES', 1024))
+
+# Most queries sent per batch request
+MAX_BATCH_QUERIES = int(os.environ.get('SPORTS_API_MAX_BATCH', 100))
+
+# Most rows sent per rows query (the default page size); larger results are read with limit and offset
+MAX_PAGE_ROWS = int(os.environ.get('SPORTS_API_MAX_ROWS', 10_000))
+
+# Encoded responses kept per process (entries, total bytes): a repeated scrape of the same query
+# is a dictionary lookup
+RESPONSE_CACHE_ENTRIES = int(os.environ.get('SPORTS_API_CACHE_ENTRIES', 256))
+RESPONSE_CACHE_BYTES = int(os.environ.get('SPORTS_API_CACHE_BYTES', 64 * 1024 * 1024))
+
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+class QueryError(ValueError):
+    """A query the API cannot answer (unknown dataset, column or aggregate); sent back as a 4xx."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _lookups(team_col, player_col):
+    def build(df):
+        return {'index': shared_index(df, team_col, player_col)}
+    return build
+
+
+# Loaded on first query and refreshed like the dashboards' data (archive partitions in archive mode)
+api_data = {
+    name: ArchiveDataset(name) if ARCHIVE_MODE else LiveDataset([name], _lookups(team_col, player_col))
+    for name, (team_col, player_col) in QUERY_DATASETS.items()
+}
+
+
+def dataset(name):
+    """Current snapshot of a served dataset."""
+    if name not in api_data:
+        raise QueryError(f"unknown dataset {name!r} (choose from {', '.join(api_data)})", 404)
+    return api_data[name].current()
+
+
+def dataset_columns(data):
+    index = data.index
+    if isinstance(index, TableIndex):
+        return list(index.df.columns)
+    return list(index.archive.manifest(index.dataset)['columns'])
+
+
+def select_rows(data, teams=None, players=None, columns=None):
+    """Rows of ``teams`` (default: all) and ``players`` (default: all), in the order requested."""
+    index = data.index
+    known = set(dataset_columns(data))
+    unknown = [col for col in columns or [] if col not in known]
+    if unknown:
+        raise QueryError(f"unknown column(s): {', '.join(unknown)}")
+
+    if teams is None and players and isinstance(index, TableIndex):
+        df = index.players(players)  # precomputed player -> rows lookup
+    else:
+        frames = [index.team(team) for team in (index.teams if teams is None else teams)]
+        df = pd.concat(frames, ignore_index=True) if frames else index.team(None)
+        if players:
+            df = df[df[index.player_col].isin(players)]
+    df = df.reset_index(drop=True)
+    return df if columns is None else df[columns]
+
+
+def page_rows(df, limit=None, offset=None):
+    """Rows ``offset`` to ``offset + limit`` of a query, with the fields telling the client where they are.
+
+    ``limit`` defaults to, and may not exceed, MAX_PAGE_ROWS.
+    """
+    limit = MAX_PAGE_ROWS if limit is None else limit
+    offset = 0 if offset is None else offset
+    if not 1 <= limit <= MAX_PAGE_ROWS:
+        raise QueryError(f"limit must be between 1 and {MAX_PAGE_ROWS}, not {limit}")
+    if offset < 0:
+        raise QueryError(f"offset must not be negative, not {offset}")
+    page = df.iloc[offset:offset + limit].reset_index(drop=True)
+    return page, {'offset': offset, 'limit': limit, 'total_rows': len(df)}
+
+
+def aggregate_rows(data, teams=None, players=None, columns=None, by='team', aggregates=AGGREGATES):
+    """``aggregates`` of the numeric ``columns`` per team (``by='team'``) or per team and player."""
+    index = data.index
+    if by not in ('team', 'player'):
+        raise QueryError(f"by must be 'team' or 'player', not {by!r}")
+    unknown = [name for name in aggregates if name not in AGGREGATES]
+    if unknown:
+        raise QueryError(f"unknown aggregate(s): {', '.join(unknown)} (choose from {', '.join(AGGREGATES)})")
+    keys = [index.team_col] if by == 'team' else [index.team_col, index.player_col]
+
+    df = select_rows(data, teams, players, None if columns is None else [*keys, *columns])
+    numeric = [col for col in df.columns if col not in keys and pd.api.types.is_numeric_dtype(df[col])
+               and not pd.api.types.is_bool_dtype(df[col])]
+    if columns is not None and len(numeric) < len(columns):
+        raise QueryError(f"not numeric: {', '.join(col for col in columns if col not in numeric)}")
+
+    grouped = df[numeric].astype(np.float64).groupby([df[key].astype(object) for key in keys], sort=False)
+    result = grouped.agg(list(aggregates))
+    result.columns = [f"{name}({col})" for col, name in result.columns]
+    return result.reset_index()
+
+
+def frame_json(df, **fields):
+    """JSON text of ``fields`` plus the frame as "columns" and "data" (rows), NaN as null and times in ISO."""
+    # Through plain Python values rather than DataFrame.to_json, whose fixed decimal places
+    # write 55.3 as 55.299999999999997; json writes the shortest form that reads back the same
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_dtype(values):
+            text = np.datetime_as_string(values.to_numpy(dtype='datetime64[ms]'), unit='ms')
+            values = pd.Series(text, index=values.index).where(values.notna())
+        elif pd.api.types.is_float_dtype(values):
+            values = values.where(np.isfinite(values))
+        columns[col] = values.astype(object).where(values.notna(), None).tolist()
+    return json.dumps({**fields, 'columns': [str(col) for col in df.columns], 'data': list(zip(*columns.values()))})
+
+
+def frame_arrow(df, **metadata):
+    """A frame as an Arrow IPC stream, ``metadata`` stored in its schema."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           **{key: str(value) for key, value in metadata.items()}})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _query_args(args):
+    teams = args.getlist('team') or None
+    players = args.getlist('player') or None
+    columns = [col.strip() for col in args['columns'].split(',') if col.strip()] if args.get('columns') else None
+    return teams, players, columns
+
+
+def _int_arg(args, name):
+    value = args.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer, not {value!r}") from None
+
+
+def _string_list(query, field):
+    # A batch query's list field: missing, or a JSON list of strings
+    value = query.get(field)
+    if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+        raise QueryError(f"{field} must be a list of strings")
+    return value
+
+
+def _int_field(query, field):
+    # A batch query's integer field: missing, or a JSON integer
+    value = query.get(field)
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+        raise QueryError(f"{field} must be an integer")
+    return value
+
+
+def _run(query, snapshots):
+    # One query of a batch: {"dataset", "kind": "rows" | "aggregate", "teams", "players", "columns",
+    # "limit", "offset" (rows) or "by", "aggregates" (aggregate)}
+    if not isinstance(query, dict):
+        raise QueryError("each query must be an object")
+    if not isinstance(query.get('dataset'), str):
+        raise QueryError("dataset must be a string")
+    data = snapshots.get(query['dataset']) or dataset(query['dataset'])
+    teams, players, columns = (_string_list(query, field) for field in ('teams', 'players', 'columns'))
+    kind = query.get('kind', 'rows')
+    if kind == 'rows':
+        limit, offset = _int_field(query, 'limit'), _int_field(query, 'offset')
+        df, fields = page_rows(select_rows(data, teams, players, columns), limit, offset)
+    elif kind == 'aggregate':
+        aggregates = _string_list(query, 'aggregates')
+        df, fields = aggregate_rows(data, teams, players, columns, query.get('by', 'team'), aggregates or AGGREGATES), {}
+    else:
+        raise QueryError(f"kind must be 'rows' or 'aggregate', not {kind!r}")
+    return frame_json(df, dataset=query['dataset'], version=data.version, **fields)
+
+
+class ResponseCache:
+    """Encoded API responses by ETag, bounded by entry count and total bytes (oldest used dropped first)."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_ENTRIES, max_bytes=RESPONSE_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+
+    def get(self, etag, build):
+        """(body, gzipped body or None) for ``etag``, calling ``build()`` on a miss."""
+        with self._lock:
+            if etag in self._entries:
+                self._entries.move_to_end(etag)
+                return self._entries[etag]
+        value = build()
+        size = sum(len(part) for part in value if part is not None)
+        with self._lock:
+            if etag not in self._entries and size <= self.max_bytes:
+                self._entries[etag] = value
+                self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self.bytes -= sum(len(part) for part in dropped if part is not None)
+        return value
+
+
+responses = ResponseCache()
+
+
+def _etag(*parts):
+    # Everything a response depends on, dataset versions included
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+def _respond(etag, build, mimetype='application/json'):
+    """Response for a query identified by ``etag``: 304 if the client has it, else the (gzipped) body.
+
+    ``build()`` returns the body bytes, and runs only when the response is not cached.
+    The ETag is weak, as the body is the same whether or not it is sent gzipped.
+    """
+    if request.method in ('GET', 'HEAD') and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def encode():
+        body = build()
+        return body, gzip.compress(body, compresslevel=5) if len(body) >= COMPRESS_MIN_BYTES else None
+
+    body, compressed = responses.get(etag, encode)
+    response = Response(body, mimetype=mimetype)
+    if compressed is not None and 'gzip' in request.accept_encodings:
+        response.set_data(compressed)
+        response.content_encoding = 'gzip'
+    response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = True
+    return response
+
+
+def _wants_arrow():
+    fmt = request.args.get('format')
+    if fmt is None:
+        fmt = 'arrow' if request.accept_mimetypes.best_match(['application/json', ARROW_MIMETYPE]) == ARROW_MIMETYPE \
+            else 'json'
+    if fmt not in ('json', 'arrow'):
+        raise QueryError(f"format must be 'json' or 'arrow', not {fmt!r}")
+    if fmt == 'arrow' and pa is None:
+        raise QueryError("Arrow responses need pyarrow installed on the server; use format=json", 406)
+    return fmt == 'arrow'
+
+
+def _frame_response(name, data, kind, query, make_frame):
+    # make_frame() returns the frame and any other fields of the response
+    arrow = _wants_arrow()
+    etag = _etag(name, data.version, kind, query, 'arrow' if arrow else 'json')
+
+    def build():
+        df, fields = make_frame()
+        if arrow:
+            return frame_arrow(df, dataset=name, version=data.version, **fields)
+        return frame_json(df, dataset=name, version=data.version, **fields).encode()
+    return _respond(etag, build, ARROW_MIMETYPE if arrow else 'application/json')
+
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+
+@api.errorhandler(QueryError)
+def query_error(error):
+    return jsonify({'error': str(error)}), error.status
+
+
+@api.route('/')
+def list_datasets():
+    summary = {}
+    for name in api_data:
+        data = dataset(name)
+        summary[name] = {'version': data.version, 'team_col': data.index.team_col,
+                         'player_col': data.index.player_col, 'teams': list(data.index.teams),
+                         'columns': dataset_columns(data)}
+    return _respond(_etag('datasets', {name: info['version'] for name, info in summary.items()}),
+                    lambda: json.dumps({'datasets': summary}).encode())
+
+
+@api.route('/<name>/rows')
+def rows(name):
+    data = dataset(name)
+    teams, players, columns = _query_args(request.args)
+    limit, offset = _int_arg(request.args, 'limit'), _int_arg(request.args, 'offset')
+    return _frame_response(name, data, 'rows', [teams, players, columns, limit, offset],
+                           lambda: page_rows(select_rows(data, teams, players, columns), limit, offset))
+
+
+@api.route('/<name>/aggregate')
+def aggregate(name):
+    data = dataset(name)
+    teams, players, columns = _query_args(request.args)
+    by = request.args.get('by', 'team')
+    aggregates = request.args['aggregates'].split(',') if request.args.get('aggregates') else list(AGGREGATES)
+    return _frame_response(name, data, 'aggregate', [teams, players, columns, by, aggregates],
+                           lambda: (aggregate_rows(data, teams, players, columns, by, aggregates), {}))
+
+
+@api.route('/batch', methods=['POST'])
+def batch():
+    body = request.get_json(silent=True)
+    queries = body.get('queries') if isinstance(body, dict) else None
+    if not isinstance(queries, list):
+        raise QueryError('expected a JSON body {"queries": [...]}')
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise QueryError(f"at most {MAX_BATCH_QUERIES} queries per batch", 413)
+    # One snapshot per dataset named, whose versions go into the ETag
+    names = {query.get('dataset') for query in queries
+             if isinstance(query, dict) and isinstance(query.get('dataset'), str)}
+    snapshots = {name: dataset(name) for name in names if name in api_data}
+
+    def run_all():
+        results = []
+        for query in queries:
+            try:
+                results.append(_run(query, snapshots))
+            except QueryError as error:
+                results.append(json.dumps({'error': str(error)}))
+        return f'{{"results": [{", ".join(results)}]}}'.encode()
+
+    versions = {name: data.version for name, data in snapshots.items()}
+    return _respond(_etag('batch', versions, queries), run_all)
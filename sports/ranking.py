@@ -0,0 +1,238 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from callback_metrics import in_phase
+
+# A ranked stat: per-player value of ``column`` aggregated over the player's rows with ``how``
+# ('last' row, 'max' or 'sum'), optionally divided by the last value of ``per``;
+# ``ascending`` stats rank lower values first (e.g. economy)
+Stat = namedtuple('Stat', 'column how per ascending', defaults=('last', None, False))
+
+# Stats ranked per dataset, with the team and player columns of its rows
+LEADERBOARDS = {
+    'cricket_batting': ('team', 'player', {
+        'runs': Stat('runs'),
+        'average': Stat('average'),
+        'strike rate': Stat('strike rate'),
+        'fours': Stat('fours'),
+        'sixes': Stat('sixes'),
+        'runs per match': Stat('runs', per='matches'),
+    }),
+    'cricket_bowling': ('team', 'player', {
+        'wickets': Stat('wickets'),
+        'economy': Stat('economy', ascending=True),
+        'bowling average': Stat('bowling average', ascending=True),
+        'wickets per match': Stat('wickets', per='matches'),
+    }),
+    'nba': ('team', 'player', {
+        'points': Stat('points'),
+        'points per match': Stat('points', per='matches'),
+        'assists': Stat('assists'),
+        'rebounds': Stat('rebounds'),
+        'steals': Stat('steals'),
+        'blocks': Stat('blocks'),
+    }),
+    'football': ('team name', 'player name', {
+        'top speed (m/s)': Stat('speed (m/s)', 'max'),
+        'distance covered (m)': Stat('distance covered (m)', 'max'),
+        'sprint count': Stat('sprint count', 'max'),
+        'pass accuracy (%)': Stat('pass accuracy (%)'),
+        'successful tackles': Stat('successful tackles', 'max'),
+        'shots on target (%)': Stat('shots on target (%)'),
+    }),
+}
+
+
+class Leaderboard:
+    """Players of every team ranked by each stat, with per-team aggregates.
+
+    Per player, only the aggregated value of each stat is kept; per stat, the
+    ranked players' values stay sorted. Appending rows updates the touched
+    players' values and moves just those players within each sorted index,
+    so top-k is a slice and a rank or percentile a binary search. Players are
+    keyed by (team, player), as the same name may play for several teams.
+    """
+
+    def __init__(self, stats, team_col='team', player_col='player'):
+        self.stats = dict(stats)
+        self.team_col = team_col
+        self.player_col = player_col
+        self.keys = []
+        self.key_codes = {}
+        self.player_codes = {}
+        self.teams = []
+        self.team_codes = {}
+        self._player_team = np.zeros(0, dtype=np.int64)
+        self._raw = {}
+        self._values = {name: np.zeros(0) for name in self.stats}
+        self._sorted = {name: np.zeros(0) for name in self.stats}
+        self._order = {name: np.zeros(0, dtype=np.int64) for name in self.stats}
+        self._team_aggregates = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, stats, **kwargs):
+        board = cls(stats, **kwargs)
+        board.add(df)
+        return board
+
+    def add(self, df):
+        """Fold new rows into the per-player values, sorted indexes and team aggregates."""
+        df = df[df[self.team_col].notna() & df[self.player_col].notna()]
+        if len(df) == 0:
+            return
+        with self._lock:
+            codes = self._key_codes(df[self.team_col], df[self.player_col])
+            self._grow(len(self.keys))
+            touched = np.unique(codes)
+            # Rows in order, so 'last' keeps each player's latest row
+            for column, how in self._columns():
+                values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+                raw = self._raw[column, how]
+                valid = ~np.isnan(values)
+                if how == 'last':
+                    raw[codes[valid]] = values[valid]
+                elif how == 'max':
+                    np.fmax.at(raw, codes[valid], values[valid])
+                else:
+                    raw[touched] = np.nan_to_num(raw[touched])
+                    np.add.at(raw, codes[valid], values[valid])
+            for name, stat in self.stats.items():
+                value = self._raw[stat.column, stat.how][touched]
+                if stat.per is not None:
+                    per = self._raw[stat.per, 'last'][touched]
+                    value = np.divide(value, per, out=np.full(len(touched), np.nan), where=per > 0)
+                self._values[name][touched] = value
+                self._reindex(name, touched)
+            self._team_aggregates = {}
+
+    @in_phase('filter')
+    def top(self, stat, k=10, team=None):
+        """Best ``k`` players by ``stat`` (of one ``team``, or all): rank, team, player, value, percentile."""
+        with self._lock:
+            order = self._order[stat]
+            best = order if self.stats[stat].ascending else order[::-1]
+            if team is not None:
+                best = best[self._player_team[best] == self.team_codes.get(team, -1)]
+            best = best[:k]
+            values = self._values[stat][best]
+            ranks, percentiles = self._rank_values(stat, values)
+            return pd.DataFrame({
+                'rank': ranks,
+                self.team_col: [self.keys[code][0] for code in best],
+                self.player_col: [self.keys[code][1] for code in best],
+                stat: values,
+                'percentile': percentiles,
+            })
+
+    @in_phase('filter')
+    def rank(self, stat, player, team=None):
+        """(rank, percentile, value) of a player among everyone ranked by ``stat``, or None."""
+        with self._lock:
+            if team is None:
+                codes = self.player_codes.get(player, [])
+            else:
+                codes = [self.key_codes[(team, player)]] if (team, player) in self.key_codes else []
+            values = self._values[stat][codes]
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                return None
+            value = values.min() if self.stats[stat].ascending else values.max()
+            ranks, percentiles = self._rank_values(stat, np.array([value]))
+            return int(ranks[0]), float(percentiles[0]), float(value)
+
+    def team_table(self, stat):
+        """Sum, mean and max of ``stat`` over each team's ranked players."""
+        with self._lock:
+            if stat not in self._team_aggregates:
+                values = self._values[stat]
+                valid = ~np.isnan(values)
+                teams = self._player_team[valid]
+                n = len(self.teams)
+                count = np.bincount(teams, minlength=n)
+                total = np.bincount(teams, values[valid], minlength=n)
+                best = np.full(n, np.nan)
+                np.fmax.at(best, teams, values[valid])
+                self._team_aggregates[stat] = pd.DataFrame({
+                    self.team_col: self.teams,
+                    'players': count,
+                    'sum': total,
+                    'mean': np.divide(total, count, out=np.full(n, np.nan), where=count > 0),
+                    'max': best,
+                })
+            return self._team_aggregates[stat]
+
+    def players(self, team=None):
+        """Names of the ranked players (of one team)."""
+        with self._lock:
+            return [player for key_team, player in self.keys if team is None or key_team == team]
+
+    def _columns(self):
+        columns = {(stat.column, stat.how) for stat in self.stats.values()}
+        columns |= {(stat.per, 'last') for stat in self.stats.values() if stat.per is not None}
+        return sorted(columns)
+
+    def _rank_values(self, stat, values):
+        # Ties share the best rank; percentile = share of ranked players doing no better
+        ranked = self._sorted[stat]
+        n = len(ranked)
+        if self.stats[stat].ascending:
+            ranks = np.searchsorted(ranked, values, 'left') + 1
+            percentiles = (n - ranks + 1) * 100.0 / max(n, 1)
+        else:
+            ranks = n - np.searchsorted(ranked, values, 'right') + 1
+            percentiles = np.searchsorted(ranked, values, 'right') * 100.0 / max(n, 1)
+        return ranks, percentiles
+
+    def _reindex(self, name, touched):
+        values = self._values[name]
+        if len(touched) * 8 > len(self._order[name]):
+            # Many players moved (e.g. the first load): sort from scratch
+            ranked = np.flatnonzero(~np.isnan(values))
+            order = ranked[np.argsort(values[ranked], kind='stable')]
+        else:
+            # Take the touched players out, then insert them back at their new positions
+            order = self._order[name]
+            order = order[~np.isin(order, touched)]
+            moved = touched[~np.isnan(values[touched])]
+            moved = moved[np.argsort(values[moved], kind='stable')]
+            positions = np.searchsorted(values[order], values[moved], 'right')
+            order = np.insert(order, positions, moved)
+        self._order[name] = order
+        self._sorted[name] = values[order]
+
+    def _key_codes(self, teams, players):
+        keys = pd.MultiIndex.from_arrays([np.asarray(teams, dtype=object), np.asarray(players, dtype=object)])
+        codes, uniques = pd.factorize(keys)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, key in enumerate(uniques):
+            if key not in self.key_codes:
+                self.key_codes[key] = len(self.keys)
+                self.keys.append(key)
+                self.player_codes.setdefault(key[1], []).append(self.key_codes[key])
+                if key[0] not in self.team_codes:
+                    self.team_codes[key[0]] = len(self.teams)
+                    self.teams.append(key[0])
+            mapping[i] = self.key_codes[key]
+        return mapping[codes]
+
+    def _grow(self, n_keys):
+        old = len(self._player_team)
+        if n_keys <= old:
+            return
+        self._player_team = np.concatenate(
+            [self._player_team, [self.team_codes[team] for team, _ in self.keys[old:]]]).astype(np.int64)
+        for column, how in self._columns():
+            raw = self._raw.get((column, how), np.zeros(0))
+            self._raw[column, how] = np.concatenate([raw, np.full(n_keys - old, np.nan)])
+        for name in self.stats:
+            self._values[name] = np.concatenate([self._values[name], np.full(n_keys - old, np.nan)])
+
+
+def build_leaderboard(df, dataset):
+    """Leaderboard of a loaded dataset, with the stats registered in LEADERBOARDS."""
+    team_col, player_col, stats = LEADERBOARDS[dataset]
+    return Leaderboard.from_frame(df, stats, team_col=team_col, player_col=player_col)
@@ -0,0 +1,267 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from callback_metrics import in_phase
+
+# Box-score stats rolled up per game
+GAME_STATS = ['points', 'assists', 'rebounds', 'steals', 'blocks']
+
+# Rolling windows (in team games) kept precomputed; other windows are derived from the cumulative sums
+ROLLING_WINDOWS = (3, 5, 10)
+
+# Views of the cube: the game's own value, running total, running per-game average, rolling mean
+VIEWS = ('game', 'cumulative', 'average', 'rolling')
+
+
+class GameRollup:
+    """Per-game stats of every player, rolled up along each team's schedule.
+
+    The cube is indexed by player (grouped by team) x team game number x stat.
+    Next to each game's values it keeps the running sums and games played, so
+    the running total, per-game average and any N-game rolling mean at any
+    game are a subtraction and a division. The rolling means of
+    ROLLING_WINDOWS are stored outright, so a team's trend is a slice. Each
+    team's summed stats and their running sums are kept the same way.
+    Appending a game only recomputes the touched players and teams from that
+    game on, which for the latest game is one column of the cube.
+    """
+
+    def __init__(self, stats=GAME_STATS, team_col='team', player_col='player', game_col='game',
+                 date_col='date', windows=ROLLING_WINDOWS):
+        self.stats = list(stats)
+        self.team_col = team_col
+        self.player_col = player_col
+        self.game_col = game_col
+        self.date_col = date_col
+        self.windows = tuple(windows)
+        self.keys = []
+        self.key_codes = {}
+        self.team_players = {}
+        self.team_codes = {}
+        self.team_dates = {}
+        self.revision = 0
+        n_stats = len(self.stats)
+        self._values = np.zeros((0, 0, n_stats))
+        self._played = np.zeros((0, 0), dtype=bool)
+        self._sums = np.zeros((0, 0, n_stats))
+        self._counts = np.zeros((0, 0), dtype=np.int32)
+        self._rolling = {window: np.zeros((0, 0, n_stats)) for window in self.windows}
+        # The same per team (indexed by team code): the players' summed stats, and running sums
+        self._team_values = np.zeros((0, 0, n_stats))
+        self._team_played = np.zeros((0, 0), dtype=bool)
+        self._team_sums = np.zeros((0, 0, n_stats))
+        self._team_counts = np.zeros((0, 0), dtype=np.int32)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        rollup = cls(**kwargs)
+        rollup.add(df)
+        return rollup
+
+    @property
+    def n_games(self):
+        return self._values.shape[1]
+
+    @property
+    def teams(self):
+        return list(self.team_players)
+
+    def add(self, df):
+        """Fold box-score rows (one per player and game) into the cube; a repeated row replaces the earlier one."""
+        df = df[df[self.team_col].notna() & df[self.player_col].notna() & df[self.game_col].notna()]
+        if len(df) == 0:
+            return
+        with self._lock:
+            codes = self._key_codes(df[self.team_col], df[self.player_col])
+            games = pd.to_numeric(df[self.game_col]).to_numpy(dtype=np.int64) - 1  # game numbers start at 1
+            if games.min() < 0:
+                raise ValueError(f"{self.game_col} must start at 1")
+            self._grow(len(self.keys), int(games.max()) + 1)
+
+            for i, stat in enumerate(self.stats):
+                values = pd.to_numeric(df[stat], errors='coerce').to_numpy(dtype=np.float64) \
+                    if stat in df.columns else np.full(len(df), np.nan)
+                self._values[codes, games, i] = values
+            self._played[codes, games] = True
+            if self.date_col in df.columns:
+                dates = pd.to_datetime(df[self.date_col], errors='coerce').to_numpy(dtype='datetime64[ns]')
+                known = ~np.isnat(dates)
+                teams = np.asarray(df[self.team_col], dtype=object)[known]
+                for team in pd.unique(teams):
+                    rows = teams == team
+                    self.team_dates[team][games[known][rows]] = dates[known][rows]
+
+            # Recompute the touched players from their earliest changed game on
+            touched, inverse = np.unique(codes, return_inverse=True)
+            first = np.full(len(touched), self.n_games)
+            np.minimum.at(first, inverse, games)
+            for start in np.unique(first):
+                self._rollup(touched[first == start], int(start))
+            teams = np.asarray(df[self.team_col], dtype=object)
+            for team in pd.unique(teams):
+                self._rollup_team(team, int(games[teams == team].min()))
+            self.revision += 1
+
+    @in_phase('filter')
+    def team_frame(self, team, view='rolling', window=5, stats=None):
+        """One team's ``view`` of ``stats`` per player and game, as a long frame.
+
+        Columns: team, player, game, date (when known), games played so far and
+        one column per stat. Games a player missed are left out; ``window`` is
+        used by the 'rolling' view (in team games, missed games not counted).
+        """
+        if view not in VIEWS:
+            raise ValueError(f"view must be one of {', '.join(VIEWS)}")
+        stats = list(stats or self.stats)
+        columns = [self.stats.index(stat) for stat in stats]
+        with self._lock:
+            codes = self.team_players.get(team, [])
+            values = self._view(codes, view, window)[:, :, columns]
+            played = self._played[codes]
+            counts = self._counts[codes]
+            rows, games = np.nonzero(played)
+            frame = {
+                self.team_col: team,
+                self.player_col: np.array([self.keys[code][1] for code in codes], dtype=object)[rows],
+                self.game_col: games + 1,
+                self.date_col: self._dates(team)[games],
+                'games played': counts[rows, games],
+            }
+            for i, stat in enumerate(stats):
+                frame[stat] = values[rows, games, i]
+        return pd.DataFrame(frame)
+
+    @in_phase('filter')
+    def team_totals(self, team, view='rolling', window=5, stats=None):
+        """The team's summed per-game stats by game: that game's total, running total, average or rolling mean."""
+        if view not in VIEWS:
+            raise ValueError(f"view must be one of {', '.join(VIEWS)}")
+        stats = list(stats or self.stats)
+        columns = [self.stats.index(stat) for stat in stats]
+        with self._lock:
+            if team not in self.team_codes:
+                return pd.DataFrame(columns=[self.game_col, self.date_col, *stats])
+            code = self.team_codes[team]
+            result = _view_of(self._team_values[code][:, columns], self._team_sums[code][:, columns],
+                              self._team_counts[code], view, window)
+            games = np.flatnonzero(self._team_played[code])
+            frame = {self.game_col: games + 1, self.date_col: self._dates(team)[games]}
+            for i, stat in enumerate(stats):
+                frame[stat] = result[games, i]
+        return pd.DataFrame(frame)
+
+    def _dates(self, team):
+        # Date of each of the team's games (NaT when unknown)
+        return self.team_dates.get(team, _no_dates(self.n_games))
+
+    def _view(self, codes, view, window):
+        if view == 'game':
+            return self._values[codes]
+        if view == 'rolling' and window in self._rolling:
+            return self._rolling[window][codes]
+        return _view_of(self._values[codes], self._sums[codes], self._counts[codes], view, window, axis=1)
+
+    def _rollup(self, codes, start):
+        # Running sums and games played from ``start`` on, continuing from the game before it
+        played = self._played[codes, start:]
+        sums = np.cumsum(np.where(played[:, :, None], np.nan_to_num(self._values[codes, start:]), 0.0), axis=1)
+        counts = np.cumsum(played, axis=1, dtype=np.int32)
+        if start > 0:
+            sums += self._sums[codes, start - 1][:, None]
+            counts += self._counts[codes, start - 1][:, None]
+        self._sums[codes, start:] = sums
+        self._counts[codes, start:] = counts
+        # A rolling mean reads the sums ``window`` games back, so only games from ``start`` on change
+        for window, rolling in self._rolling.items():
+            low = max(start - window, 0)
+            means = _view_of(None, self._sums[codes, low:], self._counts[codes, low:], 'rolling', window, axis=1)
+            rolling[codes, start:] = means[:, start - low:]
+
+    def _rollup_team(self, team, start):
+        # The team's summed stats, running sums and games played from ``start`` on
+        code = self.team_codes[team]
+        players = self.team_players[team]
+        played = self._played[players, start:].any(axis=0)
+        totals = np.nansum(self._values[players, start:], axis=0)
+        sums = np.cumsum(np.where(played[:, None], totals, 0.0), axis=0)
+        counts = np.cumsum(played, dtype=np.int32)
+        if start > 0:
+            sums += self._team_sums[code, start - 1]
+            counts += self._team_counts[code, start - 1]
+        self._team_values[code, start:] = totals
+        self._team_played[code, start:] = played
+        self._team_sums[code, start:] = sums
+        self._team_counts[code, start:] = counts
+
+    def _key_codes(self, teams, players):
+        keys = pd.MultiIndex.from_arrays([np.asarray(teams, dtype=object), np.asarray(players, dtype=object)])
+        codes, uniques = pd.factorize(keys)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, key in enumerate(uniques):
+            if key not in self.key_codes:
+                self.key_codes[key] = len(self.keys)
+                self.keys.append(key)
+                self.team_players.setdefault(key[0], []).append(self.key_codes[key])
+                self.team_codes.setdefault(key[0], len(self.team_codes))
+                self.team_dates.setdefault(key[0], _no_dates(self.n_games))
+            mapping[i] = self.key_codes[key]
+        return mapping[codes]
+
+    def _grow(self, n_keys, n_games):
+        old_keys, old_games = self._played.shape
+        old_teams, n_teams = len(self._team_played), len(self.team_codes)
+        n_keys, n_games = max(n_keys, old_keys), max(n_games, old_games)
+        if (n_keys, n_games, n_teams) == (old_keys, old_games, old_teams):
+            return
+
+        def grown(array, fill, n_rows, carry=False):
+            old_rows = len(array)
+            bigger = np.full((n_rows, n_games, *array.shape[2:]), fill, dtype=array.dtype)
+            bigger[:old_rows, :old_games] = array
+            if carry and old_games:
+                # Running sums and counts carry over the games not played yet
+                bigger[:old_rows, old_games:] = array[:, old_games - 1:old_games]
+            return bigger
+
+        self._values = grown(self._values, np.nan, n_keys)
+        self._played = grown(self._played, False, n_keys)
+        self._sums = grown(self._sums, 0.0, n_keys, carry=True)
+        self._counts = grown(self._counts, 0, n_keys, carry=True)
+        self._rolling = {window: grown(rolling, np.nan, n_keys) for window, rolling in self._rolling.items()}
+        self._team_values = grown(self._team_values, 0.0, n_teams)
+        self._team_played = grown(self._team_played, False, n_teams)
+        self._team_sums = grown(self._team_sums, 0.0, n_teams, carry=True)
+        self._team_counts = grown(self._team_counts, 0, n_teams, carry=True)
+        self.team_dates = {team: np.concatenate([dates, _no_dates(n_games - len(dates))])
+                           for team, dates in self.team_dates.items()}
+
+
+def _no_dates(n):
+    return np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+
+
+def _view_of(values, sums, counts, view, window=5, axis=0):
+    # Running total, per-game average or ``window``-game rolling mean along the game axis,
+    # from running sums and games played (missed games count for neither)
+    if view == 'game':
+        return values
+    if view == 'cumulative':
+        return sums
+    counts = np.asarray(counts, dtype=np.float64)[..., None]
+    if view == 'average':
+        return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+    window = max(int(window), 1)
+    shift = [(0, 0)] * sums.ndim
+    shift[axis] = (window, 0)
+    earlier_sums = np.take(np.pad(sums, shift), np.arange(sums.shape[axis]), axis=axis)
+    earlier_counts = np.take(np.pad(counts, shift), np.arange(counts.shape[axis]), axis=axis)
+    in_window = counts - earlier_counts
+    return np.divide(sums - earlier_sums, in_window, out=np.full(sums.shape, np.nan), where=in_window > 0)
+
+
+def build_game_rollup(df):
+    """GameRollup of the loaded per-game NBA box scores (dataset 'nba_games')."""
+    return GameRollup.from_frame(df)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# In-memory dtype of each dataset's columns (names as normalised by data_loader):
+#   'category' - repeated labels (teams, players, positions), stored as small integer codes
+#   'datetime' - parsed to datetime64[ns]
+#   a numpy dtype - numeric stats downcast to it; integers only when every value fits
+# Decimal stats stay float64: as float32, 55.3 would reach figures, tables and the API as
+# 55.29999923706055. Columns not listed keep the dtype pandas parsed them with.
+SCHEMAS = {
+    'cricket_batting': {
+        'team': 'category', 'player': 'category',
+        'matches': 'int16', 'runs': 'int32', 'average': 'float64', 'strike rate': 'float64',
+        'fours': 'int16', 'sixes': 'int16',
+    },
+    'cricket_bowling': {
+        'team': 'category', 'player': 'category',
+        'matches': 'int16', 'wickets': 'int16', 'economy': 'float64', 'bowling average': 'float64',
+    },
+    'nba': {
+        'team': 'category', 'player': 'category',
+        'matches': 'int16', 'points': 'int32', 'assists': 'int16', 'rebounds': 'int16',
+        'steals': 'int16', 'blocks': 'int16',
+    },
+    'nba_games': {
+        'team': 'category', 'player': 'category', 'game': 'int16', 'date': 'datetime',
+        'points': 'int16', 'assists': 'int16', 'rebounds': 'int16', 'steals': 'int16', 'blocks': 'int16',
+    },
+    'football': {
+        'player id': 'int32', 'player name': 'category', 'team name': 'category', 'position': 'category',
+        'timestamp': 'datetime',
+        'x coordinate': 'float64', 'y coordinate': 'float64', 'speed (m/s)': 'float64',
+        'acceleration (m/s²)': 'float64', 'distance covered (m)': 'float64', 'sprint count': 'int16',
+        'heart rate (bpm)': 'int16', 'ball possession time (s)': 'float64', 'heatmap coverage (%)': 'float64',
+        'avg speed in last 5 min (m/s)': 'float64', 'fatigue level (%)': 'float64',
+        'injury risk (%)': 'float64', 'optimal substitution time (min)': 'int16',
+        'pass accuracy (%)': 'float64', 'shots on target (%)': 'float64', 'successful tackles': 'int16',
+    },
+}
+
+
+def _fits(series, dtype):
+    # Integer downcasts must keep every value (and there must be no missing values)
+    if not pd.api.types.is_integer_dtype(series):
+        return False
+    info = np.iinfo(dtype)
+    return series.empty or (info.min <= series.min() and series.max() <= info.max)
+
+
+def apply_schema(df, name):
+    """Convert a freshly parsed dataset to its compact dtypes (see SCHEMAS)."""
+    converted = {}
+    for col, kind in SCHEMAS.get(name, {}).items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if kind == 'category':
+            converted[col] = series.astype('category')
+        elif kind == 'datetime':
+            converted[col] = pd.to_datetime(series, errors='coerce').astype('datetime64[ns]')
+        elif np.issubdtype(np.dtype(kind), np.integer):
+            if _fits(series, kind):
+                converted[col] = series.astype(kind)
+        elif pd.api.types.is_numeric_dtype(series):
+            converted[col] = series.astype(kind)
+    return df.assign(**converted) if converted else df
+
+
+def memory_bytes(df):
+    """Bytes held by a frame, counting the Python objects behind text columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def memory_report(names=None, data_dir=None):
+    """Per dataset: rows, bytes as parsed from CSV and bytes once compacted."""
+    from data_loader import DATASETS, read_csv_files, source_paths
+
+    report = {}
+    for name in names or DATASETS:
+        parsed = read_csv_files(source_paths(name, data_dir))
+        report[name] = {
+            'rows': len(parsed),
+            'parsed_bytes': memory_bytes(parsed),
+            'compact_bytes': memory_bytes(apply_schema(parsed, name)),
+        }
+    return report
+
+
+if __name__ == '__main__':
+    for name, sizes in memory_report().items():
+        ratio = sizes['parsed_bytes'] / max(sizes['compact_bytes'], 1)
+        print(f"  {name:<16} {sizes['rows']:>9} rows   parsed {sizes['parsed_bytes'] / 1024:10.1f} KB"
+              f"   compact {sizes['compact_bytes'] / 1024:10.1f} KB   ({ratio:.1f}x smaller)")
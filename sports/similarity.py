@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from callback_metrics import in_phase
+
+# Features compared per dataset, with the team and player columns of its rows; players
+# with several rows (football tracking samples) are described by their mean
+SIMILARITY_FEATURES = {
+    'cricket_batting': ('team', 'player', ['average', 'strike rate', 'fours', 'sixes']),
+    'cricket_bowling': ('team', 'player', ['wickets', 'economy', 'bowling average']),
+    'nba': ('team', 'player', ['points', 'assists', 'rebounds', 'steals', 'blocks']),
+    'football': ('team name', 'player name', ['speed (m/s)', 'acceleration (m/s²)', 'distance covered (m)',
+                                              'sprint count', 'pass accuracy (%)', 'successful tackles']),
+}
+
+
+class SimilarityIndex:
+    """k-nearest-player search over standardised feature vectors.
+
+    Each player's features are z-scored (so no stat dominates by its units) into
+    one float32 matrix, kept with its rows' squared norms. A query is a single
+    matrix-vector product and a partial sort, without pairwise comparisons or
+    a pass over the raw rows.
+    """
+
+    def __init__(self, df, features, team_col='team', player_col='player'):
+        self.features = list(features)
+        self.team_col = team_col
+        self.player_col = player_col
+
+        values = df[self.features].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+        grouped = values.groupby([np.asarray(df[team_col], dtype=object), np.asarray(df[player_col], dtype=object)],
+                                 sort=False).mean()
+        self.keys = list(grouped.index)
+        self.raw = grouped.to_numpy()
+
+        self.mean = np.nanmean(self.raw, axis=0) if len(self.raw) else np.zeros(len(self.features))
+        std = np.nanstd(self.raw, axis=0) if len(self.raw) else np.ones(len(self.features))
+        self.std = np.where(std > 0, std, 1.0)
+        # Missing stats sit at the average, so they neither attract nor repel
+        self.matrix = np.nan_to_num((self.raw - self.mean) / self.std).astype(np.float32)
+        self.norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+        # Players without any stat are never matched
+        self.described = ~np.isnan(self.raw).all(axis=1)
+
+        self.rows = {}
+        for row, (_, player) in enumerate(self.keys):
+            self.rows.setdefault(player, []).append(row)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def players(self):
+        """Names of the indexed players."""
+        return list(self.rows)
+
+    @in_phase('filter')
+    def nearest(self, player, k=5, team=None):
+        """The ``k`` players most similar to ``player`` across all teams (None if unknown or without stats).
+
+        ``team`` picks the player's row when the name plays for several teams.
+        Returns team, player, distance, a 0-100 similarity and the raw features.
+        """
+        rows = [row for row in self.rows.get(player, []) if team is None or self.keys[row][0] == team]
+        if not rows or not self.described[rows[0]]:
+            return None
+        return self._nearest(self.matrix[rows[0]], k, exclude=rows[0])
+
+    @in_phase('filter')
+    def nearest_to(self, stats, k=5):
+        """The ``k`` players closest to a profile given as {feature: value} (missing = average)."""
+        raw = np.array([stats.get(feature, np.nan) for feature in self.features], dtype=np.float64)
+        return self._nearest(np.nan_to_num((raw - self.mean) / self.std).astype(np.float32), k)
+
+    def _nearest(self, query, k, exclude=None):
+        # |a - b|² = |a|² - 2 a·b + |b|²
+        distances = self.norms - 2.0 * (self.matrix @ query) + float(query @ query)
+        candidates = self.described.copy()
+        if exclude is not None:
+            candidates[exclude] = False
+        distances[~candidates] = np.inf
+        k = max(0, min(k, int(candidates.sum())))
+        best = np.argpartition(distances, k - 1)[:k] if k else np.empty(0, dtype=np.intp)
+        best = best[np.argsort(distances[best], kind='stable')]
+        distance = np.sqrt(np.maximum(distances[best], 0.0))
+        result = pd.DataFrame({
+            self.team_col: [self.keys[row][0] for row in best],
+            self.player_col: [self.keys[row][1] for row in best],
+            'distance': distance,
+            # 100 for an identical profile, 50 at one standard deviation per feature
+            'similarity (%)': 100.0 / (1.0 + distance / np.sqrt(len(self.features))),
+        })
+        for i, feature in enumerate(self.features):
+            result[feature] = self.raw[best, i]
+        return result
+
+
+def build_similarity_index(df, dataset):
+    """SimilarityIndex of a loaded dataset, over the features registered in SIMILARITY_FEATURES."""
+    team_col, player_col, features = SIMILARITY_FEATURES[dataset]
+    return SimilarityIndex(df, features, team_col=team_col, player_col=player_col)
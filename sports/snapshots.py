@@ -0,0 +1,285 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+
+from data_loader import DATA_DIR, data_version, load_dataset
+from figure_cache import FigureJSON
+from table_index import shared_index
+
+# Pre-rendered team views, written by ``python snapshots.py`` and served before live callbacks:
+#   <SNAPSHOT_DIR>/<view>/manifest.json   data version, dashboard code digest and per-team row digests
+#   <SNAPSHOT_DIR>/<view>/<team>.json     the view's serialized figures
+#   <SNAPSHOT_DIR>/<view>/<team>.html     the same figures as a static page
+SNAPSHOT_DIR = os.environ.get('SPORTS_SNAPSHOT_DIR', os.path.join(DATA_DIR, '.snapshots'))
+
+# Bump when the snapshot file layout changes
+SNAPSHOT_VERSION = 1
+
+# dataset/team_col: the rows a view is drawn from (a tuple when it reads several datasets,
+# all with that team column); page: the dashboard building it;
+# build(module, team) -> figures; graphs(module) -> one id per figure, in the same order
+SnapshotView = namedtuple('SnapshotView', 'dataset team_col page title build graphs')
+
+VIEWS = {
+    'nba': SnapshotView(('nba', 'nba_games'), 'team', 'nba', 'NBA',
+                        lambda m, team: m.build_team_figures(team), lambda m: list(m.TEAM_FIGURES)),
+    'football': SnapshotView('football', 'team name', 'football', 'Football',
+                             lambda m, team: m.build_team_figures(team), lambda m: list(m.TEAM_FIGURES)),
+    'cricket-batting': SnapshotView('cricket_batting', 'team', 'multi', 'Cricket Batting',
+                                    lambda m, team: m.cricket_team_figures(team, 'batting'),
+                                    lambda m: [stat for stat, _ in m.CRICKET_STATS['batting']]),
+    'cricket-bowling': SnapshotView('cricket_bowling', 'team', 'multi', 'Cricket Bowling',
+                                    lambda m, team: m.cricket_team_figures(team, 'bowling'),
+                                    lambda m: [stat for stat, _ in m.CRICKET_STATS['bowling']]),
+    'multi-football': SnapshotView('football', 'team name', 'multi', 'Multi-Sports Football',
+                                   lambda m, team: m.football_team_figures(team), lambda m: list(m.FOOTBALL_GRAPHS)),
+}
+
+
+def team_slug(team):
+    """File name stem of a team's snapshot."""
+    return re.sub(r'[^a-z0-9]+', '-', str(team).lower()).strip('-') or 'team'
+
+
+def team_digest(team_df):
+    """Content hash of a team's rows; unchanged rows keep their snapshot."""
+    hashes = pd.util.hash_pandas_object(team_df, index=False).to_numpy()
+    digest = hashlib.sha1(','.join(team_df.columns).encode())
+    digest.update(hashes.tobytes())
+    return digest.hexdigest()
+
+
+def source_files(script):
+    """The script and every local module it imports, directly or through other local modules.
+
+    Only imports run at import time count (not those inside functions, such as
+    this module's own import of sports_server).
+    """
+    folder = os.path.dirname(script)
+    files, pending = [], [script]
+    while pending:
+        path = pending.pop()
+        if path in files:
+            continue
+        files.append(path)
+        with open(path, 'rb') as f:
+            statements = ast.parse(f.read(), path).body
+        while statements:
+            node = statements.pop()
+            if isinstance(node, (ast.If, ast.Try, ast.With)):
+                statements.extend(child for child in ast.iter_child_nodes(node) if isinstance(child, ast.stmt))
+                statements.extend(handler for handler in getattr(node, 'handlers', []))
+                continue
+            if isinstance(node, ast.ExceptHandler):
+                statements.extend(node.body)
+                continue
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = os.path.join(folder, name.split('.')[0] + '.py')
+                if os.path.exists(module):
+                    pending.append(module)
+    return sorted(files)
+
+
+@lru_cache(maxsize=None)
+def code_digest(page):
+    """Hash of a dashboard's script and the local modules it uses, so editing a chart re-renders its snapshots."""
+    from pages import PAGES
+
+    digest = hashlib.sha1(f"v{SNAPSHOT_VERSION}".encode())
+    for path in source_files(os.path.join(os.path.dirname(os.path.abspath(__file__)), PAGES[page][0])):
+        with open(path, 'rb') as f:
+            digest.update(f":{os.path.basename(path)}:".encode() + f.read())
+    return digest.hexdigest()
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class SnapshotStore:
+    """Read side of the snapshots: a view's figures for a team, if they match the live data and code.
+
+    Manifests are re-read when their file changes, so a running server picks up
+    a new export without restarting.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or SNAPSHOT_DIR
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def manifest(self, view):
+        path = os.path.join(self.root, view, 'manifest.json')
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._manifests.get(view)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        with open(path) as f:
+            manifest = json.load(f)
+        with self._lock:
+            self._manifests[view] = (mtime, manifest)
+        return manifest
+
+    def figures(self, view, team, version):
+        """The team's figures (list of FigureJSON), or None when missing or built from other data."""
+        manifest = self.manifest(view)
+        if manifest is None or manifest['version'] != version or team not in manifest['teams']:
+            return None
+        if manifest['code'] != code_digest(VIEWS[view].page):
+            return None  # drawn by an older version of the dashboard
+        path = os.path.join(self.root, view, manifest['teams'][team]['file'] + '.json')
+        try:
+            with open(path, encoding='utf-8') as f:
+                bundle = json.load(f)
+        except (OSError, ValueError):
+            return None
+        figures = []
+        for figure, nbytes in zip(bundle['figures'], bundle['nbytes']):
+            figure = FigureJSON(figure)
+            figure.nbytes = nbytes
+            figures.append(figure)
+        return figures
+
+    def figure(self, view, team, version, graph_id):
+        """One figure of the team's view by graph id, or None."""
+        figures = self.figures(view, team, version)
+        graphs = self.manifest(view)['graphs'] if figures is not None else []
+        return figures[graphs.index(graph_id)] if graph_id in graphs else None
+
+
+# Shared by every dashboard of the process
+snapshots = SnapshotStore()
+
+
+def _html_page(title, figures):
+    import plotly.io as pio
+
+    divs = [pio.to_html(figure, full_html=False, include_plotlyjs='cdn' if i == 0 else False)
+            for i, figure in enumerate(figures)]
+    return (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title></head>\n'
+            f'<body><h1>{title}</h1>\n' + '\n'.join(divs) + '\n</body></html>\n')
+
+
+def render_team(root, view, team):
+    """Render one team's view into ``root`` (runs in a pool worker); returns (view, team, graph ids)."""
+    import sports_server
+    from figure_cache import serialize_figure
+
+    spec = VIEWS[view]
+    module = sports_server.load_module(spec.page)
+    figures = [serialize_figure(figure) for figure in spec.build(module, team)]
+    stem = os.path.join(root, view, team_slug(team))
+    bundle = {'view': view, 'team': team, 'figures': figures, 'nbytes': [figure.nbytes for figure in figures]}
+    _write_atomic(stem + '.json', json.dumps(bundle))
+    _write_atomic(stem + '.html', _html_page(f"{team} - {spec.title}", figures))
+    return view, team, spec.graphs(module)
+
+
+def plan(root, views, force=False):
+    """Teams to render per view, plus the manifest each view will have afterwards."""
+    store = SnapshotStore(root)
+    tasks, manifests = [], {}
+    for view in views:
+        spec = VIEWS[view]
+        datasets = spec.dataset if isinstance(spec.dataset, tuple) else (spec.dataset,)
+        indexes = [shared_index(load_dataset(name), spec.team_col) for name in datasets]
+        old = store.manifest(view) or {}
+        code = code_digest(spec.page)
+        stale = force or old.get('code') != code
+        old_teams = old.get('teams', {})
+
+        teams = {}
+        for team in indexes[0].teams:
+            digests = [team_digest(index.team(team)) for index in indexes]
+            entry = {'file': team_slug(team), 'digest': digests[0] if len(digests) == 1 else '+'.join(digests)}
+            previous = old_teams.get(team)
+            if stale or previous != entry or not os.path.exists(os.path.join(root, view, entry['file'] + '.json')):
+                tasks.append((view, team))
+            teams[team] = entry
+        # Matches the dashboard's LiveDataset version over the same datasets
+        manifests[view] = {'version': '+'.join(data_version(name) for name in datasets), 'code': code,
+                           'graphs': old.get('graphs', []), 'teams': teams,
+                           'removed': [e['file'] for t, e in old_teams.items() if t not in teams]}
+    return tasks, manifests
+
+
+def export(root=None, views=None, jobs=None, force=False):
+    """Render every team view that changed since the last export; returns {view: teams rendered}."""
+    root = root or SNAPSHOT_DIR
+    views = views or list(VIEWS)
+    tasks, manifests = plan(root, views, force)
+    for view in views:
+        os.makedirs(os.path.join(root, view), exist_ok=True)
+
+    rendered = {view: 0 for view in views}
+    if tasks:
+        with ProcessPoolExecutor(min(jobs or os.cpu_count() or 1, len(tasks))) as pool:
+            futures = [pool.submit(render_team, root, view, team) for view, team in tasks]
+            for future in futures:
+                view, _, graphs = future.result()
+                manifests[view]['graphs'] = graphs
+                rendered[view] += 1
+
+    for view, manifest in manifests.items():
+        for stem in manifest.pop('removed'):
+            for ext in ('.json', '.html'):
+                path = os.path.join(root, view, stem + ext)
+                if os.path.exists(path):
+                    os.remove(path)
+        # Written last: until then the previous manifest keeps describing complete files
+        _write_atomic(os.path.join(root, view, 'manifest.json'), json.dumps(manifest))
+    _write_atomic(os.path.join(root, 'index.html'), _index_page(manifests))
+    return rendered
+
+
+def _index_page(manifests):
+    sections = []
+    for view, manifest in manifests.items():
+        links = ''.join(f'<li><a href="{view}/{entry["file"]}.html">{team}</a></li>'
+                        for team, entry in manifest['teams'].items())
+        sections.append(f'<h2>{VIEWS[view].title}</h2><ul>{links}</ul>')
+    return ('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Team Snapshots</title></head>\n'
+            '<body><h1>Team Snapshots</h1>\n' + '\n'.join(sections) + '\n</body></html>\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pre-render every team view as static JSON/HTML snapshots.")
+    parser.add_argument('views', nargs='*', help=f"views to export (default: all of {', '.join(VIEWS)})")
+    parser.add_argument('--out', help=f"snapshot folder (default: {SNAPSHOT_DIR})")
+    parser.add_argument('--jobs', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="re-render every team, changed or not")
+    args = parser.parse_args()
+    unknown = set(args.views) - set(VIEWS)
+    if unknown:
+        parser.error(f"unknown view(s): {', '.join(sorted(unknown))}")
+
+    # Snapshots show the static data; live tracking is never exported
+    os.environ.pop('FOOTBALL_LIVE', None)
+    start = time.perf_counter()
+    rendered = export(args.out, args.views, args.jobs, args.force)
+    for view, count in rendered.items():
+        print(f"  {view:<16} {count} team(s) rendered")
+    print(f"Snapshots written to {args.out or SNAPSHOT_DIR} in {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,169 @@
+import gc
+import importlib.util
+import os
+import resource
+import socket
+import sys
+import threading
+
+from flask import Flask, abort, jsonify, request, send_from_directory
+
+from callback_metrics import metrics_response
+from data_refresh import defer_watcher
+from query_api import api
+from snapshots import SNAPSHOT_DIR
+
+import pages
+from pages import PAGES
+
+# Every dashboard is served from one process group under its own URL prefix:
+#   gunicorn -w 4 -b 0.0.0.0:8050 sports_server:application
+# A dashboard's module (its data and callbacks) is imported on the first request
+# to its prefix, and datasets are shared through data_loader's per-process cache.
+pages.MOUNTED = True
+
+
+def load_module(page):
+    """Import a dashboard module by page name (once per process)."""
+    file_name = PAGES[page][0]
+    module_name = os.path.splitext(file_name)[0].replace(' ', '_')
+    if module_name not in sys.modules:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception:
+            del sys.modules[module_name]
+            raise
+    return sys.modules[module_name]
+
+
+def load_page(page):
+    """Import a dashboard module by page name and return its Dash app."""
+    return load_module(page).app
+
+
+class LazyDispatcher:
+    """WSGI app routing /<page>/... to that dashboard, importing it on first use."""
+
+    def __init__(self, root):
+        self.root = root
+        self.servers = {}
+        self._lock = threading.Lock()
+
+    def server_for(self, page):
+        if page not in self.servers:
+            with self._lock:
+                if page not in self.servers:
+                    self.servers[page] = load_page(page).server
+        return self.servers[page]
+
+    def preload(self, names=None):
+        """Import dashboards up front instead of on their first request.
+
+        Under ``gunicorn --preload`` this runs once in the master, so forked
+        workers share the loaded frames copy-on-write. Freezing the collected
+        objects keeps the garbage collector from writing to (and so copying)
+        their pages in every worker.
+        """
+        # The master only forks workers; each worker starts its own data-refresh watcher
+        defer_watcher()
+        for page in names or PAGES:
+            self.server_for(page)
+        gc.collect()
+        gc.freeze()
+
+    def __call__(self, environ, start_response):
+        page = environ.get('PATH_INFO', '/').lstrip('/').split('/', 1)[0]
+        if page in PAGES:
+            return self.server_for(page)(environ, start_response)
+        return self.root(environ, start_response)
+
+
+def process_memory(pid='self'):
+    """Resident memory of a process in kB: rss, pss and its shared/private split (Linux)."""
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared_clean', 'Shared_Dirty': 'shared_dirty',
+              'Private_Clean': 'private_clean', 'Private_Dirty': 'private_dirty'}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        # No smaps (non-Linux): only the peak RSS of this process is available
+        return {'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    usage = {}
+    for line in lines:
+        name, _, value = line.partition(':')
+        if name in fields:
+            usage[fields[name]] = int(value.split()[0])
+    return usage
+
+
+def sibling_pids():
+    """PIDs of every process sharing this process's parent (the gunicorn workers)."""
+    parent = os.getppid()
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The ppid is the 2nd field after the parenthesised command name
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == parent:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+# Landing page linking to every dashboard
+server = Flask(__name__)
+
+
+@server.route('/')
+def index():
+    links = ''.join(f'<li><a href="/{page}/">{title}</a></li>' for page, (_, title) in PAGES.items())
+    if os.path.exists(os.path.join(SNAPSHOT_DIR, 'index.html')):
+        links += '<li><a href="/snapshots/">Static team snapshots</a></li>'
+    return f'<h1>Sports Analytics</h1><ul>{links}</ul>'
+
+
+@server.route('/snapshots/', defaults={'path': 'index.html'})
+@server.route('/snapshots/<path:path>')
+def snapshot(path):
+    # Pre-rendered team pages written by snapshots.py: served as plain files, no dashboard import
+    if not path.endswith(('.html', '.json')):
+        abort(404)
+    return send_from_directory(SNAPSHOT_DIR, path)
+
+
+@server.route('/memory')
+def memory():
+    # Under gunicorn, report every worker so the copy-on-write saving can be checked
+    report = {'pid': os.getpid(), 'loaded': sorted(application.servers), 'self': process_memory()}
+    if request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        report['master'] = {'pid': os.getppid(), **process_memory(os.getppid())}
+        report['workers'] = {pid: process_memory(pid) for pid in sibling_pids()}
+    return jsonify(report)
+
+
+# Callback latency, payload and cache-hit metrics of every loaded dashboard (this process)
+server.add_url_rule('/metrics', 'metrics', metrics_response)
+
+# Read-only JSON/Arrow stats API for machine clients (query_api.py): no dashboard or figure involved
+server.register_blueprint(api)
+
+application = LazyDispatcher(server)
+
+# Preload mode (SPORTS_PRELOAD=1, set by gunicorn.conf.py): load everything before workers fork
+if os.environ.get('SPORTS_PRELOAD') == '1':
+    application.preload()
+
+if __name__ == '__main__':
+    from werkzeug.serving import run_simple
+
+    local_ip = socket.gethostbyname(socket.gethostname())
+    print(f"\nServer running at: http://{local_ip}:8050/\n")
+    run_simple('0.0.0.0', 8050, application, threaded=True)
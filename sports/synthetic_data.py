@@ -0,0 +1,136 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATASETS
+
+# Team written into each source file (one team per file, like the real data)
+FILE_TEAMS = {
+    'india_batting.csv': 'India', 'australia_batting.csv': 'Australia', 'england_batting.csv': 'England',
+    'india_bowling.csv': 'India', 'england_bowling.csv': 'England', 'australia_bowling.csv': 'Australia',
+    'lakers_nba.csv': 'Lakers', 'warriors_nba.csv': 'Warriors', 'bucks_nba.csv': 'Bucks', 'celtics_nba.csv': 'Celtics',
+    'lakers_nba_games.csv': 'Lakers', 'warriors_nba_games.csv': 'Warriors', 'bucks_nba_games.csv': 'Bucks',
+    'celtics_nba_games.csv': 'Celtics',
+    'fc_barcelona_analytics_updated.csv': 'FC Barcelona',
+    'real_madrid_analytics_updated.csv': 'Real Madrid',
+    'manchester_united_analytics_updated.csv': 'Manchester United',
+    'liverpool_analytics_updated.csv': 'Liverpool',
+    'bayern_munich_analytics_updated.csv': 'Bayern Munich',
+}
+
+# Exact headers of the files in 'csv files/'
+COLUMNS = {
+    'cricket_batting': ['Team', 'Player', 'Matches', 'Runs', 'Average', 'Strike Rate', 'Fours', 'Sixes'],
+    'cricket_bowling': ['Team', 'Player', 'Matches', 'Wickets', 'Economy', 'Bowling Average', 'Best Figures'],
+    'nba': ['Team', 'Player', 'Matches', 'Points', 'Assists', 'Rebounds', 'Steals', 'Blocks'],
+    'nba_games': ['Team', 'Player', 'Game', 'Date', 'Points', 'Assists', 'Rebounds', 'Steals', 'Blocks'],
+    'football': [
+        'Player ID', 'Player Name', 'Team Name', 'Position', 'Timestamp', 'X Coordinate', 'Y Coordinate',
+        'Speed (m/s)', 'Acceleration (m/s²)', 'Distance Covered (m)', 'Sprint Count', 'Heart Rate (BPM)',
+        'Ball Possession Time (s)', 'Heatmap Coverage (%)', 'Avg Speed in Last 5 min (m/s)',
+        'Fatigue Level (%)', 'Injury Risk (%)', 'Optimal Substitution Time (min)', 'Pass Accuracy (%)',
+        'Shots on Target (%)', 'Successful Tackles',
+    ],
+}
+
+# NBA box scores: players per team in every game, and the first game's date
+NBA_ROSTER = 15
+NBA_SEASON_START = pd.Timestamp('2024-10-22')
+
+# Football samples: squad size per club and sampling rate of the tracking feed
+SQUAD_SIZE = 11
+SAMPLE_HZ = 25
+POSITIONS = np.array(['Goalkeeper', 'Defender', 'Midfielder', 'Forward'])
+
+# Rows generated and written per chunk, so 10M-row files never sit in memory at once
+CHUNK_ROWS = 1_000_000
+
+
+def _uniform(rng, low, high, n, decimals=2):
+    return np.round(rng.uniform(low, high, n), decimals)
+
+
+def generate_chunk(name, team, start, n, rng):
+    """Rows ``start .. start + n`` of one team's file, with that file's exact columns."""
+    row = np.arange(start, start + n)
+    if name == 'cricket_batting':
+        data = {
+            'Team': team, 'Player': [f'{team} Batter {i + 1}' for i in row],
+            'Matches': rng.integers(20, 300, n), 'Runs': rng.integers(500, 14000, n),
+            'Average': _uniform(rng, 20, 60, n, 1), 'Strike Rate': _uniform(rng, 70, 180, n, 1),
+            'Fours': rng.integers(50, 1300, n), 'Sixes': rng.integers(1, 200, n),
+        }
+    elif name == 'cricket_bowling':
+        wickets = rng.integers(1, 5, n)
+        data = {
+            'Team': team, 'Player': [f'{team} Bowler {i + 1}' for i in row],
+            'Matches': rng.integers(20, 250, n), 'Wickets': rng.integers(10, 400, n),
+            'Economy': _uniform(rng, 3, 9, n, 1), 'Bowling Average': _uniform(rng, 18, 45, n, 1),
+            'Best Figures': [f'{w}/{r}' for w, r in zip(wickets + 2, rng.integers(20, 70, n))],
+        }
+    elif name == 'nba':
+        data = {
+            'Team': team, 'Player': [f'{team} Player {i + 1}' for i in row],
+            'Matches': 15, 'Points': rng.integers(100, 400, n), 'Assists': rng.integers(20, 110, n),
+            'Rebounds': rng.integers(30, 120, n), 'Steals': rng.integers(5, 30, n), 'Blocks': rng.integers(1, 12, n),
+        }
+    elif name == 'nba_games':
+        # One row per rostered player and game, games in order (a team plays every other day)
+        player, game = row % NBA_ROSTER, row // NBA_ROSTER
+        data = {
+            'Team': team, 'Player': [f'{team} Player {p + 1}' for p in player], 'Game': game + 1,
+            'Date': (NBA_SEASON_START + pd.to_timedelta(game * 2, unit='D')).strftime('%Y-%m-%d'),
+            'Points': rng.integers(0, 45, n), 'Assists': rng.integers(0, 15, n), 'Rebounds': rng.integers(0, 18, n),
+            'Steals': rng.integers(0, 5, n), 'Blocks': rng.integers(0, 4, n),
+        }
+    else:
+        # One sample per player every 1/SAMPLE_HZ seconds, players interleaved
+        player = row % SQUAD_SIZE
+        timestamps = pd.Timestamp('2025-03-07 11:32:30') + pd.to_timedelta(row // SQUAD_SIZE * (1000 // SAMPLE_HZ), unit='ms')
+        data = {
+            'Player ID': player + 1, 'Player Name': [f'{team} Player {p + 1}' for p in player],
+            'Team Name': team, 'Position': POSITIONS[np.minimum(player, 3)],
+            'Timestamp': timestamps.strftime('%Y-%m-%d %H:%M:%S.%f').str[:-3],
+            'X Coordinate': _uniform(rng, 0, 100, n), 'Y Coordinate': _uniform(rng, 0, 100, n),
+            'Speed (m/s)': _uniform(rng, 0, 32, n), 'Acceleration (m/s²)': _uniform(rng, 0, 5, n),
+            'Distance Covered (m)': _uniform(rng, 100, 800, n), 'Sprint Count': rng.integers(1, 50, n),
+            'Heart Rate (BPM)': rng.integers(80, 190, n), 'Ball Possession Time (s)': _uniform(rng, 10, 300, n),
+            'Heatmap Coverage (%)': _uniform(rng, 20, 80, n), 'Avg Speed in Last 5 min (m/s)': _uniform(rng, 3, 15, n),
+            'Fatigue Level (%)': _uniform(rng, 10, 90, n), 'Injury Risk (%)': _uniform(rng, 5, 50, n),
+            'Optimal Substitution Time (min)': rng.integers(30, 91, n), 'Pass Accuracy (%)': _uniform(rng, 50, 95, n),
+            'Shots on Target (%)': _uniform(rng, 15, 90, n), 'Successful Tackles': rng.integers(0, 15, n),
+        }
+    return pd.DataFrame(data, columns=COLUMNS[name])
+
+
+def write_dataset(name, rows, out_dir, seed=0):
+    """Write ``rows`` rows of a dataset, split evenly across its team files."""
+    rng = np.random.default_rng(seed)
+    files = DATASETS[name]
+    for i, file in enumerate(files):
+        n_file = rows // len(files) + (1 if i < rows % len(files) else 0)
+        path = os.path.join(out_dir, file)
+        for start in range(0, max(n_file, 1), CHUNK_ROWS):
+            n = min(CHUNK_ROWS, n_file - start)
+            chunk = generate_chunk(name, FILE_TEAMS[file], start, n, rng)
+            chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def write_all(rows, out_dir, seed=0):
+    """Write every dataset with ``rows`` rows each into ``out_dir``."""
+    os.makedirs(out_dir, exist_ok=True)
+    for name in DATASETS:
+        write_dataset(name, rows, out_dir, seed)
+    return out_dir
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic CSVs with the schemas of 'csv files/'.")
+    parser.add_argument('rows', type=int, help="rows per dataset (split across its team files)")
+    parser.add_argument('out_dir', help="folder to write the CSV files into")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_all(args.rows, args.out_dir, args.seed)
+    print(f"Wrote {args.rows} rows per dataset to {args.out_dir}")
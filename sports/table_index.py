@@ -0,0 +1,106 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from callback_metrics import in_phase
+
+
+class TableIndex:
+    """Team -> row slice and player -> row positions lookups, built once per frame.
+
+    Rows are stably partitioned by team (teams keep their first-seen order), so a
+    team's subset is a contiguous slice of ``df`` and never needs a full scan.
+    """
+
+    def __init__(self, df, team_col, player_col=None):
+        self.team_col = team_col
+        self.player_col = player_col
+
+        codes, teams = pd.factorize(df[team_col])
+        order = np.argsort(codes, kind='stable')
+        self.df = df.iloc[order].reset_index(drop=True)
+
+        bounds = np.searchsorted(codes[order], np.arange(len(teams) + 1))
+        self.team_slices = {team: slice(int(bounds[i]), int(bounds[i + 1])) for i, team in enumerate(teams)}
+
+        self.player_rows = {}
+        if player_col is not None:
+            player_codes, names = pd.factorize(self.df[player_col])
+            by_player = np.argsort(player_codes, kind='stable')
+            # Rows without a player (code -1) sort first and fall before the first bound
+            bounds = np.searchsorted(player_codes[by_player], np.arange(len(names) + 1))
+            self.player_rows = {name: by_player[bounds[i]:bounds[i + 1]] for i, name in enumerate(names)}
+
+    @property
+    def teams(self):
+        return list(self.team_slices)
+
+    @in_phase('filter')
+    def team(self, team):
+        """Rows of one team (empty frame for an unknown team)."""
+        return self.df.iloc[self.team_slices.get(team, slice(0, 0))]
+
+    @in_phase('filter')
+    def players(self, names):
+        """Rows of the given players, in the order requested."""
+        rows = [self.player_rows[name] for name in names if name in self.player_rows]
+        positions = np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+        return self.df.iloc[positions]
+
+    @in_phase('filter')
+    def player_row(self, name):
+        """First row of a player, or None when the player is unknown."""
+        rows = self.player_rows.get(name)
+        return None if rows is None else self.df.iloc[rows[0]]
+
+    @in_phase('filter')
+    def team_players(self, team):
+        """Unique player names of one team, in table order."""
+        return self.team(team)[self.player_col].unique()
+
+
+class PlayerCodes:
+    """Mixin numbering the players of a per-player model in order of first appearance.
+
+    The model keeps ``players`` (code -> name), ``player_codes`` (name -> code)
+    and ``player_team`` (name -> team of the player's latest rows).
+    """
+
+    def _player_codes(self, names, teams):
+        codes, uniques = pd.factorize(names)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        first_team = pd.Series(np.asarray(teams)).groupby(codes).first()
+        for i, name in enumerate(uniques):
+            if name not in self.player_codes:
+                self.player_codes[name] = len(self.players)
+                self.players.append(name)
+            self.player_team[name] = first_team.get(i)
+            mapping[i] = self.player_codes[name]
+        # Samples without a player name are kept under a shared placeholder
+        if (codes < 0).any():
+            if None not in self.player_codes:
+                self.player_codes[None] = len(self.players)
+                self.players.append(None)
+            mapping = np.append(mapping, self.player_codes[None])
+        return mapping[codes]
+
+
+# Indexes already built in this process: (id(df), team col, player col) -> (weak ref to df, TableIndex);
+# an entry goes away with its frame, so refreshed datasets do not keep old versions alive
+_shared = {}
+
+
+def _forget(key, ref):
+    if key in _shared and _shared[key][0] is ref:
+        del _shared[key]
+
+
+def shared_index(df, team_col, player_col=None):
+    """TableIndex for ``df``, built once per process and reused by every dashboard."""
+    key = (id(df), team_col, player_col)
+    if key not in _shared or _shared[key][0]() is not df:
+        ref = weakref.ref(df)
+        _shared[key] = (ref, TableIndex(df, team_col, player_col))
+        weakref.finalize(df, _forget, key, ref)
+    return _shared[key][1]
@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# The dashboard modules sit one folder up and import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Caches, snapshots and archives written by the tests go to a scratch folder, never next to
+# the bundled CSV files; set before any module reads them at import time
+_scratch = tempfile.mkdtemp(prefix='sports-tests-')
+os.environ['SPORTS_CACHE_DIR'] = os.path.join(_scratch, 'cache')
+os.environ['SPORTS_SNAPSHOT_DIR'] = os.path.join(_scratch, 'snapshots')
+os.environ['SPORTS_ARCHIVE_DIR'] = os.path.join(_scratch, 'archive')
+os.environ['SPORTS_REFRESH_SECONDS'] = '0'
+os.environ.pop('SPORTS_ARCHIVE', None)
+os.environ.pop('SPORTS_DATA_DIR', None)
@@ -0,0 +1,111 @@
+import os
+
+import pandas as pd
+import pytest
+
+from archive import Archive, TeamModels, season_of
+from data_loader import load_dataset
+from rollup import build_game_rollup
+
+
+@pytest.fixture
+def games():
+    # Two seasons of box scores: the bundled games, and the same games a year earlier
+    df = load_dataset('nba_games')
+    earlier = df.assign(date=df['date'] - pd.DateOffset(years=1))
+    return pd.concat([earlier, df], ignore_index=True)
+
+
+def _count_reads(monkeypatch):
+    import archive
+    paths = []
+    read_columns = archive.read_columns
+    monkeypatch.setattr(archive, 'read_columns', lambda path, *args: paths.append(path) or read_columns(path, *args))
+    return paths
+
+
+def test_season_labels():
+    times = pd.to_datetime(['2024-10-22', '2025-03-01', '2025-07-01', None])
+    assert list(season_of(times)) == ['2024-25', '2024-25', '2025-26', 'all']
+
+
+def test_read_prunes_partitions(tmp_path, games, monkeypatch):
+    archive = Archive(str(tmp_path))
+    written = archive.ingest('nba_games', games)
+    partitions = archive.manifest('nba_games')['partitions']
+    assert written == len(partitions) == games.groupby(['team', 'date'], observed=True).ngroups
+    assert archive.teams('nba_games') == list(pd.unique(games['team'].astype(str)))
+
+    paths = _count_reads(monkeypatch)
+    start, end = pd.Timestamp('2024-11-01'), pd.Timestamp('2024-11-08')
+    df = archive.read('nba_games', teams=['Lakers'], start=start, end=end, columns=['player', 'points'])
+    expected = games[(games['team'] == 'Lakers') & (games['date'] >= start) & (games['date'] < end)]
+    assert list(df.columns) == ['player', 'points']
+    assert df['points'].tolist() == expected['points'].tolist()
+    assert len(paths) == expected['date'].nunique() < len(partitions)
+
+    paths.clear()
+    df = archive.read('nba_games', seasons=['2023-24'])
+    assert len(df) == len(games) // 2 and df['date'].max() < pd.Timestamp('2024-07-01')
+    assert len(paths) == len(partitions) // 2
+    assert isinstance(df['team'].dtype, pd.CategoricalDtype)
+
+    empty = archive.read('nba_games', teams=['Knicks'], columns=['points'])
+    assert len(empty) == 0 and list(empty.columns) == ['points']
+
+
+def test_ingest_only_rewrites_changed_partitions(tmp_path, games):
+    archive = Archive(str(tmp_path))
+    archive.ingest('nba_games', games)
+    version = archive.version('nba_games')
+    assert archive.ingest('nba_games', games) == 0
+    assert archive.version('nba_games') == version
+
+    changed = games.copy()
+    last = changed['date'] == changed['date'].max()
+    changed.loc[last & (changed['team'] == 'Bucks'), 'points'] += 1
+    assert archive.ingest('nba_games', changed) == 1
+    assert archive.version('nba_games') != version
+    assert archive.read('nba_games', teams=['Bucks'])['points'].sum() == \
+        changed.loc[changed['team'] == 'Bucks', 'points'].sum()
+
+
+def test_complete_ingest_drops_vanished_partitions(tmp_path, games):
+    archive = Archive(str(tmp_path))
+    archive.ingest('nba_games', games)
+    dataset_dir = tmp_path / 'nba_games'
+    gone = [entry['path'] for entry in archive.manifest('nba_games')['partitions']
+            if entry['team'] == 'Celtics' or entry['season'] == '2023-24']
+
+    kept = games[(games['team'] != 'Celtics') & (games['date'] >= pd.Timestamp('2024-07-01'))]
+    assert archive.ingest('nba_games', kept, complete=True) == 0
+    assert 'Celtics' not in archive.teams('nba_games')
+    assert len(archive.read('nba_games')) == len(kept)
+    assert not any(os.path.exists(dataset_dir / path) for path in gone)
+
+
+def test_complete_ingest_keeps_other_seasons_without_time_column(tmp_path):
+    archive = Archive(str(tmp_path))
+    df = load_dataset('nba')
+    archive.ingest('nba', df, season='2023-24')
+    archive.ingest('nba', df[df['team'] != 'Lakers'], season='2024-25', complete=True)
+    assert len(archive.read('nba', seasons=['2023-24'])) == len(df)
+    assert set(archive.read('nba', seasons=['2024-25'])['team']) == {'Bucks', 'Celtics', 'Warriors'}
+
+
+def test_team_models_read_only_their_team(tmp_path, games, monkeypatch):
+    archive = Archive(str(tmp_path))
+    archive.ingest('nba_games', games)
+    rollups = TeamModels(archive, 'nba_games', build_game_rollup, max_teams=2)
+    paths = _count_reads(monkeypatch)
+
+    lakers = rollups.get('Lakers')
+    assert len(paths) == len(archive.partitions('nba_games', teams=['Lakers'])) < len(archive.manifest('nba_games')['partitions'])
+    whole = build_game_rollup(games)
+    pd.testing.assert_frame_equal(lakers.team_frame('Lakers', 'rolling', 5), whole.team_frame('Lakers', 'rolling', 5))
+
+    paths.clear()
+    assert rollups.get('Lakers') is lakers and paths == []
+    rollups.get('Bucks')
+    rollups.get('Celtics')
+    assert rollups.get('Lakers') is not lakers
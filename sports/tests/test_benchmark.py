@@ -0,0 +1,12 @@
+from benchmark import compare, flatten
+
+
+def test_flatten_keeps_numeric_leaves():
+    report = {'10': {'load': {'nba': {'rows': 10, 'parse_s': 0.5}}, 'python': '3.11'}}
+    assert flatten(report) == {'10/load/nba/rows': 10, '10/load/nba/parse_s': 0.5}
+
+
+def test_regressions_need_a_ratio_and_an_absolute_change():
+    baseline = {'results': {'10': {'a_s': 1.0, 'b_s': 0.001, 'c_bytes': 100_000, 'rows': 10, 'generate_s': 1.0}}}
+    results = {'results': {'10': {'a_s': 1.3, 'b_s': 0.003, 'c_bytes': 110_000, 'rows': 50, 'generate_s': 9.0}}}
+    assert compare(results, baseline) == [('10/a_s', 1.0, 1.3)]
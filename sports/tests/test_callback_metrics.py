@@ -0,0 +1,135 @@
+import logging
+import time
+
+import pytest
+from dash import Dash, Input, Output, html
+from dash.exceptions import PreventUpdate
+
+import callback_metrics
+from callback_metrics import _Call, add_parallel, count_cache, instrument_app, measured, phase
+
+
+@pytest.fixture
+def call():
+    # An instrumented callback running on this thread
+    callback_metrics._state.call = call = _Call()
+    yield call
+    callback_metrics._state.call = None
+
+
+def test_nested_phases_count_each_second_once(call):
+    with phase('figure'):
+        time.sleep(0.02)
+        with phase('filter'):
+            time.sleep(0.03)
+    assert call.seconds['filter'] == pytest.approx(0.03, abs=0.015)
+    assert call.seconds['figure'] == pytest.approx(0.02, abs=0.015)
+    assert call.stack == []
+
+
+def test_measured_keeps_the_worker_phases_apart(call):
+    def work():
+        with phase('filter'):
+            time.sleep(0.02)
+        count_cache(True)
+        return 'done'
+
+    result, worker = measured(work)
+    assert result == 'done'
+    assert callback_metrics._state.call is None
+    callback_metrics._state.call = call
+    assert worker.seconds['filter'] >= 0.02 and worker.cache_hits == 1
+    assert call.seconds['filter'] == 0 and call.cache_hits == 0
+
+
+def test_wait_is_split_in_proportion_to_worker_time(call):
+    first, second = _Call(), _Call()
+    first.seconds.update(filter=0.3, figure=0.1)
+    second.seconds.update(serialize=0.4)
+    second.cache_misses = 2
+    with phase('figure'):
+        start = time.perf_counter()
+        time.sleep(0.04)
+        waited = time.perf_counter() - start
+        add_parallel([first, second], waited)
+    assert call.seconds['filter'] == pytest.approx(waited * 3 / 8)
+    assert call.seconds['serialize'] == pytest.approx(waited / 2)
+    # The enclosing phase does not count the wait a second time
+    assert call.seconds['figure'] == pytest.approx(waited / 8, abs=0.005)
+    assert call.cache_misses == 2
+
+
+def test_outside_a_callback_nothing_is_recorded():
+    add_parallel([_Call()], 1.0)
+    with phase('filter'):
+        count_cache(False)
+    assert getattr(callback_metrics._state, 'call', None) is None
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(callback_metrics, 'metrics', callback_metrics.CallbackMetrics())
+    app = Dash(__name__)
+    app.layout = html.Div([html.Div(id='in'), html.Div(id='out')])
+    instrument_app(app, 'test')
+    app.server.testing = True  # callback exceptions reach the test
+    return app
+
+
+def _update(app, value):
+    return app.server.test_client().post('/_dash-update-component', json={
+        'output': 'out.children', 'outputs': {'id': 'out', 'property': 'children'},
+        'inputs': [{'id': 'in', 'property': 'children', 'value': value}], 'changedPropIds': ['in.children'],
+    })
+
+
+def test_callbacks_are_timed_per_phase(app):
+    @app.callback(Output('out', 'children'), Input('in', 'children'))
+    def echo(value):
+        if value is None:
+            raise PreventUpdate
+        with phase('filter'):
+            time.sleep(0.02)
+        if value == 'boom':
+            raise ValueError(value)
+        return value * 3
+
+    assert echo('ab') == 'ababab'  # the body stays callable directly
+    assert _update(app, 'ab').get_json()['response']['out']['children'] == 'ababab'
+    assert _update(app, None).status_code == 204
+    with pytest.raises(ValueError):
+        _update(app, 'boom')
+    stats = callback_metrics.metrics.snapshot()[('test', 'echo')]
+    assert stats['count'] == 3 and stats['prevented'] == 1 and stats['errors'] == 1
+    assert stats['phases']['filter'] >= 0.04
+    assert stats['payload_bytes'] > 0
+    assert 'app="test",callback="echo"' in callback_metrics.metrics.prometheus()
+
+
+def test_instrument_after_registration_fails_loudly():
+    app = Dash(__name__)
+    app.callback(Output('out', 'children'), Input('in', 'children'))(lambda value: value)
+    with pytest.raises(RuntimeError):
+        instrument_app(app, 'late')
+
+
+def test_unrecognised_registration_fails_loudly(monkeypatch):
+    # A Dash whose decorator registers nothing where the wrapper looks for it
+    monkeypatch.setattr(Dash, 'callback', lambda self, *args, **kwargs: (lambda func: func))
+    app = Dash(__name__)
+    instrument_app(app, 'plain')
+    with pytest.raises(RuntimeError, match='Unrecognised Dash callback registration'):
+        app.callback(Output('out', 'children'), Input('in', 'children'))(lambda value: value)
+
+
+def test_slow_callbacks_are_logged(app, monkeypatch, caplog):
+    monkeypatch.setattr(callback_metrics, 'SLOW_CALLBACK_MS', 1)
+
+    @app.callback(Output('out', 'children'), Input('in', 'children'))
+    def slow(value):
+        time.sleep(0.01)
+        return value
+
+    with caplog.at_level(logging.WARNING, logger='callback_metrics'):
+        _update(app, 'x')
+    assert 'Slow callback test.slow' in caplog.text
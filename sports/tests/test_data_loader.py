@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import data_loader
+from data_loader import DATA_DIR, DATASETS, load_dataset
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for file in DATASETS['nba']:
+        shutil.copy(os.path.join(DATA_DIR, file), tmp_path / file)
+    return tmp_path
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    # Source files parsed from CSV, in order
+    files = []
+    read_csv_files = data_loader.read_csv_files
+    def counting(paths):
+        files.extend(os.path.basename(path) for path in paths)
+        return read_csv_files(paths)
+    monkeypatch.setattr(data_loader, 'read_csv_files', counting)
+    return files
+
+
+def test_cache_is_reused_until_a_file_changes(data_dir, tmp_path, parsed, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    first = load_dataset('nba', str(data_dir), cache_dir)
+    assert parsed == DATASETS['nba']
+    assert load_dataset('nba', str(data_dir), cache_dir) is first
+
+    monkeypatch.setattr(data_loader, '_loaded', {})
+    again = load_dataset('nba', str(data_dir), cache_dir)
+    assert parsed == DATASETS['nba']
+    pd.testing.assert_frame_equal(again, first)
+
+    # Only the rewritten file is parsed again
+    path = data_dir / 'bucks_nba.csv'
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text(''.join(lines[:-1]))
+    parsed.clear()
+    changed = load_dataset('nba', str(data_dir), cache_dir)
+    assert parsed == ['bucks_nba.csv']
+    assert len(changed) == len(first) - 1
+
+    # A cold parse of every file gives the same frame
+    monkeypatch.setattr(data_loader, '_loaded', {})
+    parsed.clear()
+    cold = load_dataset('nba', str(data_dir), cache_dir, use_cache=False)
+    assert parsed == DATASETS['nba']
+    assert cold is not changed
+    pd.testing.assert_frame_equal(cold, changed.copy())  # the copy is not memory-mapped
+
+
+def test_cache_dir_override(data_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, 'CACHE_DIR_OVERRIDE', str(tmp_path / 'override'))
+    load_dataset('nba', str(data_dir))
+    assert os.path.isdir(tmp_path / 'override' / 'nba')
+    assert not os.path.exists(data_dir / '.cache')
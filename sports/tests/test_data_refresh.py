@@ -0,0 +1,80 @@
+import os
+import shutil
+
+import pytest
+
+import data_loader
+import data_refresh
+from data_loader import DATA_DIR, DATASETS
+from data_refresh import LiveDataset, refresh_all
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, 'CACHE_DIR_OVERRIDE', str(tmp_path / 'cache'))
+    for file in DATASETS['nba']:
+        shutil.copy(os.path.join(DATA_DIR, file), tmp_path / file)
+    return tmp_path
+
+
+def _drop_last_row(data_dir, file='lakers_nba.csv'):
+    path = data_dir / file
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text(''.join(lines[:-1]))
+
+
+def _live(data_dir, builds):
+    def build(df):
+        builds.append(len(df))
+        if len(builds) > 1 and getattr(build, 'fail', False):
+            raise ValueError('malformed')
+        return {'rows': len(df), 'teams': sorted(df['team'].unique())}
+    return LiveDataset(['nba'], build, data_dir=str(data_dir), watch=False), build
+
+
+def test_snapshot_is_built_once(data_dir):
+    builds = []
+    live, _ = _live(data_dir, builds)
+    snapshot = live.current()
+    assert live.current() is snapshot
+    assert builds == [snapshot.rows] and snapshot.rows == len(snapshot.frames[0])
+    assert snapshot.version == snapshot.versions['nba']
+    assert live.refresh() is False and live.current() is snapshot
+
+
+def test_changed_files_swap_in_a_new_snapshot(data_dir):
+    builds = []
+    live, _ = _live(data_dir, builds)
+    old = live.current()
+    old_frame = old.frames[0]
+    _drop_last_row(data_dir)
+    assert live.refresh() is True
+    new = live.current()
+    assert new is not old and new.rows == old.rows - 1 and len(new.frames[0]) == new.rows
+    # A callback still holding the old snapshot keeps reading one consistent version
+    assert old.rows == len(old.frames[0]) == len(old_frame) and old.version != new.version
+
+
+def test_settle_waits_for_files_to_look_the_same_twice(data_dir):
+    live, _ = _live(data_dir, [])
+    old = live.current()
+    _drop_last_row(data_dir)
+    assert live.refresh(settle=True) is False and live.current() is old
+    assert live.refresh(settle=True) is True and live.current() is not old
+
+
+def test_failed_load_keeps_serving_the_previous_snapshot(data_dir, monkeypatch, capsys):
+    builds = []
+    live, build = _live(data_dir, builds)
+    old = live.current()
+    build.fail = True
+    _drop_last_row(data_dir)
+    monkeypatch.setattr(data_refresh, '_watched', [live])
+    assert refresh_all() == 0
+    assert 'Could not refresh nba' in capsys.readouterr().out
+    assert live.current() is old
+    # Not retried until the files change again
+    assert live.refresh() is False and len(builds) == 2
+    build.fail = False
+    _drop_last_row(data_dir, 'bucks_nba.csv')
+    assert refresh_all() == 1 and live.current().rows == old.rows - 2
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from decimation import decimate, decimate_groups, lttb_indices, minmax_indices, relayout_x_range
+
+
+def _series(n=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.uniform(0, 1000, n)), rng.normal(0, 1, n).cumsum()
+
+
+@pytest.mark.parametrize('select', [minmax_indices, lttb_indices])
+@pytest.mark.parametrize('n_out', [2, 3, 10, 101, 500])
+def test_selection_keeps_the_ends_within_budget(select, n_out):
+    x, y = _series()
+    keep = select(x, y, n_out)
+    assert len(keep) <= n_out
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert (np.diff(keep) > 0).all()
+
+
+def test_short_series_are_kept_whole():
+    x, y = _series(50)
+    assert minmax_indices(x, y, 50).tolist() == list(range(50))
+    assert lttb_indices(x, y, 80).tolist() == list(range(50))
+
+
+def test_minmax_keeps_each_buckets_extremes():
+    x, y = _series()
+    n_out = 202
+    keep = set(minmax_indices(x, y, n_out).tolist())
+    n_buckets = (n_out - 2) // 2
+    bucket = np.minimum(((x - x[0]) / (x[-1] - x[0]) * n_buckets).astype(int), n_buckets - 1)
+    for b in range(n_buckets):
+        rows = np.flatnonzero(bucket == b)
+        assert rows[np.argmin(y[rows])] in keep and rows[np.argmax(y[rows])] in keep
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[437] = 50.0
+    keep = lttb_indices(x, y, 20)
+    assert len(keep) == 20 and 437 in keep
+
+
+def test_decimated_frame_stays_within_the_budget_across_series():
+    x, y = _series()
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'timestamp': pd.Timestamp('2025-03-07') + pd.to_timedelta(x, unit='s'),
+                       'speed': y, 'heart rate': rng.normal(150, 10, len(x)), 'accel': rng.normal(0, 1, len(x))})
+    for method in ('minmax', 'lttb'):
+        small = decimate(df.sample(frac=1, random_state=0), 'timestamp', ['speed', 'heart rate', 'accel'], 300, method=method)
+        assert len(small) <= 300
+        assert small['timestamp'].is_monotonic_increasing
+        assert small['timestamp'].iloc[0] == df['timestamp'].iloc[0]
+        assert small['timestamp'].iloc[-1] == df['timestamp'].iloc[-1]
+    assert df['speed'].idxmax() in decimate(df, 'timestamp', ['speed', 'heart rate', 'accel'], 300).index
+
+
+def test_zoom_window_is_read_in_full_detail():
+    x, y = _series()
+    df = pd.DataFrame({'t': x, 'y': y})
+    zoomed = decimate(df, 't', ['y'], 500, x_range=(100, 110))
+    assert zoomed['t'].tolist() == df.loc[(df['t'] >= 100) & (df['t'] <= 110), 't'].tolist()
+
+
+def test_groups_are_decimated_separately():
+    x, y = _series(3000)
+    df = pd.DataFrame({'player': np.repeat(['a', 'b', 'c'], 1000), 't': x, 'y': y})
+    small = decimate_groups(df, 'player', 't', ['y'], 100)
+    assert small.groupby('player').size().le(100).all() and set(small['player']) == {'a', 'b', 'c'}
+
+
+def test_relayout_x_range():
+    assert relayout_x_range({'xaxis.range[0]': 1, 'xaxis.range[1]': 2}) == (1, 2)
+    assert relayout_x_range({'xaxis.range': [3, 4]}) == (3, 4)
+    assert relayout_x_range({'xaxis.autorange': True}) is False
+    assert relayout_x_range({'yaxis.range[0]': 1}) is None
+    assert relayout_x_range(None) is None
@@ -0,0 +1,54 @@
+import plotly.graph_objects as go
+
+from figure_cache import FigureCache, FigureJSON, figure_key, serialize_figure
+
+
+def _figure(n=3):
+    return go.Figure(go.Scatter(x=list(range(n)), y=list(range(n))))
+
+
+def test_hit_skips_the_build():
+    cache = FigureCache()
+    key = figure_key('nba', 'v1', 'Lakers', 'team-graphs')
+    first = cache.get(key, _figure)
+    assert isinstance(first, FigureJSON) and first['data'][0]['x'] == [0, 1, 2]
+    assert cache.get(key, lambda: 1 / 0) is first
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_lists_of_figures_keep_their_shape_and_size():
+    cache = FigureCache()
+    value = cache.get(figure_key('nba', 'v1', 'Lakers', 'all'), lambda: [_figure(2), _figure(5)])
+    assert isinstance(value, list) and len(value) == 2
+    assert cache.bytes == value[0].nbytes + value[1].nbytes
+    assert serialize_figure(value[0]) is value[0]
+
+
+def test_least_recently_used_entries_go_first():
+    cache = FigureCache(max_entries=2)
+    keys = [figure_key('nba', 'v1', team, 'view') for team in ('A', 'B', 'C')]
+    cache.get(keys[0], _figure)
+    cache.get(keys[1], _figure)
+    cache.get(keys[0], _figure)  # A is now more recent than B
+    cache.get(keys[2], _figure)
+    assert list(cache._entries) == [keys[0], keys[2]]
+    assert cache.stats()['evictions'] == 1
+
+
+def test_bytes_are_bounded_and_accounted():
+    size = serialize_figure(_figure(50)).nbytes
+    cache = FigureCache(max_bytes=2 * size)
+    for team in 'ABC':
+        cache.get(figure_key('nba', 'v1', team, 'view'), lambda: _figure(50))
+    assert len(cache._entries) == 2 and cache.bytes == 2 * size
+    cache.clear()
+    assert cache.bytes == 0 and cache.stats()['entries'] == 0
+
+
+def test_new_data_version_drops_the_sports_older_entries():
+    cache = FigureCache()
+    cache.get(figure_key('nba', 'v1', 'A', 'view'), _figure)
+    cache.get(figure_key('football', 'v1', 'A', 'view'), _figure)
+    cache.get(figure_key('nba', 'v2', 'B', 'view'), _figure)
+    assert [key[:2] for key in cache._entries] == [('football', 'v1'), ('nba', 'v2')]
+    assert cache.bytes == sum(size for _, size in cache._entries.values())
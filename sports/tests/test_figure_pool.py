@@ -0,0 +1,72 @@
+import threading
+import time
+
+import plotly.graph_objects as go
+import pytest
+from dash import Dash, Input, html
+
+import callback_metrics
+import figure_pool
+from callback_metrics import _Call, phase
+from figure_cache import FigureJSON
+from figure_pool import build_figures, split_callbacks
+
+
+@pytest.fixture(params=['thread', 'serial'])
+def mode(request, monkeypatch):
+    monkeypatch.setattr(figure_pool, 'FIGURE_MODE', request.param)
+    monkeypatch.setattr(figure_pool, 'FIGURE_WORKERS', 3)
+    monkeypatch.setattr(figure_pool, '_executor', None)
+    return request.param
+
+
+def _figure(title, seconds=0.0):
+    time.sleep(seconds)
+    return go.Figure(layout={'title': {'text': title}})
+
+
+def test_figures_come_back_in_order(mode):
+    threads = set()
+
+    def traced(title, seconds):
+        threads.add(threading.current_thread().name)
+        return _figure(title, seconds)
+
+    figures = build_figures([(traced, 'slow', 0.05), (traced, 'fast', 0.0), (_figure, 'last')])
+    assert all(isinstance(figure, FigureJSON) for figure in figures)
+    assert [figure['layout']['title']['text'] for figure in figures] == ['slow', 'fast', 'last']
+    assert any(name.startswith('figure-build') for name in threads) == (mode == 'thread')
+
+
+def test_build_errors_reach_the_caller(mode):
+    def broken(title):
+        raise ValueError(title)
+
+    with pytest.raises(ValueError, match='bad'):
+        build_figures([(_figure, 'ok'), (broken, 'bad')])
+
+
+def test_pool_time_is_charged_to_the_calling_callback(mode):
+    def filtered(title):
+        with phase('filter'):
+            time.sleep(0.03)
+        return _figure(title)
+
+    callback_metrics._state.call = call = _Call()
+    try:
+        build_figures([(filtered, 'a'), (filtered, 'b')])
+    finally:
+        callback_metrics._state.call = None
+    assert call.seconds['filter'] >= 0.02
+    assert call.seconds['serialize'] > 0
+    assert call.seconds['filter'] + call.seconds['figure'] + call.seconds['serialize'] < 0.5
+
+
+def test_split_callbacks_register_one_callback_per_graph():
+    app = Dash(__name__)
+    app.layout = html.Div([html.Div(id='team')])
+    split_callbacks(app, ['team-graph', 'player-graph'], [Input('team', 'children')],
+                    lambda graph_id, team: _figure(f'{graph_id} {team}'))
+    assert sorted(app.callback_map) == ['player-graph.figure', 'team-graph.figure']
+    for key, entry in app.callback_map.items():
+        assert entry['callback'].__name__ == 'update_' + key.split('.')[0].replace('-', '_')
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from heatmap import OccupancyCube, PitchGrid
+
+
+def _samples(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    players = rng.choice(['p1', 'p2', 'p3', None], n)
+    return pd.DataFrame({
+        # Each player plays for one team; unnamed samples are the opponents'
+        'team name': np.where((players == 'p1') | (players == 'p3'), 'A', 'B'),
+        'player name': players,
+        'timestamp': pd.Timestamp('2025-03-07 12:00') + pd.to_timedelta(rng.integers(0, 600, n), unit='s'),
+        'x coordinate': rng.uniform(-5, 105, n),
+        'y coordinate': rng.uniform(0, 100, n),
+    })
+
+
+def _brute_force(df, grid, start, end, keep):
+    # Counts of the samples of blocks [start, end) (60 s blocks) passing ``keep``, binned directly
+    block = (df['timestamp'] - df['timestamp'].min().floor('min')) // pd.Timedelta(seconds=60)
+    df = df[(block >= start) & (block < end) & keep(df)]
+    cells = grid.cell_index(df['x coordinate'], df['y coordinate'])
+    counts = np.bincount(cells[cells >= 0], minlength=grid.cells)
+    return counts.reshape(grid.bins_x, grid.bins_y)
+
+
+def test_windows_match_binning_the_samples_directly():
+    df = _samples()
+    grid = PitchGrid(bins_x=10, bins_y=5)
+    cube = OccupancyCube.from_frame(df, grid=grid, block_seconds=60)
+    assert cube.n_blocks == 10
+    everyone = lambda d: np.ones(len(d), dtype=bool)
+    for start, end in [(0, 10), (2, 5), (9, 10), (4, 4)]:
+        assert (cube.window(start, end) == _brute_force(df, grid, start, end, everyone)).all()
+    assert (cube.window(1, 7, team='A') == _brute_force(df, grid, 1, 7, lambda d: d['team name'] == 'A')).all()
+    assert (cube.window(3, 8, players=['p2']) == _brute_force(df, grid, 3, 8, lambda d: d['player name'] == 'p2')).all()
+
+
+def test_appending_updates_the_prefix_sums():
+    df = _samples(seed=1)
+    grid = PitchGrid(bins_x=6, bins_y=4)
+    whole = OccupancyCube.from_frame(df, grid=grid)
+    cube = OccupancyCube.from_frame(df.iloc[:100], grid=grid)
+    cube.window()  # prefix sums built before the rest arrives
+    for part in np.array_split(np.arange(100, len(df)), 3):
+        cube.add(df.iloc[part])
+    for start, end in [(0, None), (0, 3), (5, 9)]:
+        assert (cube.window(start, end) == whole.window(start, end)).all()
+        assert (cube.window(start, end, team='B') == whole.window(start, end, team='B')).all()
+
+
+def test_share_is_a_percentage():
+    cube = OccupancyCube.from_frame(_samples(seed=2))
+    assert np.isclose(cube.share().sum(), 100.0)
+    assert cube.share(players=['nobody']).sum() == 0
+
+
+def test_players_are_numbered_once_with_their_team():
+    cube = OccupancyCube.from_frame(_samples(seed=3))
+    cube.add(pd.DataFrame({'team name': ['C'], 'player name': ['p4'], 'timestamp': [pd.Timestamp('2025-03-07 12:05')],
+                           'x coordinate': [50.0], 'y coordinate': [50.0]}))
+    assert len(cube.players) == len(set(cube.players)) == 5
+    assert cube.player_codes == {name: code for code, name in enumerate(cube.players)}
+    assert cube.player_team['p4'] == 'C'
+    assert None in cube.player_codes
@@ -0,0 +1,27 @@
+import pytest
+from dash.exceptions import PreventUpdate
+
+import sports_server
+
+
+@pytest.fixture(scope='module')
+def multi():
+    return sports_server.load_module('multi')
+
+
+def test_comparison_asks_for_players_until_one_is_chosen(multi):
+    team = multi.cricket_data('batting').index.teams[0]
+    assert multi.cricket_player_comparison(None, None, team, 'batting').children == "Select two players to compare."
+    assert multi.cricket_player_comparison(None, None, 'Nowhere', 'batting').children == \
+        "No players available for this team."
+    with pytest.raises(PreventUpdate):
+        multi.cricket_player_comparison(None, None, None, 'batting')
+
+
+def test_comparison_of_two_players(multi):
+    index = multi.cricket_data('bowling').index
+    team = index.teams[0]
+    player1, player2 = index.team_players(team)[:2]
+    comparison = multi.cricket_player_comparison(player1, player2, team, 'bowling')
+    figure = comparison.children[1].figure
+    assert {trace['name'] for trace in figure['data']} == {player1, player2}
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from paged_table import PagedTable, parse_filter
+
+
+@pytest.mark.parametrize('query, clauses', [
+    ('{runs} > 100', [('runs', '>', '100')]),
+    ('{player} contains "Kohli"', [('player', 'contains', 'Kohli')]),
+    ("{team} eq 'India' && {average} ge 40.5", [('team', 'eq', 'India'), ('average', 'ge', '40.5')]),
+    ('{strike rate} <= 130', [('strike rate', '<=', '130')]),
+    ('{date} datestartswith 2024-03', [('date', 'datestartswith', '2024-03')]),
+    ('', []),
+    (None, []),
+    ('runs > 100', []),
+])
+def test_parse_filter(query, clauses):
+    assert parse_filter(query) == clauses
+
+
+def _table():
+    return PagedTable(pd.DataFrame({
+        'player': pd.Categorical(['Kohli', 'Root', 'Smith', 'Rohit', 'Warner']),
+        'runs': [120, 80, np.nan, 150, 95],
+        'average': [55.3, 49.1, 60.2, 48.0, 45.5],
+    }))
+
+
+def test_page_sorts_with_missing_values_last():
+    table = _table()
+    rows, pages = table.page(0, 3, [{'column_id': 'runs', 'direction': 'desc'}])
+    assert [row['player'] for row in rows] == ['Rohit', 'Kohli', 'Warner']
+    assert pages == 2
+    rows, _ = table.page(1, 3, [{'column_id': 'runs', 'direction': 'asc'}])
+    assert [row['player'] for row in rows] == ['Rohit', 'Smith']
+    assert rows[1]['runs'] is None
+
+
+def test_page_filters_numbers_and_labels():
+    table = _table()
+    rows, pages = table.page(0, 10, filter_query='{average} > 48 && {player} contains "ro"')
+    assert [row['player'] for row in rows] == ['Root']
+    assert pages == 1
+    rows, _ = table.page(0, 10, filter_query='{runs} ge abc')
+    assert rows == []
+    rows, _ = table.page(0, 10, filter_query='{unknown} > 1')
+    assert len(rows) == 5
+
+
+def test_records_are_plain_values():
+    rows, _ = _table().page(5, 2)
+    assert rows == [{'player': 'Warner', 'runs': 95.0, 'average': 45.5}]
+    assert type(rows[0]['player']) is str and type(rows[0]['average']) is float
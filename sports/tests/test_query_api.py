@@ -0,0 +1,183 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+import query_api
+from data_loader import load_dataset
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(query_api.api)
+    return app.test_client()
+
+
+def test_rows_of_a_team_and_columns(client):
+    response = client.get('/api/nba/rows?team=Lakers&columns=player,points')
+    assert response.status_code == 200
+    body = response.get_json()
+    expected = load_dataset('nba').query("team == 'Lakers'")
+    assert body['dataset'] == 'nba'
+    assert body['columns'] == ['player', 'points']
+    assert body['data'] == [[player, int(points)] for player, points in zip(expected['player'], expected['points'])]
+
+
+def test_rows_keep_decimal_stats_as_written(client):
+    body = client.get('/api/cricket_batting/rows?team=India&columns=average').get_json()
+    averages = load_dataset('cricket_batting').query("team == 'India'")['average'].tolist()
+    assert [row[0] for row in body['data']] == averages
+    assert 55.3 in averages
+
+
+def test_rows_of_players_across_teams(client):
+    df = load_dataset('nba')
+    players = list(df['player'].iloc[[0, -1]])
+    body = client.get('/api/nba/rows', query_string={'player': players, 'columns': 'player'}).get_json()
+    assert [row[0] for row in body['data']] == players
+
+
+@pytest.mark.parametrize('url, status', [
+    ('/api/nba/rows?columns=player,height', 400),
+    ('/api/hockey/rows', 404),
+    ('/api/nba/rows?format=csv', 400),
+    ('/api/nba/rows?limit=ten', 400),
+    ('/api/nba/rows?limit=0', 400),
+    ('/api/nba/rows?offset=-1', 400),
+    ('/api/nba/aggregate?by=season', 400),
+    ('/api/nba/aggregate?aggregates=median', 400),
+    ('/api/nba/aggregate?columns=player', 400),
+])
+def test_bad_queries_are_client_errors(client, url, status):
+    response = client.get(url)
+    assert response.status_code == status
+    assert 'error' in response.get_json()
+
+
+def test_rows_are_paged(client, monkeypatch):
+    monkeypatch.setattr(query_api, 'MAX_PAGE_ROWS', 200)
+    expected = load_dataset('nba_games')['points'].tolist()
+    pages = [client.get(f'/api/nba_games/rows?columns=points&offset={offset}').get_json() for offset in (0, 200, 400)]
+    assert [len(page['data']) for page in pages] == [200, 200, 80]
+    assert [page['offset'] for page in pages] == [0, 200, 400]
+    assert {(page['limit'], page['total_rows']) for page in pages} == {(200, len(expected))}
+    assert [row[0] for page in pages for row in page['data']] == expected
+
+    body = client.get('/api/nba_games/rows?columns=points&limit=5&offset=10').get_json()
+    assert [row[0] for row in body['data']] == expected[10:15]
+    response = client.get('/api/nba_games/rows?limit=201')
+    assert response.status_code == 400 and 'between 1 and 200' in response.get_json()['error']
+
+
+def test_aggregate_per_team(client):
+    body = client.get('/api/nba/aggregate?columns=points&aggregates=count,sum,max').get_json()
+    assert body['columns'] == ['team', 'count(points)', 'sum(points)', 'max(points)']
+    df = load_dataset('nba')
+    grouped = df.groupby(df['team'].astype(str), sort=False)['points']
+    expected = {team: [len(points), float(points.sum()), float(points.max())] for team, points in grouped}
+    assert {row[0]: row[1:] for row in body['data']} == expected
+
+
+def test_aggregate_per_player(client):
+    body = client.get('/api/nba_games/aggregate?team=Lakers&by=player&columns=points&aggregates=sum').get_json()
+    df = load_dataset('nba_games').query("team == 'Lakers'")
+    expected = df.groupby(df['player'].astype(str))['points'].sum()
+    assert {row[1]: row[2] for row in body['data']} == {player: float(total) for player, total in expected.items()}
+    assert {row[0] for row in body['data']} == {'Lakers'}
+
+
+def test_batch_answers_each_query_in_order(client):
+    response = client.post('/api/batch', json={'queries': [
+        {'dataset': 'nba', 'teams': ['Lakers'], 'columns': ['player']},
+        {'dataset': 'nba', 'kind': 'aggregate', 'columns': ['points'], 'aggregates': ['sum']},
+        {'dataset': 'hockey'},
+    ]})
+    assert response.status_code == 200
+    rows, totals, unknown = response.get_json()['results']
+    assert len(rows['data']) == (load_dataset('nba')['team'] == 'Lakers').sum()
+    assert totals['columns'] == ['team', 'sum(points)']
+    assert 'unknown dataset' in unknown['error']
+
+
+@pytest.mark.parametrize('query, message', [
+    ({'dataset': 'nba', 'teams': 'Lakers'}, 'teams must be a list of strings'),
+    ({'dataset': 'nba', 'players': [['a']]}, 'players must be a list of strings'),
+    ({'dataset': 'nba', 'columns': 'points'}, 'columns must be a list of strings'),
+    ({'dataset': 'nba', 'kind': 'aggregate', 'aggregates': 'sum'}, 'aggregates must be a list of strings'),
+    ({'dataset': 'nba', 'kind': 'aggregate', 'by': 'season'}, "by must be 'team' or 'player'"),
+    ({'dataset': 'nba', 'kind': 'aggregate', 'by': ['team']}, "by must be 'team' or 'player'"),
+    ({'dataset': ['nba']}, 'dataset must be a string'),
+    ({'dataset': 'nba', 'kind': 'median'}, "kind must be 'rows' or 'aggregate'"),
+    ({'dataset': 'nba', 'limit': '5'}, 'limit must be an integer'),
+    ({'dataset': 'nba', 'offset': True}, 'offset must be an integer'),
+    ({'dataset': 'nba', 'limit': 0}, 'limit must be between 1 and'),
+    ('nba', 'each query must be an object'),
+])
+def test_batch_rejects_malformed_queries(client, query, message):
+    response = client.post('/api/batch', json={'queries': [query]})
+    assert response.status_code == 200
+    assert message in response.get_json()['results'][0]['error']
+
+
+def test_batch_pages_rows_and_checks_by_only_for_aggregates(client):
+    response = client.post('/api/batch', json={'queries': [
+        {'dataset': 'nba_games', 'columns': ['points'], 'limit': 3, 'offset': 1, 'by': 'season'},
+    ]})
+    page, = response.get_json()['results']
+    assert [row[0] for row in page['data']] == load_dataset('nba_games')['points'].tolist()[1:4]
+    assert (page['offset'], page['limit'], page['total_rows']) == (1, 3, 480)
+
+
+def test_batch_limits(client, monkeypatch):
+    assert client.post('/api/batch', json={'query': []}).status_code == 400
+    monkeypatch.setattr(query_api, 'MAX_BATCH_QUERIES', 2)
+    assert client.post('/api/batch', json={'queries': [{'dataset': 'nba'}] * 3}).status_code == 413
+
+
+def test_unchanged_response_is_not_sent_again(client):
+    first = client.get('/api/nba/rows?team=Bucks')
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+    again = client.get('/api/nba/rows?team=Bucks', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    other = client.get('/api/nba/rows?team=Celtics', headers={'If-None-Match': etag})
+    assert other.status_code == 200
+
+
+def test_batch_etag_never_answers_304(client):
+    body = {'queries': [{'dataset': 'nba'}]}
+    etag = client.post('/api/batch', json=body).headers['ETag']
+    assert client.post('/api/batch', json=body, headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_large_responses_are_gzipped_for_clients_that_accept_it(client):
+    plain = client.get('/api/football/rows')
+    assert len(plain.data) >= query_api.COMPRESS_MIN_BYTES
+    assert 'Content-Encoding' not in plain.headers
+
+    zipped = client.get('/api/football/rows', headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in zipped.headers['Vary']
+    assert gzip.decompress(zipped.data) == plain.data
+    assert json.loads(plain.data)['dataset'] == 'football'
+
+
+def test_small_responses_are_not_gzipped(client):
+    response = client.get('/api/nba/rows?team=Lakers&columns=player', headers={'Accept-Encoding': 'gzip'})
+    assert len(response.data) < query_api.COMPRESS_MIN_BYTES
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_response_cache_is_bounded():
+    cache = query_api.ResponseCache(max_entries=2, max_bytes=10)
+    for etag in 'abc':
+        cache.get(etag, lambda: (b'1234', None))
+    assert list(cache._entries) == ['b', 'c']
+    cache.get('d', lambda: (b'1234567', None))
+    assert list(cache._entries) == ['d'] and cache.bytes == 7
+    calls = []
+    cache.get('d', lambda: calls.append(1))
+    assert calls == []
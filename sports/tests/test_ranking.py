@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ranking import Leaderboard, Stat
+
+STATS = {
+    'runs': Stat('runs'),
+    'runs per match': Stat('runs', per='matches'),
+    'total': Stat('runs', 'sum'),
+    'best': Stat('runs', 'max'),
+    'economy': Stat('economy', ascending=True),
+}
+
+
+def _rows(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'team': rng.choice(list('ABCD'), n),
+        'player': [f'p{i}' for i in rng.integers(0, 120, n)],
+        'runs': rng.integers(0, 5000, n).astype(float),
+        'matches': rng.integers(0, 200, n),
+        'economy': rng.uniform(3, 9, n),
+    })
+
+
+def _expected(df):
+    g = df.groupby(['team', 'player'], sort=False)
+    matches = g['matches'].last()
+    return pd.DataFrame({
+        'runs': g['runs'].last(),
+        'runs per match': (g['runs'].last() / matches).where(matches > 0),
+        'total': g['runs'].sum(),
+        'best': g['runs'].max(),
+        'economy': g['economy'].last(),
+    })
+
+
+@pytest.mark.parametrize('batches', [1, 9])
+def test_top_matches_sorting_the_aggregates(batches):
+    df = _rows()
+    board = Leaderboard(STATS)
+    for part in np.array_split(np.arange(len(df)), batches):
+        board.add(df.iloc[part])
+    expected = _expected(df)
+    for stat, spec in STATS.items():
+        best = expected[stat].dropna().sort_values(ascending=spec.ascending)
+        assert np.allclose(board.top(stat, 15)[stat], best.head(15))
+        of_team = best[best.index.get_level_values('team') == 'C']
+        top = board.top(stat, 5, team='C')
+        assert set(top['team']) == {'C'}
+        assert np.allclose(top[stat], of_team.head(5))
+
+
+def test_rank_and_percentile():
+    df = pd.DataFrame({'team': ['A', 'A', 'B', 'B'], 'player': ['a', 'b', 'c', 'a'],
+                       'runs': [10.0, 30.0, 20.0, 40.0], 'matches': 1, 'economy': [5.0, 4.0, 6.0, 7.0]})
+    board = Leaderboard.from_frame(df, STATS)
+    assert board.rank('runs', 'b', 'A') == (2, 75.0, 30.0)
+    assert board.rank('runs', 'a', 'A') == (4, 25.0, 10.0)
+    # Across teams a player's best entry counts
+    assert board.rank('runs', 'a') == (1, 100.0, 40.0)
+    assert board.rank('economy', 'a') == (2, 75.0, 5.0)
+    assert board.rank('runs', 'nobody') is None
+    assert board.rank('runs', 'c', 'A') is None
+
+
+def test_ties_share_the_best_rank():
+    df = pd.DataFrame({'team': 'A', 'player': ['a', 'b', 'c'], 'runs': [5.0, 5.0, 1.0], 'matches': 1, 'economy': 1.0})
+    board = Leaderboard.from_frame(df, STATS)
+    assert board.top('runs')['rank'].tolist() == [1, 1, 3]
+
+
+def test_updated_player_moves_in_the_sorted_index():
+    df = _rows(seed=1)
+    board = Leaderboard.from_frame(df, STATS)
+    team, player = df.iloc[0][['team', 'player']]
+    board.add(pd.DataFrame({'team': [team], 'player': [player], 'runs': [1e6], 'matches': [1], 'economy': [0.1]}))
+    assert board.top('runs', 1)[['team', 'player']].values.tolist() == [[team, player]]
+    assert board.top('economy', 1)['player'].tolist() == [player]
+    assert board.rank('runs', player, team)[0] == 1
+    assert (np.diff(board._sorted['runs']) >= 0).all()
+
+
+def test_team_table():
+    df = _rows(seed=2)
+    board = Leaderboard.from_frame(df, STATS)
+    table = board.team_table('total').set_index('team')
+    expected = _expected(df)['total'].groupby(level='team')
+    assert np.allclose(table.loc[list(expected.sum().index), 'sum'], expected.sum())
+    assert np.allclose(table.loc[list(expected.max().index), 'max'], expected.max())
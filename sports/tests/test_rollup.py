@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import load_dataset
+from rollup import GAME_STATS, GameRollup
+
+
+@pytest.fixture(scope='module')
+def games():
+    return load_dataset('nba_games')
+
+
+@pytest.fixture
+def missed_games():
+    # One team's box scores where players sit games out: Ann plays all 8, Bob misses 2-4, Cy misses 1 and 6
+    played = {'Ann': range(1, 9), 'Bob': [1, 5, 6, 7, 8], 'Cy': [2, 3, 4, 5, 7, 8]}
+    df = pd.DataFrame([{'team': 'Lakers', 'player': player, 'game': game}
+                       for player, games in played.items() for game in games])
+    rng = np.random.default_rng(7)
+    return df.assign(**{stat: rng.integers(0, 30, len(df)) for stat in GAME_STATS})
+
+
+def _frame(rollup, team, view, window):
+    frame = rollup.team_frame(team, view, window).astype({'player': str})
+    return frame.set_index(['player', 'game'])[[*GAME_STATS, 'games played']].sort_index()
+
+
+def _expected(df, team, view, window):
+    # The same view computed with pandas, over the team's games: each player's stats are NaN in the
+    # games they missed, which pandas leaves out of sums, means and windows (the window still spans them)
+    df = df[df['team'] == team]
+    team_games = np.arange(1, df['game'].max() + 1)
+    frames = []
+    for player, rows in df.groupby(df['player'].astype(str), sort=False):
+        values = rows.set_index('game')[GAME_STATS].astype(np.float64).reindex(team_games)
+        if view == 'game':
+            result = values
+        elif view == 'cumulative':
+            result = values.cumsum()
+        elif view == 'average':
+            result = values.expanding().mean()
+        else:
+            result = values.rolling(window, min_periods=1).mean()
+        result['games played'] = values[GAME_STATS[0]].notna().cumsum()
+        frames.append(result.loc[rows['game']].assign(player=player).rename_axis('game').reset_index())
+    return pd.concat(frames).set_index(['player', 'game'])[[*GAME_STATS, 'games played']].sort_index()
+
+
+@pytest.mark.parametrize('view, window', [('game', 5), ('cumulative', 5), ('average', 5), ('rolling', 3), ('rolling', 4)])
+def test_team_frame_matches_pandas(games, view, window):
+    frame = _frame(GameRollup.from_frame(games), 'Lakers', view, window)
+    pd.testing.assert_frame_equal(frame, _expected(games, 'Lakers', view, window), check_dtype=False)
+
+
+@pytest.mark.parametrize('view, window', [('cumulative', 5), ('average', 5), ('rolling', 3), ('rolling', 4)])
+def test_missed_games_are_left_out_of_team_game_windows(missed_games, view, window):
+    frame = _frame(GameRollup.from_frame(missed_games), 'Lakers', view, window)
+    pd.testing.assert_frame_equal(frame, _expected(missed_games, 'Lakers', view, window), check_dtype=False)
+    assert frame.loc['Bob', 'games played'].tolist() == [1, 2, 3, 4, 5]
+    assert frame.loc['Cy', 'games played'].tolist() == [1, 2, 3, 4, 5, 6]
+
+
+def test_rolling_window_counts_team_games(missed_games):
+    # Bob's 3-game window at game 5 spans games 3-5, of which he played only game 5
+    points = missed_games.set_index(['player', 'game'])['points']
+    frame = _frame(GameRollup.from_frame(missed_games), 'Lakers', 'rolling', 3)
+    assert frame.loc[('Bob', 5), 'points'] == points['Bob', 5]
+    assert frame.loc[('Bob', 6), 'points'] == (points['Bob', 5] + points['Bob', 6]) / 2
+    average = _frame(GameRollup.from_frame(missed_games), 'Lakers', 'average', 3)
+    assert average.loc[('Bob', 5), 'points'] == (points['Bob', 1] + points['Bob', 5]) / 2
+
+
+def test_appending_games_matches_one_pass(games):
+    whole = GameRollup.from_frame(games)
+    rollup = GameRollup()
+    for game in sorted(games['game'].unique()):
+        rollup.add(games[games['game'] == game])
+    for view in ('cumulative', 'rolling'):
+        pd.testing.assert_frame_equal(rollup.team_frame('Bucks', view), whole.team_frame('Bucks', view))
+        pd.testing.assert_frame_equal(rollup.team_totals('Bucks', view, 4), whole.team_totals('Bucks', view, 4))
+
+
+def test_corrected_game_is_replaced(games):
+    rollup = GameRollup.from_frame(games)
+    row = games[(games['team'] == 'Celtics') & (games['game'] == 2)].iloc[[0]]
+    rollup.add(row.assign(points=row['points'] + 10))
+    totals = rollup.team_totals('Celtics', 'cumulative')
+    expected = games[games['team'] == 'Celtics'].groupby('game')['points'].sum().cumsum()
+    assert (totals['points'].to_numpy() - expected.to_numpy()).tolist() == [0] + [10] * (len(expected) - 1)
+
+
+def test_team_totals_sum_the_players(games):
+    totals = GameRollup.from_frame(games).team_totals('Warriors', 'game')
+    expected = games[games['team'] == 'Warriors'].groupby('game')[GAME_STATS].sum()
+    assert totals['game'].tolist() == expected.index.tolist()
+    assert np.allclose(totals[GAME_STATS], expected)
+    assert GameRollup().team_totals('Warriors').empty
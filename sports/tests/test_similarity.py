@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from similarity import SimilarityIndex
+
+
+def _stats(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'team': rng.choice(['A', 'B', 'C'], n),
+        'player': [f'p{i}' for i in range(n)],
+        'runs': rng.uniform(0, 5000, n),       # large units
+        'average': rng.uniform(10, 60, n),
+        'economy': rng.uniform(3, 9, n),       # small units
+    })
+
+
+FEATURES = ['runs', 'average', 'economy']
+
+
+def _z(df):
+    values = df[FEATURES].to_numpy(dtype=np.float64)
+    return (values - values.mean(axis=0)) / values.std(axis=0)
+
+
+def test_order_matches_brute_force_distances():
+    df = _stats()
+    index = SimilarityIndex(df, FEATURES)
+    z = _z(df)
+    distances = np.sqrt(((z - z[7]) ** 2).sum(axis=1))
+    distances[7] = np.inf
+    expected = np.argsort(distances)[:10]
+    result = index.nearest('p7', k=10)
+    assert result['player'].tolist() == df['player'].iloc[expected].tolist()
+    assert np.allclose(result['distance'], distances[expected], atol=1e-4)
+    assert result['runs'].tolist() == df['runs'].iloc[expected].tolist()
+
+
+def test_features_are_z_scored():
+    df = _stats()
+    index = SimilarityIndex(df, FEATURES)
+    assert np.allclose(index.matrix, _z(df), atol=1e-5)
+    # Doubling one stat's units does not change who is similar
+    scaled = SimilarityIndex(df.assign(runs=df['runs'] * 1000), FEATURES)
+    assert scaled.nearest('p3', k=5)['player'].tolist() == index.nearest('p3', k=5)['player'].tolist()
+
+
+def test_a_player_is_not_their_own_match():
+    df = _stats()
+    twin = df.iloc[[5]].assign(player='twin', team='C')
+    index = SimilarityIndex(pd.concat([df, twin]), FEATURES)
+    result = index.nearest('p5', k=len(df) + 5)
+    assert 'p5' not in result['player'].tolist()
+    assert result['player'].iloc[0] == 'twin' and result['similarity (%)'].iloc[0] == pytest.approx(100.0)
+    assert len(result) == len(df)
+
+
+def test_unknown_players_and_players_without_stats():
+    df = _stats()
+    df.loc[df['player'] == 'p2', FEATURES] = np.nan
+    index = SimilarityIndex(df, FEATURES)
+    assert index.nearest('nobody') is None
+    assert index.nearest('p2') is None
+    assert 'p2' not in index.nearest('p0', k=len(df))['player'].tolist()
+    assert index.nearest('p0', team='no team') is None
+
+
+def test_same_name_on_two_teams():
+    df = pd.DataFrame({'team': ['A', 'B', 'A', 'B'], 'player': ['x', 'x', 'y', 'z'],
+                       'runs': [1.0, 9.0, 1.1, 9.1], 'average': [1.0, 9.0, 1.1, 9.1], 'economy': [1.0, 9.0, 1.1, 9.1]})
+    index = SimilarityIndex(df, FEATURES)
+    assert index.nearest('x', k=1, team='A')['player'].tolist() == ['y']
+    assert index.nearest('x', k=1, team='B')['player'].tolist() == ['z']
+    assert index.nearest_to({'runs': 9.0, 'average': 9.0, 'economy': 9.0}, k=1)[['team', 'player']].values.tolist() == [['B', 'x']]
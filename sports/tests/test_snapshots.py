@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+import snapshots
+from data_loader import data_version
+from snapshots import SnapshotStore, code_digest, export, source_files
+
+
+@pytest.fixture(scope='module')
+def exported(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp('snapshots'))
+    return root, export(root, ['nba'], jobs=1)
+
+
+def _version():
+    return data_version('nba') + '+' + data_version('nba_games')
+
+
+def test_export_writes_every_team(exported):
+    root, rendered = exported
+    store = SnapshotStore(root)
+    manifest = store.manifest('nba')
+    assert rendered == {'nba': len(manifest['teams'])} and rendered['nba'] > 0
+    assert manifest['version'] == _version() and manifest['code'] == code_digest('nba')
+    team = next(iter(manifest['teams']))
+    figures = store.figures('nba', team, _version())
+    assert len(figures) == len(manifest['graphs']) == 6
+    assert store.figure('nba', team, _version(), 'player-trends') == figures[manifest['graphs'].index('player-trends')]
+    assert os.path.exists(os.path.join(root, 'nba', manifest['teams'][team]['file'] + '.html'))
+
+
+def test_reexport_renders_only_changed_teams(exported):
+    root, _ = exported
+    assert export(root, ['nba'], jobs=1) == {'nba': 0}
+    # A team whose rows changed since the export, and one whose file went missing
+    path = os.path.join(root, 'nba', 'manifest.json')
+    with open(path) as f:
+        manifest = json.load(f)
+    changed, missing = list(manifest['teams'])[:2]
+    manifest['teams'][changed]['digest'] = 'old'
+    with open(path, 'w') as f:
+        json.dump(manifest, f)
+    os.remove(os.path.join(root, 'nba', manifest['teams'][missing]['file'] + '.json'))
+    assert export(root, ['nba'], jobs=1) == {'nba': 2}
+    assert SnapshotStore(root).figures('nba', missing, _version()) is not None
+
+
+def test_stale_snapshots_fall_back_to_live_rendering(exported, monkeypatch):
+    root, _ = exported
+    store = SnapshotStore(root)
+    team = next(iter(store.manifest('nba')['teams']))
+    assert store.figures('nba', team, 'other-version') is None
+    assert store.figures('nba', 'Nowhere', _version()) is None
+    assert store.figure('nba', team, _version(), 'no-such-graph') is None
+    assert SnapshotStore(str(root) + '-missing').figures('nba', team, _version()) is None
+    monkeypatch.setattr(snapshots, 'code_digest', lambda page: 'edited')
+    assert store.figures('nba', team, _version()) is None
+
+
+def test_code_digest_covers_imported_local_modules(tmp_path):
+    (tmp_path / 'page.py').write_text("import helper\nfrom shared import thing\nimport json\n\n"
+                                      "def later():\n    import lazy\n")
+    (tmp_path / 'helper.py').write_text("try:\n    import shared\nexcept ImportError:\n    pass\n")
+    for name in ('shared', 'lazy'):
+        (tmp_path / f'{name}.py').write_text("thing = 1\n")
+    assert [os.path.basename(path) for path in source_files(str(tmp_path / 'page.py'))] == \
+        ['helper.py', 'page.py', 'shared.py']
+    nba = [os.path.basename(path) for path in source_files(os.path.join(os.path.dirname(snapshots.__file__), 'nba.py'))]
+    assert {'nba.py', 'rollup.py', 'figure_pool.py', 'table_index.py'} <= set(nba)
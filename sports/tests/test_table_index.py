@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from table_index import TableIndex, shared_index
+
+
+def _frame():
+    return pd.DataFrame({
+        'team': ['B', 'A', 'B', 'A', 'C', 'B'],
+        'player': ['x', None, 'y', 'z', np.nan, 'x'],
+        'runs': [1, 2, 3, 4, 5, 6],
+    })
+
+
+def test_team_rows_are_contiguous_slices_in_first_seen_order():
+    index = TableIndex(_frame(), 'team', 'player')
+    assert index.teams == ['B', 'A', 'C']
+    assert index.team('B')['runs'].tolist() == [1, 3, 6]
+    assert index.team('A')['runs'].tolist() == [2, 4]
+    assert index.team('unknown').empty
+
+
+def test_rows_without_a_player_belong_to_no_player():
+    index = TableIndex(_frame(), 'team', 'player')
+    assert set(index.player_rows) == {'x', 'y', 'z'}
+    assert index.players(['x'])['runs'].tolist() == [1, 6]
+    assert index.players(['z', 'y'])['runs'].tolist() == [4, 3]
+    assert index.players(['nobody']).empty
+    assert sum(len(rows) for rows in index.player_rows.values()) == 4
+
+
+def test_player_lookups():
+    index = TableIndex(_frame(), 'team', 'player')
+    assert index.player_row('y')['runs'] == 3
+    assert index.player_row('nobody') is None
+    assert list(index.team_players('B')) == ['x', 'y']
+
+
+def test_shared_index_is_built_once_per_frame():
+    df = _frame()
+    assert shared_index(df, 'team', 'player') is shared_index(df, 'team', 'player')
+    assert shared_index(df, 'team') is not shared_index(df, 'team', 'player')
+    assert shared_index(df.copy(), 'team', 'player') is not shared_index(df, 'team', 'player')
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from tracking_stream import TrackingStore
+
+
+def _samples(start, n):
+    return pd.DataFrame({
+        'team name': np.where(np.arange(start, start + n) % 3 == 0, 'A', 'B'),
+        'timestamp': pd.Timestamp('2025-03-07 12:00') + pd.to_timedelta(np.arange(start, start + n), unit='s'),
+        'speed (m/s)': np.arange(start, start + n, dtype=np.float64),
+    })
+
+
+def test_cursor_reads_only_new_rows():
+    store = TrackingStore.from_frame(_samples(0, 5), capacity=10)
+    df, cursor = store.frame()
+    assert cursor == 5 and df['speed (m/s)'].tolist() == [0, 1, 2, 3, 4]
+    store.append(_samples(5, 3))
+    df, cursor = store.frame(since=cursor)
+    assert cursor == 8 and df['speed (m/s)'].tolist() == [5, 6, 7]
+    assert df['timestamp'].tolist() == list(_samples(5, 3)['timestamp'])
+
+
+def test_ring_buffer_keeps_the_latest_rows():
+    store = TrackingStore.from_frame(_samples(0, 8), capacity=10)
+    store.append(_samples(8, 7))
+    assert store.seq == 15 and store.first_seq == 5
+    df, _ = store.frame(since=2)  # rows 2..4 were overwritten
+    assert df['speed (m/s)'].tolist() == list(range(5, 15))
+    team, _ = store.frame(team='A')
+    assert team['speed (m/s)'].tolist() == [6, 9, 12]
+    assert set(team['team name']) == {'A'}
+    assert len(store.frame(team='C')[0]) == 0
+
+
+def test_batch_larger_than_the_buffer():
+    store = TrackingStore.from_frame(_samples(0, 2), capacity=4)
+    assert store.append(_samples(2, 9)) == 6
+    df, _ = store.frame()
+    assert df['speed (m/s)'].tolist() == [7, 8, 9, 10]
+
+
+def test_missing_columns_and_labels():
+    store = TrackingStore.from_frame(_samples(0, 2), capacity=4)
+    store.append(pd.DataFrame({'team name': [None], 'timestamp': [pd.Timestamp('2025-03-07 12:10')]}))
+    df, _ = store.frame(since=2)
+    assert pd.isna(df['team name'].iloc[0]) and np.isnan(df['speed (m/s)'].iloc[0])
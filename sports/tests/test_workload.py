@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from workload import WorkloadModel
+
+
+def _samples(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    players = rng.choice(['p1', 'p2', 'p3'], n)
+    return pd.DataFrame({
+        'team name': np.where(players == 'p2', 'B', 'A'),
+        'player name': players,
+        'timestamp': pd.Timestamp('2025-03-07 12:00') + pd.to_timedelta(np.sort(rng.uniform(0, 3600, n)), unit='s'),
+        'speed (m/s)': rng.uniform(0, 9, n),
+        'acceleration (m/s²)': rng.normal(0, 2, n),
+        'heart rate (bpm)': rng.integers(80, 195, n),
+        'sprint count': np.arange(n) // 20,
+        'distance covered (m)': np.arange(n) * 5.0,
+    })
+
+
+def test_acute_load_is_the_time_aware_ewma_of_the_samples():
+    seconds = np.array([0.0, 5.0, 7.0, 60.0, 61.0, 400.0])
+    times = pd.Timestamp('2025-03-07 12:00') + pd.to_timedelta(seconds, unit='s')
+    speed = np.array([2.0, 6.0, 8.0, 1.0, 7.5, 3.0])
+    df = pd.DataFrame({'team name': 'A', 'player name': 'p1', 'timestamp': times, 'speed (m/s)': speed})
+    model = WorkloadModel.from_frame(df, acute_seconds=30.0)
+
+    # e_k = e_(k-1) * exp(-dt/tau) + (1 - exp(-dt/tau)) * load_k, starting at the first sample's load
+    load = 0.1 * speed
+    expected = load[0]
+    for dt, value in zip(np.diff(seconds), load[1:]):
+        decay = np.exp(-dt / 30.0)
+        expected = expected * decay + (1 - decay) * value
+    assert model.frame()['acute load'].iloc[0] == pytest.approx(expected)
+
+
+def test_batches_give_the_same_state_as_one_pass():
+    df = _samples()
+    whole = WorkloadModel.from_frame(df).frame()
+    model = WorkloadModel()
+    for part in np.array_split(np.arange(len(df)), 7):
+        model.add(df.iloc[part])
+    pd.testing.assert_frame_equal(model.frame(), whole, rtol=1e-9)
+
+
+def test_late_samples_do_not_move_a_players_clock_back():
+    df = _samples(seed=1)
+    model = WorkloadModel.from_frame(df)
+    before = model._state['time'].copy()
+    model.add(df.iloc[:5])
+    assert (model._state['time'] >= before).all()
+
+
+def test_frame_per_team_and_player():
+    model = WorkloadModel.from_frame(_samples(seed=2))
+    team = model.frame(team='A')
+    assert set(team['team name']) == {'A'}
+    assert model.frame(players=['p2'])['player name'].tolist() == ['p2']
+    assert model.frame()['samples'].sum() == 300
+    assert ((model.frame()['fatigue level (%)'] >= 0) & (model.frame()['fatigue level (%)'] <= 100)).all()
@@ -0,0 +1,211 @@
+import io
+import os
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_loader import normalize_columns
+
+
+class TrackingStore:
+    """Fixed-capacity ring buffer of tracking samples, stored column by column.
+
+    Numeric columns are float64 arrays, text columns int32 codes into a growing
+    label table and the timestamp column int64 nanoseconds. Every appended row
+    gets a sequence number; once the buffer is full the oldest rows are
+    overwritten, so only sequence numbers in ``[first_seq, seq)`` stay readable.
+    """
+
+    def __init__(self, schema, capacity=1_000_000, team_col='team name', time_col='timestamp'):
+        self.schema = dict(schema)  # column -> 'numeric' | 'text' | 'time'
+        self.capacity = capacity
+        self.team_col = team_col
+        self.time_col = time_col
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._columns = {}
+        self._labels = {}
+        self._codes = {}
+        for col, kind in self.schema.items():
+            if kind == 'numeric':
+                self._columns[col] = np.full(capacity, np.nan, dtype=np.float64)
+            elif kind == 'time':
+                self._columns[col] = np.zeros(capacity, dtype=np.int64)
+            else:
+                self._columns[col] = np.full(capacity, -1, dtype=np.int32)
+                self._labels[col] = []
+                self._codes[col] = {}
+
+    @classmethod
+    def from_frame(cls, df, capacity=1_000_000, **kwargs):
+        """Build a store with the schema of ``df`` and seed it with its rows."""
+        schema = {}
+        for col in df.columns:
+            if col == kwargs.get('time_col', 'timestamp'):
+                schema[col] = 'time'
+            elif pd.api.types.is_numeric_dtype(df[col]):
+                schema[col] = 'numeric'
+            else:
+                schema[col] = 'text'
+        store = cls(schema, capacity, **kwargs)
+        store.append(df)
+        return store
+
+    @property
+    def first_seq(self):
+        return max(0, self.seq - self.capacity)
+
+    def append(self, df):
+        """Append new samples; returns the sequence number after the write."""
+        if len(df) == 0:
+            return self.seq
+        if len(df) > self.capacity:
+            df = df.iloc[-self.capacity:]
+
+        with self._lock:
+            positions = np.arange(self.seq, self.seq + len(df)) % self.capacity
+            for col, kind in self.schema.items():
+                if col not in df.columns:
+                    values = np.nan if kind == 'numeric' else (0 if kind == 'time' else -1)
+                elif kind == 'numeric':
+                    values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+                elif kind == 'time':
+                    values = pd.to_datetime(df[col]).to_numpy(dtype='datetime64[ns]').view(np.int64)
+                else:
+                    values = self._encode(col, df[col])
+                self._columns[col][positions] = values
+            self.seq += len(df)
+            return self.seq
+
+    def frame(self, since=None, team=None):
+        """Rows appended at or after ``since`` (default: all buffered rows).
+
+        Returns ``(df, seq)`` where ``seq`` is the cursor to pass as ``since``
+        on the next call.
+        """
+        with self._lock:
+            start = self.first_seq if since is None else max(since, self.first_seq)
+            end = self.seq
+            positions = np.arange(start, end) % self.capacity
+            if team is not None:
+                code = self._codes[self.team_col].get(team, -2)
+                positions = positions[self._columns[self.team_col][positions] == code]
+
+            data = {}
+            for col, kind in self.schema.items():
+                values = self._columns[col][positions]
+                if kind == 'time':
+                    values = values.view('datetime64[ns]')
+                elif kind == 'text':
+                    labels = np.array(self._labels[col] + [np.nan], dtype=object)
+                    values = labels[values]
+                data[col] = values
+        return pd.DataFrame(data), end
+
+    def _encode(self, col, series):
+        codes, uniques = pd.factorize(series)
+        lookup = self._codes[col]
+        mapping = np.empty(len(uniques) + 1, dtype=np.int32)
+        mapping[-1] = -1  # factorize marks missing values with -1
+        for i, label in enumerate(uniques):
+            if label not in lookup:
+                lookup[label] = len(self._labels[col])
+                self._labels[col].append(label)
+            mapping[i] = lookup[label]
+        return mapping[codes]
+
+
+class CsvTailer:
+    """Reads rows appended to a growing CSV file since the last poll."""
+
+    def __init__(self, path, from_start=False):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.header = f.readline()
+            self.offset = len(self.header) if from_start else os.path.getsize(path)
+
+    def poll(self):
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            # File was truncated or rotated: start again after the header
+            self.offset = len(self.header)
+        if size == self.offset:
+            return None
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        # Only consume complete lines; a partial last line is picked up next poll
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return None
+        self.offset += end
+        df = pd.read_csv(io.BytesIO(self.header + chunk[:end]), header=0)
+        return normalize_columns(df)
+
+
+class QueueSource:
+    """Drains sample dicts (CSV column name -> value) pushed onto a queue."""
+
+    def __init__(self, sample_queue=None):
+        self.queue = sample_queue if sample_queue is not None else queue.Queue()
+
+    def poll(self):
+        rows = []
+        while True:
+            try:
+                rows.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if not rows:
+            return None
+        return normalize_columns(pd.DataFrame(rows))
+
+
+class StreamIngestor:
+    """Background thread that polls sources and appends new samples to a store."""
+
+    def __init__(self, store, sources, interval=0.1):
+        self.store = store
+        self.sources = list(sources)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='tracking-ingest', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        # Threads do not survive fork(): a worker forked from a preloading master
+        # restarts ingestion with fresh locks
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._restart_after_fork)
+        return self
+
+    def _restart_after_fork(self):
+        self.store._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='tracking-ingest', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            for source in self.sources:
+                try:
+                    df = source.poll()
+                except (OSError, ValueError, pd.errors.ParserError) as e:
+                    print(f"Tracking source {source!r} failed: {e}")
+                    continue
+                if df is not None and len(df):
+                    self.store.append(df)
+            self._stop.wait(self.interval)
+
+
+def extend_payload(df, columns, time_col='timestamp'):
+    """Plotly ``extendData`` payload adding ``df`` rows to one trace per column."""
+    x = df[time_col].astype(str).tolist()
+    return {'x': [x for _ in columns], 'y': [df[col].tolist() for col in columns]}
@@ -0,0 +1,201 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from callback_metrics import in_phase
+from table_index import PlayerCodes
+
+# Weights of the instantaneous load (arbitrary units per sample) computed from the raw columns
+LOAD_WEIGHTS = {
+    'speed': 0.1,        # per m/s
+    'acceleration': 0.25,  # per m/s² (either direction)
+    'heart_rate': 1.0,   # per unit of heart-rate reserve used (0 at rest, 1 at HR_MAX)
+    'sprint': 0.5,       # per new sprint
+    'distance': 0.005,   # per metre covered since the previous sample
+}
+HR_REST, HR_MAX = 60.0, 200.0
+
+# Exponential time constants (seconds): acute and chronic load, and recovery of accumulated work
+ACUTE_SECONDS = 300.0
+CHRONIC_SECONDS = 1800.0
+RECOVERY_SECONDS = 900.0
+
+# Accumulated work at which fatigue reaches 63% (1 - 1/e), in load x seconds
+FATIGUE_WORK = 1500.0
+# Fatigue at which a player should be substituted
+SUBSTITUTION_FATIGUE = 80.0
+# Injury risk: logistic in the acute:chronic ratio (danger above ACWR_DANGER) and fatigue
+ACWR_DANGER = 1.5
+RISK_ACWR_SLOPE = 4.0
+RISK_FATIGUE_SLOPE = 3.0
+# Longer gaps between a player's samples (e.g. half time) add no work
+MAX_GAP_SECONDS = 10.0
+
+
+class WorkloadModel(PlayerCodes):
+    """Per-player rolling workload, fatigue and injury risk from raw tracking samples.
+
+    Every sample gets an instantaneous load from speed, acceleration, heart rate
+    and the sprint/distance counters' increments. Per player, only the state
+    after the latest sample is kept: acute and chronic exponentially weighted
+    load (time-aware, so irregular sampling is fine) and work accumulated with
+    exponential recovery. A batch of new samples updates that state in closed
+    form with one sort and a few grouped sums, so the cost is O(1) per sample
+    whatever the length of the history.
+    """
+
+    def __init__(self, player_col='player name', team_col='team name', time_col='timestamp',
+                 speed_col='speed (m/s)', accel_col='acceleration (m/s²)', hr_col='heart rate (bpm)',
+                 sprint_col='sprint count', distance_col='distance covered (m)',
+                 acute_seconds=ACUTE_SECONDS, chronic_seconds=CHRONIC_SECONDS, recovery_seconds=RECOVERY_SECONDS):
+        self.player_col = player_col
+        self.team_col = team_col
+        self.time_col = time_col
+        self.speed_col = speed_col
+        self.accel_col = accel_col
+        self.hr_col = hr_col
+        self.sprint_col = sprint_col
+        self.distance_col = distance_col
+        self.acute_seconds = acute_seconds
+        self.chronic_seconds = chronic_seconds
+        self.recovery_seconds = recovery_seconds
+        self.start_ns = None
+        self.players = []
+        self.player_codes = {}
+        self.player_team = {}
+        self._state = {name: np.zeros(0) for name in
+                       ('time', 'acute', 'chronic', 'work', 'sprints', 'distance', 'samples')}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        model = cls(**kwargs)
+        model.add(df)
+        return model
+
+    def add(self, df):
+        """Fold new samples into every player's state."""
+        if len(df) == 0:
+            return
+        times = pd.to_datetime(df[self.time_col]).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        speed = self._column(df, self.speed_col)
+        accel = np.abs(self._column(df, self.accel_col))
+        hr = np.clip((self._column(df, self.hr_col, HR_REST) - HR_REST) / (HR_MAX - HR_REST), 0.0, 1.0)
+        sprints = self._column(df, self.sprint_col, np.nan)
+        distance = self._column(df, self.distance_col, np.nan)
+
+        with self._lock:
+            if self.start_ns is None:
+                self.start_ns = int(times.min())
+            codes = self._player_codes(df[self.player_col], df[self.team_col])
+            self._grow(len(self.players))
+            state = self._state
+
+            # Each player's samples in time order; the previous sample of the first one is the stored state
+            order = np.lexsort((times, codes))
+            codes, times = codes[order], times[order]
+            first = np.ones(len(codes), dtype=bool)
+            first[1:] = codes[1:] != codes[:-1]
+            last = np.ones(len(codes), dtype=bool)
+            last[:-1] = first[1:]
+            seen = state['samples'][codes] > 0
+
+            prev_time = np.empty(len(codes), dtype=np.float64)
+            prev_time[1:] = times[:-1]
+            prev_time[first] = state['time'][codes[first]]
+            # Seconds since the player's previous sample (inf for a player's very first sample)
+            dt = np.where(first & ~seen, np.inf, np.maximum(times - prev_time, 0) / 1e9)
+
+            load = (LOAD_WEIGHTS['speed'] * speed[order] + LOAD_WEIGHTS['acceleration'] * accel[order]
+                    + LOAD_WEIGHTS['heart_rate'] * hr[order]
+                    + LOAD_WEIGHTS['sprint'] * self._increments(sprints[order], codes, first, state['sprints'])
+                    + LOAD_WEIGHTS['distance'] * self._increments(distance[order], codes, first, state['distance']))
+
+            # Every player's time after this batch; each sample's weight decays until then
+            # (late samples never move a player's clock backwards)
+            touched = codes[last]
+            end = np.zeros(len(self.players), dtype=np.float64)
+            end[touched] = np.where(seen[last], np.maximum(times[last], state['time'][touched]), times[last])
+            age = (end[codes] - times) / 1e9
+            gap = (end[touched] - state['time'][touched]) / 1e9
+
+            for name, tau in (('acute', self.acute_seconds), ('chronic', self.chronic_seconds)):
+                # e_new = e_old * d_total + sum_k (1 - d_k) * load_k * decay(age_k)
+                step = -np.expm1(-dt / tau)
+                weights = step * load * np.exp(-age / tau)
+                carried = np.where(seen[last], state[name][touched] * np.exp(-gap / tau), 0.0)
+                state[name][touched] = carried + np.bincount(codes, weights, len(self.players))[touched]
+
+            # Work: leaky integral of load over time, recovering with RECOVERY_SECONDS
+            work_step = load * np.where(np.isfinite(dt), np.minimum(dt, MAX_GAP_SECONDS), 0.0)
+            weights = work_step * np.exp(-age / self.recovery_seconds)
+            carried = np.where(seen[last], state['work'][touched] * np.exp(-gap / self.recovery_seconds), 0.0)
+            state['work'][touched] = carried + np.bincount(codes, weights, len(self.players))[touched]
+
+            state['time'][touched] = end[touched]
+            state['samples'] += np.bincount(codes, minlength=len(self.players))
+            for name, values in (('sprints', sprints[order]), ('distance', distance[order])):
+                latest = values[last]
+                state[name][touched] = np.where(np.isnan(latest), state[name][touched], latest)
+
+    @in_phase('filter')
+    def frame(self, team=None, players=None):
+        """Current metrics, one row per player (of a ``team`` or the given ``players``)."""
+        with self._lock:
+            state = {name: values.copy() for name, values in self._state.items()}
+            names = list(self.players)
+            teams = [self.player_team.get(name) for name in names]
+            start_ns = self.start_ns
+
+        acwr = np.divide(state['acute'], state['chronic'], out=np.full(len(names), np.nan),
+                         where=state['chronic'] > 0)
+        fatigue = 100.0 * -np.expm1(-state['work'] / FATIGUE_WORK)
+        risk = 100.0 / (1.0 + np.exp(-(RISK_ACWR_SLOPE * (np.nan_to_num(acwr, nan=1.0) - ACWR_DANGER)
+                                       + RISK_FATIGUE_SLOPE * (fatigue / 100.0 - 0.5))))
+        elapsed = (state['time'] - (start_ns or 0)) / 60e9
+        df = pd.DataFrame({
+            self.player_col: names,
+            self.team_col: teams,
+            'acute load': state['acute'],
+            'chronic load': state['chronic'],
+            'acute:chronic ratio': acwr,
+            'fatigue level (%)': fatigue,
+            'injury risk (%)': risk,
+            'optimal substitution time (min)': elapsed + self.minutes_to_fatigue(state['work'], state['acute']),
+            'samples': state['samples'].astype(np.int64),
+        })
+        if team is not None:
+            df = df[df[self.team_col] == team]
+        if players is not None:
+            df = df[df[self.player_col].isin(players)]
+        return df.reset_index(drop=True)
+
+    def minutes_to_fatigue(self, work, load, fatigue=SUBSTITUTION_FATIGUE):
+        """Minutes until ``fatigue`` % is reached at a constant ``load`` (0 if past it, NaN if never)."""
+        target = -FATIGUE_WORK * np.log1p(-fatigue / 100.0)
+        tau = self.recovery_seconds
+        ceiling = load * tau  # work a constant load converges to
+        with np.errstate(divide='ignore', invalid='ignore'):
+            seconds = -tau * np.log((target - ceiling) / (work - ceiling))
+        seconds = np.where(ceiling > target, seconds, np.nan)
+        return np.where(work >= target, 0.0, seconds / 60.0)
+
+    def _column(self, df, col, fill=0.0):
+        if col not in df.columns:
+            return np.full(len(df), fill, dtype=np.float64)
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+        return values if np.isnan(fill) else np.where(np.isnan(values), fill, values)
+
+    def _increments(self, values, codes, first, stored):
+        # Growth of a cumulative counter since the player's previous sample (resets count as 0)
+        previous = np.empty(len(values), dtype=np.float64)
+        previous[1:] = values[:-1]
+        previous[first] = stored[codes[first]]
+        return np.nan_to_num(np.maximum(values - previous, 0.0))
+
+    def _grow(self, n_players):
+        for name, values in self._state.items():
+            if len(values) < n_players:
+                fill = np.nan if name in ('sprints', 'distance') else 0.0
+                self._state[name] = np.concatenate([values, np.full(n_players - len(values), fill)])